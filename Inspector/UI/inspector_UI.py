@@ -10,15 +10,25 @@ https://github.com/GQ21
 from PySide2 import QtCore
 from PySide2 import QtGui
 from PySide2 import QtWidgets
-from shiboken2 import wrapInstance
+from shiboken2 import wrapInstance, isValid
 
 import maya.cmds as mc
 import maya.OpenMayaUI as omui
 
-import os,cPickle,re
+import os
+import cProfile
 from functools import partial
 
-import Inspector.checks.in_commands as in_commands
+import Inspector.core.in_engine as in_engine
+import Inspector.core.in_presets as in_presets
+import Inspector.core.in_reports as in_reports
+import Inspector.core.in_profiling as in_profiling
+import Inspector.core.in_scene as in_scene
+import Inspector.core.in_scheduler as in_scheduler
+import Inspector.core.in_planner as in_planner
+import Inspector.checks.in_backends as in_backends
+import Inspector.checks.in_registry as in_registry
+import Inspector.UI.inspector_log as inspector_log
 
 
 def maya_main_window():
@@ -26,11 +36,20 @@ def maya_main_window():
     Return the Maya main window widget as a Python object
     """
     main_window_ptr = omui.MQtUtil.mainWindow()
+    if main_window_ptr is None:
+        # standalone sessions have no main window
+        return None
     return wrapInstance(long(main_window_ptr), QtWidgets.QWidget)
 
+def has_fix(command):
+    try:
+        return in_registry.get_fix(command) is not None
+    except KeyError:
+        return False
+
 class OptionsDialog(QtWidgets.QDialog):    
    
-    def __init__(self, options_dic, parent=maya_main_window()):
+    def __init__(self, options_dic, parent=None):
         super(OptionsDialog, self).__init__(parent)
 
         self.options = options_dic["options"]
@@ -65,63 +84,67 @@ class OptionsDialog(QtWidgets.QDialog):
     def create_connections(self):
         self.set_btn.clicked.connect(self.accept)
 
-    def update_setting_list(self):
+    def values(self):
+        values = {}
         for opt in self.options:
             opt_key = opt.keys()             
 
             if "QLineEdit" in opt[opt_key[0]]:
-                opt[opt_key[0]][1] = self.opt_wdg[opt_key[0]].text() 
+                values[opt_key[0]] = self.opt_wdg[opt_key[0]].text() 
+        return values
 
 class Inspector(QtWidgets.QDialog):
     
     dlg_instance = None
+    # categories expanded right after opening while they hold this many command rows in total,
+    # other categories build their rows when first expanded
+    EXPANDED_ROWS = 40
 
     @classmethod
-    def show_dialog(cls):                 
-        try:
-            cls.dlg_instance.close() # pylint: disable=E0601
-            cls.dlg_instance.deleteLater()
-        except:
-            pass
-        cls.dlg_instance = Inspector()
-        cls.dlg_instance.show()        
-
-    def __init__(self, parent=maya_main_window()):
-        super(Inspector, self).__init__(parent)   
-
-        # check current preset
-        self.current_preset_path =  os.path.join(mc.internalVar(usd=True),"Inspector/presets/current_preset.txt")     
-        try:
-            self.current_preset_open = open(self.current_preset_path,"rb")     
-        except:
-            print("Error opening current preset file, {}".format(self.current_preset_path))
-            raise            
-        self.current_preset_list  = cPickle.load(self.current_preset_open)
-        self.current_preset_open.close()
-
-        # load current preset options         
-        try:
-            try:
-                self.settings_list_open = open(self.current_preset_list[1],"rb")
-            except:                      
-                self.settings_list_open = open(
-                                            os.path.join(
-                                                mc.internalVar(usd=True),
-                                                "Inspector/presets/custom/{}".format(self.current_preset_list[1])
-                                                ),
-                                            "rb")            
-        except:
-            print ("Error opening settings preset file, {}\nLoading Default Preset".format(self.current_preset_list[1]))
-            self.default_preset_path  = os.path.join(mc.internalVar(usd=True),"Inspector/presets/default.txt")    
-            self.current_preset_list = ["Default Preset", self.default_preset_path]
-            self.default_preset_open = open(self.default_preset_path,"rb")    
-            self.settings_list = cPickle.load(self.default_preset_open)      
-            self.default_preset_open.close()   
-        else:               
-            self.settings_list = cPickle.load(self.settings_list_open)           
-            self.settings_list_open.close()  
-
-        self.obj_list = []
+    def show_dialog(cls, reload=False):
+        # dialog is kept between openings, reload builds it again from current preset
+        if cls.dlg_instance is not None and (reload or not isValid(cls.dlg_instance)):
+            if isValid(cls.dlg_instance):
+                cls.dlg_instance.dispose()
+            cls.dlg_instance = None
+        if cls.dlg_instance is None:
+            cls.dlg_instance = Inspector()
+        cls.dlg_instance.show()
+        cls.dlg_instance.raise_()
+        cls.dlg_instance.activateWindow()
+
+    def __init__(self, parent=None):
+        super(Inspector, self).__init__(parent or maya_main_window())   
+
+        # load current preset options, default preset is used if current one can't be opened
+        self.presets_dir = in_presets.presets_dir(mc.internalVar(usd=True))
+        self.current_preset_list, self.settings_list = in_presets.load_current_preset(self.presets_dir)
+        # commands indexed by name, shared with the engine, rows follow its changes
+        self.preset = in_presets.PresetModel(self.settings_list)
+        self.preset.add_listener(self.preset_changed)
+
+        # cache and history modules are imported with the dialog, not with this module
+        import Inspector.core.in_cache as in_cache
+        import Inspector.core.in_content_cache as in_content_cache
+        # results are kept between runs and only objects changed in the scene are checked again
+        self.result_cache = in_cache.ResultCache(in_cache.CallbackDirtyTracker())
+        # geometry check results shared across scenes and users, keyed by mesh content
+        self.content_cache = in_content_cache.ContentCache(in_content_cache.default_path(self.presets_dir),
+                                                           session=self.result_cache)
+        # commands run cheapest and most often failing first, costs are learned from every run
+        self.planner = in_planner.Planner(in_planner.CostModel(in_planner.default_path(self.presets_dir)))
+        self.engine = in_engine.Engine(self.preset, cache=self.content_cache, planner=self.planner)
+        # finished runs are recorded for trend queries, see in_history, opened by first recorded run
+        self.history = None
+        self.obj_list = in_scene.ObjectSet()
+        self.run_stats = None
+        self.scheduler = None
+        self.run_profile = None
+        # command name -> log model row of its result
+        self.result_rows = {}
+        # command rows are built per category on first expand
+        self.built_categories = set()
+        self.expanded_rows = 0
         self.script_jobs = []
         self.setWindowTitle("Inspector")
         self.preset_name = self.current_preset_list[0]
@@ -132,12 +155,41 @@ class Inspector(QtWidgets.QDialog):
         self.create_widgets()
         self.create_layout()
         self.create_connections()
+        QtCore.QTimer.singleShot(0, self.expand_next_category)
+
+    def closeEvent(self, event):
+        # scene callbacks stay registered while the dialog is hidden, so cached results are valid on next opening
+        self.cancel_run()
+        self.content_cache.close()
+        if self.history is not None:
+            self.history.close()
+        super(Inspector, self).closeEvent(event)
+
+    def dispose(self):
+        self.close()
+        self.result_cache.tracker.release()
+        self.deleteLater()
 
     def create_actions(self):
         self.load_preset_action = QtWidgets.QAction("Load Preset", self)
         self.reload_preset_action = QtWidgets.QAction("Reload Preset", self)
         self.save_preset_action = QtWidgets.QAction("Save Preset", self)
+        self.export_report_action = QtWidgets.QAction("Export Report", self)
+        self.profile_action = QtWidgets.QAction("Profile Runs", self)
+        self.profile_action.setCheckable(True)
         self.about_action = QtWidgets.QAction("About", self)       
+        self.disk_cache_action = QtWidgets.QAction("Disk Cache", self)
+        self.disk_cache_action.setCheckable(True)
+        self.disk_cache_action.setChecked(True)
+        self.cache_stats_action = QtWidgets.QAction("Cache Stats", self)
+        self.clear_cache_action = QtWidgets.QAction("Clear Disk Cache", self)
+
+        self.backend_action_grp = QtWidgets.QActionGroup(self)
+        self.backend_action = {}
+        for backend in (in_backends.CmdsBackend.name, in_backends.OpenMayaBackend.name):
+            self.backend_action[backend] = QtWidgets.QAction(backend, self.backend_action_grp)
+            self.backend_action[backend].setCheckable(True)
+        self.backend_action[in_backends.CmdsBackend.name].setChecked(True)
    
         self.check_all_action = {}
         self.uncheck_action = {}
@@ -150,8 +202,15 @@ class Inspector(QtWidgets.QDialog):
             self.uncheck_action[category[0]] = QtWidgets.QAction("Uncheck", self)
             self.invert_action[category[0]] = QtWidgets.QAction("Invert", self) 
             self.remove_action[category[0]] = QtWidgets.QAction("Remove Checked", self) 
-            for command in category[1]:                                     
-                self.add_action[command[0]] = QtWidgets.QAction(command[0], self) 
+
+    def populate_add_menu(self,category):
+        # actions of "Add Command" menu are created when it is first shown
+        menu = self.category_option_add_menu[category]
+        if not menu.isEmpty():
+            return
+        for command in self.preset.commands(category):
+            self.add_action[command[0]] = menu.addAction(command[0])
+            self.add_action[command[0]].triggered.connect(partial(self.on_command_row_visibility,command[0]))
                
     def create_widgets(self):
         self.menu_bar = QtWidgets.QMenuBar()
@@ -159,6 +218,16 @@ class Inspector(QtWidgets.QDialog):
         preset_menu.addAction(self.load_preset_action)
         preset_menu.addAction(self.reload_preset_action)
         preset_menu.addAction(self.save_preset_action)
+        log_menu = self.menu_bar.addMenu("Log")
+        log_menu.addAction(self.export_report_action)
+        log_menu.addAction(self.profile_action)
+        backend_menu = self.menu_bar.addMenu("Backend")
+        for backend in (in_backends.CmdsBackend.name, in_backends.OpenMayaBackend.name):
+            backend_menu.addAction(self.backend_action[backend])
+        cache_menu = self.menu_bar.addMenu("Cache")
+        cache_menu.addAction(self.disk_cache_action)
+        cache_menu.addAction(self.cache_stats_action)
+        cache_menu.addAction(self.clear_cache_action)
         help_menu = self.menu_bar.addMenu("Help")
         help_menu.addAction(self.about_action)
 
@@ -181,6 +250,15 @@ class Inspector(QtWidgets.QDialog):
         self.obj_item_list_remove_btn = QtWidgets.QPushButton("Remove Selected") 
         self.obj_item_list_remove_btn.setMinimumWidth(120)
         self.obj_item_list_sl_all_btn = QtWidgets.QPushButton("Select All")                 
+        self.obj_item_list_scene_btn = QtWidgets.QPushButton("Add Scene")
+        self.obj_item_list_scene_btn.setMinimumWidth(120)
+        self.obj_item_list_scene_menu = QtWidgets.QMenu(self.obj_item_list_scene_btn)
+        self.add_scene_all_action = self.obj_item_list_scene_menu.addAction("All Meshes")
+        self.add_scene_roots_action = self.obj_item_list_scene_menu.addAction("Under Selected")
+        self.add_scene_sets_action = self.obj_item_list_scene_menu.addAction("Selected Sets Members")
+        self.obj_item_list_scene_btn.setMenu(self.obj_item_list_scene_menu)
+        self.obj_item_list_filter = QtWidgets.QLineEdit()
+        self.obj_item_list_filter.setPlaceholderText("Name filter, e.g. char:* *_geo")
         self.obj_item_list = QtWidgets.QListWidget() 
         self.obj_item_list.setSelectionMode(QtWidgets.QAbstractItemView.ContiguousSelection)
         self.obj_item_list.setMaximumHeight(150) 
@@ -188,6 +266,24 @@ class Inspector(QtWidgets.QDialog):
         self.log_label = QtWidgets.QLabel("Log:")
         self.log_clear_btn = QtWidgets.QPushButton("Clear Log")
         self.log_clear_btn.setMaximumWidth(120)       
+        self.log_failures_cb = QtWidgets.QCheckBox("Failures Only")
+
+        self.log_model = inspector_log.LogModel(self)
+        self.log_view = QtWidgets.QTreeView()
+        self.log_view.setModel(self.log_model)
+        self.log_view.setUniformRowHeights(True)
+        self.log_view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.log_view.header().setStretchLastSection(True)
+        self.log_select_btn = QtWidgets.QPushButton("Select")
+        self.log_select_btn.setMaximumWidth(120)
+        self.run_progress_bar = QtWidgets.QProgressBar()
+        self.run_progress_bar.setVisible(False)
+        self.run_cancel_btn = QtWidgets.QPushButton("Cancel")
+        self.run_cancel_btn.setMaximumWidth(120)
+        self.run_cancel_btn.setVisible(False)
+        # advances the running scheduler one chunk per event loop pass
+        self.run_timer = QtCore.QTimer(self)
+        self.run_timer.setInterval(0)
       
         self.category_option_btn = {}
         self.category_option_menu = {}
@@ -200,6 +296,7 @@ class Inspector(QtWidgets.QDialog):
         self.command_label = {}
         self.command_btn = {}
         self.command_sl = {} 
+        self.command_fix = {}
         self.command_opt_btn = {} 
         self.command_info_btn = {}         
       
@@ -228,37 +325,9 @@ class Inspector(QtWidgets.QDialog):
             self.category_label[category[0]].setMinimumWidth(300)
 
             self.category_collapse_btn[category[0]] = QtWidgets.QPushButton()
-            self.category_collapse_btn[category[0]].setIcon(QtGui.QIcon(":moveUVDown.png")) 
+            self.category_collapse_btn[category[0]].setIcon(QtGui.QIcon(":moveUVLeft.png")) 
             self.category_collapse_btn[category[0]].setVisible(True)   
             self.category_collapse_btn[category[0]].setMaximumWidth(30)
-                        
-            # creating groupbox commands widgets  
-            for command in category[1]:                             
-                self.category_option_add_menu[category[0]].addAction(self.add_action[command[0]])
-                self.command_cb[command[0]] = QtWidgets.QCheckBox()
-                if command[1][0] == 1:
-                    self.command_cb[command[0]].setChecked(1)                       
-                self.command_label[command[0]] = QtWidgets.QLabel(command[0])
-                self.command_label[command[0]].setMinimumWidth(140)
-
-                self.command_btn[command[0]] = QtWidgets.QPushButton("Run")
-                self.command_btn[command[0]].setMaximumWidth(50)
-                self.command_btn[command[0]].setMaximumHeight(17)
-
-                self.command_sl[command[0]] = QtWidgets.QPushButton("Select All")
-                self.command_sl[command[0]].setEnabled(False)
-                self.command_sl[command[0]].setMaximumHeight(17) 
-
-                self.command_info_btn[command[0]] = QtWidgets.QPushButton()
-                self.command_info_btn[command[0]].setIcon(QtGui.QIcon(":gameFbxExporterHelp.png"))
-                self.command_info_btn[command[0]].setMaximumWidth(15)
-                self.command_info_btn[command[0]].setMaximumHeight(17)
-                self.command_info_btn[command[0]].setFlat(True)
-                # adding widgets with options
-                if len(command) > 2:                              
-                    self.command_opt_btn[command[0]] = QtWidgets.QPushButton("OPT")
-                    self.command_opt_btn[command[0]].setMaximumWidth(30)
-                    self.command_opt_btn[command[0]].setMaximumHeight(17)
 
         self.commands_run_btn = QtWidgets.QPushButton("Run All Checked")
 
@@ -270,41 +339,34 @@ class Inspector(QtWidgets.QDialog):
         obj_up_btn_layout.addWidget(self.obj_item_list_add_btn)
         obj_up_btn_layout.addWidget(self.obj_item_list_remove_btn)
         obj_up_btn_layout.addWidget(self.obj_item_list_sl_all_btn)
+        obj_up_btn_layout.addWidget(self.obj_item_list_scene_btn)
+        obj_up_btn_layout.addWidget(self.obj_item_list_filter)
         obj_up_btn_layout.setSpacing(3) 
         obj_up_btn_layout.addStretch()
 
         log_box_layout = QtWidgets.QHBoxLayout()
         log_box_layout.addWidget(self.log_label)
+        log_box_layout.addWidget(self.log_failures_cb)
+        log_box_layout.addWidget(self.log_select_btn)
         log_box_layout.addWidget(self.log_clear_btn)
-                 
-        log_list_grpbox = QtWidgets.QGroupBox()                        
-        self.log_list_layout = QtWidgets.QFormLayout()  
-        self.log_list_layout.setContentsMargins(0, 0, 0, 0)
-        self.log_list_layout.setAlignment(QtCore.Qt.AlignTop)  
-        log_list_grpbox.setLayout(self.log_list_layout)                         
-        log_list = QtWidgets.QScrollArea()
-        log_list.setWidget(log_list_grpbox)
-        log_list.setWidgetResizable(True)
 
         log_layout = QtWidgets.QVBoxLayout()  
         log_layout.addWidget(self.label_wdg)            
         log_layout.addLayout(obj_up_btn_layout)              
         log_layout.addWidget(self.obj_item_list)
         log_layout.addLayout(log_box_layout)    
-        log_layout.addWidget(log_list)
+        log_layout.addWidget(self.log_view)
 
-        self.log_list_command_wdg = {}
-        self.log_list_command_btn = {} 
-        self.log_list_objects_grpbox = {}
-        self.log_list_object_form = {}
-        self.log_list_object_wdg = {}             
+        run_progress_layout = QtWidgets.QHBoxLayout()
+        run_progress_layout.addWidget(self.run_progress_bar)
+        run_progress_layout.addWidget(self.run_cancel_btn)
+        log_layout.addLayout(run_progress_layout)
                
         commands_layout = QtWidgets.QVBoxLayout()       
      
         category_header_layout = {}   
         commands_grpbox_layout = {}    
-        commands_form_layout = {}
-        commands_form_row_layout = {}
+        self.commands_form_layout = {}
         self.commands_scroll_wdg = {} 
         self.commands_row_wdg = {}      
         
@@ -319,8 +381,8 @@ class Inspector(QtWidgets.QDialog):
             
             # layout commands sections
             commands_grpbox_layout[category[0]] = QtWidgets.QGroupBox() 
-            commands_form_layout[category[0]] = QtWidgets.QFormLayout()
-            commands_grpbox_layout[category[0]].setLayout(commands_form_layout[category[0]])
+            self.commands_form_layout[category[0]] = QtWidgets.QFormLayout()
+            commands_grpbox_layout[category[0]].setLayout(self.commands_form_layout[category[0]])
             
             self.commands_scroll_wdg[category[0]] = QtWidgets.QScrollArea()
             self.commands_scroll_wdg[category[0]].setWidget(commands_grpbox_layout[category[0]])
@@ -328,25 +390,8 @@ class Inspector(QtWidgets.QDialog):
             self.commands_scroll_wdg[category[0]].setFixedHeight(100)
             self.commands_scroll_wdg[category[0]].setFixedWidth(370)
                            
-            # adding commands rows                        
-            for command in category[1]:                                   
-                self.commands_row_wdg[command[0]] = QtWidgets.QWidget() 
-                if command[1][1] == 0:
-                    self.commands_row_wdg[command[0]].setVisible(False) 
-
-                commands_form_row_layout[command[0]] = QtWidgets.QHBoxLayout(self.commands_row_wdg[command[0]])                             
-                commands_form_row_layout[command[0]].setSpacing(4) 
-                commands_form_row_layout[command[0]].addWidget(self.command_cb[command[0]])               
-                commands_form_row_layout[command[0]].addWidget(self.command_label[command[0]])
-                commands_form_row_layout[command[0]].addWidget(self.command_btn[command[0]])
-                commands_form_row_layout[command[0]].addWidget(self.command_sl[command[0]]) 
-
-                if len(command) > 2:
-                    commands_form_row_layout[command[0]].addWidget(self.command_opt_btn[command[0]])  
-
-                commands_form_row_layout[command[0]].addWidget(self.command_info_btn[command[0]])              
-                commands_form_layout[category[0]].addWidget(self.commands_row_wdg[command[0]])                    
-                commands_form_row_layout[command[0]].setContentsMargins(0, 0, 0, 0)                             
+            # command rows are added by build_category when the category is expanded
+            self.commands_scroll_wdg[category[0]].setVisible(False)
           
             commands_layout.addLayout(category_header_layout[category[0]])
             commands_layout.addWidget(self.commands_scroll_wdg[category[0]])
@@ -362,54 +407,158 @@ class Inspector(QtWidgets.QDialog):
         self.save_preset_action.triggered.connect(self.save_preset)
         self.load_preset_action.triggered.connect(self.load_preset)
         self.reload_preset_action.triggered.connect(self.reload_preset)
+        self.export_report_action.triggered.connect(self.export_report)
+        self.disk_cache_action.toggled.connect(self.set_disk_cache)
+        self.cache_stats_action.triggered.connect(self.show_cache_stats)
+        self.clear_cache_action.triggered.connect(self.clear_disk_cache)
+        for backend in self.backend_action:
+            self.backend_action[backend].triggered.connect(partial(self.set_backend, backend))
         self.obj_item_list_add_btn.clicked.connect(self.add_selected)
         self.obj_item_list_remove_btn.clicked.connect(self.remove_selected)
         self.obj_item_list_sl_all_btn.clicked.connect(self.select_all)
+        self.add_scene_all_action.triggered.connect(self.add_scene)
+        self.add_scene_roots_action.triggered.connect(self.add_scene_roots)
+        self.add_scene_sets_action.triggered.connect(self.add_scene_sets)
         self.log_clear_btn.clicked.connect(self.clear_log)
+        self.log_failures_cb.toggled.connect(self.log_model.set_failures_only)
+        self.log_select_btn.clicked.connect(self.select_log_nodes)
+        self.log_view.doubleClicked.connect(self.select_log_nodes)
         self.commands_run_btn.clicked.connect(self.run_all_checked)
+        self.run_cancel_btn.clicked.connect(self.cancel_run)
+        self.run_timer.timeout.connect(self.run_step)
         for category in self.settings_list:  
             self.remove_action[category[0]].triggered.connect(partial(self.off_command_row_visibility,category[0]))
             self.category_collapse_btn[category[0]].clicked.connect(partial(self.toggle_commands_visibility, category[0]))            
-            for command in category[1]: 
-                self.check_all_action[category[0]].triggered.connect(partial(self.check_all_category,command[0]))
-                self.uncheck_action[category[0]].triggered.connect(partial(self.uncheck_all_category,command[0]))
-                self.invert_action[category[0]].triggered.connect(partial(self.invert_all_category, command[0]))
-                self.command_btn[command[0]].clicked.connect(self.clear_log)  
-                self.command_btn[command[0]].clicked.connect(partial(self.run_command,command))  
-                if len(command) == 2:                      
-                    self.command_cb[command[0]].stateChanged.connect(partial(self.update_check_box_list, command[0]))                                                      
-                    self.add_action[command[0]].triggered.connect(partial(self.on_command_row_visibility,command[0]))
-                else:
-                    self.command_cb[command[0]].stateChanged.connect(partial(self.update_check_box_list, command[0]))                    
-                    self.command_opt_btn[command[0]].clicked.connect(partial(self.show_option_window, command[0], command[2]))
-                    self.add_action[command[0]].triggered.connect(partial(self.on_command_row_visibility,command[0]))
+            self.check_all_action[category[0]].triggered.connect(partial(self.category_action,category[0],self.check_all_category))
+            self.uncheck_action[category[0]].triggered.connect(partial(self.category_action,category[0],self.uncheck_all_category))
+            self.invert_action[category[0]].triggered.connect(partial(self.category_action,category[0],self.invert_all_category))
+            self.category_option_add_menu[category[0]].aboutToShow.connect(partial(self.populate_add_menu,category[0]))
+
+    def build_category(self,category):
+        """
+        Create command rows of category, called on first expand
+        """
+        if category in self.built_categories:
+            return
+        self.built_categories.add(category)
+        for command in self.preset.commands(category):
+            self.command_cb[command[0]] = QtWidgets.QCheckBox()
+            if command[1][0] == 1:
+                self.command_cb[command[0]].setChecked(1)                       
+            self.command_label[command[0]] = QtWidgets.QLabel(command[0])
+            self.command_label[command[0]].setMinimumWidth(140)
+
+            self.command_btn[command[0]] = QtWidgets.QPushButton("Run")
+            self.command_btn[command[0]].setMaximumWidth(50)
+            self.command_btn[command[0]].setMaximumHeight(17)
+
+            self.command_sl[command[0]] = QtWidgets.QPushButton("Select All")
+            self.command_sl[command[0]].setEnabled(False)
+            self.command_sl[command[0]].setMaximumHeight(17) 
+
+            self.command_fix[command[0]] = QtWidgets.QPushButton("Fix")
+            self.command_fix[command[0]].setEnabled(False)
+            self.command_fix[command[0]].setMaximumWidth(30)
+            self.command_fix[command[0]].setMaximumHeight(17)
+            self.command_fix[command[0]].setVisible(has_fix(command[0]))
+
+            self.command_info_btn[command[0]] = QtWidgets.QPushButton()
+            self.command_info_btn[command[0]].setIcon(QtGui.QIcon(":gameFbxExporterHelp.png"))
+            self.command_info_btn[command[0]].setMaximumWidth(15)
+            self.command_info_btn[command[0]].setMaximumHeight(17)
+            self.command_info_btn[command[0]].setFlat(True)
+
+            self.commands_row_wdg[command[0]] = QtWidgets.QWidget() 
+            if command[1][1] == 0:
+                self.commands_row_wdg[command[0]].setVisible(False) 
+
+            row_layout = QtWidgets.QHBoxLayout(self.commands_row_wdg[command[0]])                             
+            row_layout.setSpacing(4) 
+            row_layout.addWidget(self.command_cb[command[0]])               
+            row_layout.addWidget(self.command_label[command[0]])
+            row_layout.addWidget(self.command_btn[command[0]])
+            row_layout.addWidget(self.command_sl[command[0]]) 
+            row_layout.addWidget(self.command_fix[command[0]])
+            # adding widgets with options
+            if len(command) > 2:                              
+                self.command_opt_btn[command[0]] = QtWidgets.QPushButton("OPT")
+                self.command_opt_btn[command[0]].setMaximumWidth(30)
+                self.command_opt_btn[command[0]].setMaximumHeight(17)
+                row_layout.addWidget(self.command_opt_btn[command[0]])  
+                self.command_opt_btn[command[0]].clicked.connect(partial(self.show_option_window, command[0], command[2]))
+            row_layout.addWidget(self.command_info_btn[command[0]])              
+            row_layout.setContentsMargins(0, 0, 0, 0)                             
+            self.commands_form_layout[category].addWidget(self.commands_row_wdg[command[0]])                    
+
+            self.command_btn[command[0]].clicked.connect(self.clear_log)  
+            self.command_btn[command[0]].clicked.connect(partial(self.run_command,command))  
+            self.command_sl[command[0]].clicked.connect(partial(self.select_command_errors,command[0]))  
+            self.command_fix[command[0]].clicked.connect(partial(self.fix_command,command))
+            self.command_cb[command[0]].stateChanged.connect(partial(self.update_check_box_list, command[0]))                                                      
+
+            # results logged before the rows existed
+            if command[0] in self.result_rows:
+                self.update_command_state(self.log_model.tree.command_result(self.result_rows[command[0]]))
+
+    def expand_next_category(self):
+        # first categories are expanded one per event loop pass once the dialog is painted
+        for category in self.settings_list:
+            if category[0] in self.built_categories:
+                continue
+            if self.expanded_rows + len(category[1]) > self.EXPANDED_ROWS:
+                return
+            self.expanded_rows += len(category[1])
+            self.toggle_commands_visibility(category[0])
+            QtCore.QTimer.singleShot(0, self.expand_next_category)
+            return
+
+    def category_action(self,category,action):
+        # works on the preset model, rows of collapsed categories don't have to exist
+        for command in self.preset.commands(category):
+            action(command[0])
+
+    def add_objects(self, objects_list):
+        added = self.obj_list.update(objects_list)
+        if added:
+            self.obj_item_list.addItems(added)
+        if len(added) < len(objects_list):
+            print("{} objects are already added".format(len(objects_list) - len(added)))
+
+    def name_patterns(self):
+        return self.obj_item_list_filter.text().split() or None
 
     def add_selected(self):      
-        selected_shapes = mc.ls(sl=1, type='mesh', dag=1) 
-        selected_obj = mc.listRelatives(selected_shapes, type='transform',p=True)      
-        if selected_obj == None:
+        selected_obj = in_scene.gather_meshes(selection=True, patterns=self.name_patterns(), long_names=False)
+        if not selected_obj:
             print "Nothing is selected"     
         else:
-            for obj in selected_obj:
-                if obj not in self.obj_list:
-                    self.obj_list.append(obj)
-                    self.obj_item_list.addItem(str(obj))
-                else:
-                    print "Object {} is already added".format(obj)
+            self.add_objects(selected_obj)
+
+    def add_scene(self):
+        self.add_objects(in_scene.gather_meshes(patterns=self.name_patterns(), long_names=False))
+
+    def add_scene_roots(self):
+        roots = mc.ls(sl=True, type="transform", long=True)
+        if not roots:
+            print "Nothing is selected"
+        else:
+            self.add_objects(in_scene.gather_meshes(roots=roots, patterns=self.name_patterns(), long_names=False))
+
+    def add_scene_sets(self):
+        sets = mc.ls(sl=True, type="objectSet")
+        if not sets:
+            print "No set is selected"
+        else:
+            self.add_objects(in_scene.gather_meshes(sets=sets, patterns=self.name_patterns(), long_names=False))
 
     def remove_selected(self):      
-        selected_indexes = self.obj_item_list.selectedIndexes()           
-        remove_list = []
-        if not selected_indexes:
+        selected_rows = sorted(set(index.row() for index in self.obj_item_list.selectedIndexes()), reverse=True)
+        if not selected_rows:
             print "Nothing is selected"
         else:           
-            for item in selected_indexes:                
-                index = self.obj_item_list.itemFromIndex(item).text() 
-                self.obj_list.remove(index)  
-                remove_list.append(index)              
-            for i in remove_list:
-                found_item = self.obj_item_list.findItems(i, QtCore.Qt.MatchExactly)
-                self.obj_item_list.takeItem(self.obj_item_list.row(found_item[0]))  
+            # rows are taken from the bottom so remaining rows keep their position
+            for row in selected_rows:
+                self.obj_list.discard(self.obj_item_list.takeItem(row).text())
 
     def select_all(self):
         for i in range(0,self.obj_item_list.count()):
@@ -420,279 +569,272 @@ class Inspector(QtWidgets.QDialog):
         if len(self.obj_list) == 0: 
             print "Error, there is no object to inspect" 
         else:
-            if len(command) == 3:                     
-                result = eval("in_commands."+str(command[0])+"(self.obj_list,command[2])")                   
-            else:                
-                result = eval("in_commands."+str(command[0])+"(self.obj_list)")    
-      
-            if result:
-                state = 0
-            else:
-                state = 1  
-
-            self.create_log_command_item(command,state) 
-
-            if state == 1:                                  
-                self.command_label[command[0]].setStyleSheet("background-color: rgba(0, 255, 67, 66);")   
-            else:
-                self.command_label[command[0]].setStyleSheet("background-color: rgba(206, 67, 67, 0.90);") 
-
-            self.log_list_layout.addWidget(self.log_list_command_wdg[command[0]])
-            self.log_list_layout.addWidget(self.log_list_objects_grpbox[command[0]]) 
-            self.log_list_command_btn[command[0]].clicked.connect(partial(self.toggle_objects_grpbox_visibility, command[0]))  
-            index_list = []
-            command_error_nodes = []  
-            for obj in self.obj_list:
-                if state == 1: 
-                    self.create_log_object_item(obj,state)
-                    self.log_list_object_form[command[0]].addWidget(self.log_list_object_wdg[obj])  
-                else:
-                    for index in result:
-                        index_list.append(index[0])
-                    if obj not in index_list:
-                        self.create_log_object_item(obj,1)
-                        self.log_list_object_form[command[0]].addWidget(self.log_list_object_wdg[obj])  
-                    else: 
-                        for index in result:
-                            if index[0] == obj:
-                                if len(index) > 2:
-                                    self.create_log_object_item(obj,0,index[1],index[2])
-                                    command_error_nodes = command_error_nodes + index[2]
-                                else:    
-                                    self.create_log_object_item(obj,0,index[1])
-                                    command_error_nodes = command_error_nodes + [obj]
-                                self.log_list_object_form[command[0]].addWidget(self.log_list_object_wdg[obj]) 
-                                self.command_sl[command[0]].setEnabled(True)  
-            if result:                                 
-                self.command_sl[command[0]].clicked.connect(partial(self.select_error_nodes, command_error_nodes))             
-                            
-    def create_log_command_item(self,command,state,error=None):           
-        self.log_list_command_wdg[command[0]] = QtWidgets.QWidget()
-        list_command_row_layout = QtWidgets.QHBoxLayout(self.log_list_command_wdg[command[0]])
-        list_command_row_layout.setContentsMargins(0, 0, 0, 0) 
-        list_command_row_layout.setSpacing(0) 
-        list_command_label = QtWidgets.QLabel(str(command[0]))
-
-        if state == 1:
-            self.log_list_command_wdg[command[0]].setStyleSheet("background-color: rgba(0, 255, 67, 66);") 
-            list_command_status = QtWidgets.QLabel(" -> SUCCESS! ")        
+            self.run_commands([command])
+
+    def run_commands(self,commands):
+        # runs in chunks from the event loop, so Maya stays responsive and results stream into the log
+        if self.scheduler is not None:
+            print "Inspection is already running"
+            return
+        self.run_stats = in_profiling.RunStats()
+        self.run_profile = cProfile.Profile() if self.profile_action.isChecked() else None
+        self.result_rows = {}
+        self.scheduler = in_scheduler.Scheduler(self.engine, self.obj_list, commands, stats=self.run_stats,
+                                                on_result=self.log_command_result,
+                                                on_progress=self.update_progress,
+                                                on_finished=self.run_finished)
+        self.run_progress_bar.setRange(0, self.scheduler.total)
+        self.run_progress_bar.setValue(0)
+        self.run_progress_bar.setVisible(True)
+        self.run_cancel_btn.setVisible(True)
+        self.run_timer.start()
+
+    def run_step(self):
+        if self.scheduler is None:
+            self.run_timer.stop()
+        elif self.run_profile is not None:
+            self.run_profile.runcall(self.scheduler.step)
         else:
-            self.log_list_command_wdg[command[0]].setStyleSheet("background-color: rgba(144, 22, 22);") 
-            list_command_status = QtWidgets.QLabel(" -> ERROR! ")   
-
-        self.log_list_command_btn[command[0]] = QtWidgets.QPushButton()
-        self.log_list_command_btn[command[0]].setIcon(QtGui.QIcon(":moveUVDown.png"))  
-        self.log_list_command_btn[command[0]].setMaximumWidth(20)       
+            self.scheduler.step()
+
+    def update_progress(self,done,total):
+        self.run_progress_bar.setValue(done)
+
+    def cancel_run(self):
+        if self.scheduler is not None:
+            self.scheduler.cancel()
+
+    def run_finished(self,cancelled):
+        self.run_timer.stop()
+        self.scheduler = None
+        self.run_progress_bar.setVisible(False)
+        self.run_cancel_btn.setVisible(False)
+        if self.run_profile is not None:
+            profile_path = os.path.join(mc.workspace(q=True, rootDirectory=True), "inspector_profile.prof")
+            self.run_profile.dump_stats(profile_path)
+            self.run_profile = None
+            print "Profile saved to {}".format(profile_path)
+        text = "Log: {}".format(self.run_stats.summary_text())
+        if cancelled:
+            text += " (cancelled)"
+        else:
+            self.record_history()
+        self.log_label.setText(text)
 
-        list_command_row_layout.addWidget(self.log_list_command_btn[command[0]]) 
-        list_command_row_layout.addWidget(list_command_label) 
-        list_command_row_layout.addWidget(list_command_status) 
+    def record_history(self):
+        # called for finished runs only, cancelled ones would show objects they didn't check as fixed
+        try:
+            if self.history is None:
+                import Inspector.core.in_history as in_history
+                self.history = in_history.History(in_history.default_path(self.presets_dir))
+            self.history.record_run(self.log_model.tree.results, mc.file(q=True, sceneName=True) or None,
+                                    preset=self.preset_name, mode=in_engine.MODE_FULL,
+                                    stats=self.run_stats.summary())
+        except Exception as error:
+            print "Error recording run into history, {}".format(error)
+
+    def log_command_result(self,command_result):
+        # called after every chunk with result merged so far
+        name = command_result.name
+        if name in self.result_rows:
+            self.log_model.update_result(self.result_rows[name])
+        else:
+            self.result_rows[name] = self.log_model.add_result(command_result)
+        self.update_command_state(command_result)
+
+    def update_command_state(self,command_result):
+        name = command_result.name
+        if name not in self.command_label:
+            # rows of collapsed category aren't built yet, build_category applies the state
+            return
+        if command_result.state == 1:                                  
+            self.command_label[name].setStyleSheet("background-color: rgba(0, 255, 67, 66);")   
+        else:
+            self.command_label[name].setStyleSheet("background-color: rgba(206, 67, 67, 0.90);") 
+        self.command_sl[name].setEnabled(not command_result.state)
+        self.command_fix[name].setEnabled(not command_result.state)
+
+    def fix_command(self,command):
+        if self.scheduler is not None:
+            print "Inspection is running"
+            return
+        row = self.result_rows.get(command[0])
+        if row is None:
+            return
+        touched, command_result = self.engine.fix(command, self.log_model.tree.command_result(row))
+        renamed = dict((old, new) for old, new in touched.items() if old != new)
+        if renamed:
+            self.rename_objects(renamed)
+            # other commands still report old names
+            for other_row in self.result_rows.values():
+                if other_row != row:
+                    self.log_model.replace_result(other_row, self.log_model.tree.command_result(other_row).renamed(renamed))
+        self.log_model.replace_result(row, command_result)
+        self.update_command_state(command_result)
+        print "{} fixed on {} objects, {} discrepancies left".format(command[0], len(touched), len(command_result.discrepancies))
+
+    def rename_objects(self,names):
+        self.obj_list.rename(names)
+        for i in range(self.obj_item_list.count()):
+            item = self.obj_item_list.item(i)
+            if item.text() in names:
+                item.setText(names[item.text()])
 
-        self.log_list_object_form[command[0]] = QtWidgets.QFormLayout()
-        self.log_list_object_form[command[0]].setContentsMargins(0, 0, 0, 0) 
-        self.log_list_object_form[command[0]].setSpacing(10) 
+    def set_backend(self,backend):
+        self.engine.backend = in_backends.get_backend(backend)
+        self.content_cache.backend = self.engine.backend
 
-        self.log_list_objects_grpbox[command[0]] = QtWidgets.QGroupBox()
-        self.log_list_objects_grpbox[command[0]].setContentsMargins(0, 0, 0, 0)                 
-        self.log_list_objects_grpbox[command[0]].setLayout(self.log_list_object_form[command[0]])                                          
-      
-    def create_log_object_item(self,obj,state,error=None,error_nodes=None):       
-        self.log_list_object_wdg[obj] = QtWidgets.QWidget()
-        self.log_list_object_wdg[obj].setContentsMargins(0, 0, 0, 0)
-        list_object_row_layout = QtWidgets.QHBoxLayout(self.log_list_object_wdg[obj]) 
-        list_object_row_layout.setSpacing(0) 
-        list_object_row_layout.setContentsMargins(0, 0, 0, 0) 
-        list_object_row_label = QtWidgets.QLabel(obj)
-
-        if state == 1:            
-            self.log_list_object_wdg[obj].setStyleSheet("background-color: rgba(0, 255, 67, 66);") 
-            list_object_status = QtWidgets.QLabel(" -> SUCCESS!    ")
-        else:
-            self.log_list_object_wdg[obj].setStyleSheet("background-color: rgba(206, 67, 67, 0.90);") 
-            list_object_status = QtWidgets.QLabel(" -> ERROR!    ") 
-            list_object_error_msg = QtWidgets.QLabel(error)         
-            list_object_error_msg.setMinimumWidth(len(error)*7)
-            self.list_object_row_btn = QtWidgets.QPushButton("Select")           
-            if error_nodes:
-                self.list_object_row_btn.clicked.connect(partial(self.select_error_nodes,error_nodes))
-            else:
-                self.list_object_row_btn.clicked.connect(partial(self.select_error_nodes,obj))
+    def set_disk_cache(self,enabled):
+        self.engine.cache = self.content_cache if enabled else self.result_cache
 
-            self.list_object_row_btn.setStyleSheet("background-color: rgba(144, 22, 22);") 
-            self.list_object_row_btn.setIcon(QtGui.QIcon(":moveShelfDown.png"))  
-             
-        list_object_row_layout.addWidget(list_object_row_label)        
-        list_object_row_layout.addWidget(list_object_status)    
+    def show_cache_stats(self):
+        QtWidgets.QMessageBox.information(self, "Cache Stats", self.content_cache.stats_text())
 
-        if state == 0:
-            list_object_row_layout.addWidget(self.list_object_row_btn)  
-            list_object_row_layout.addWidget(list_object_error_msg)
+    def clear_disk_cache(self):
+        self.content_cache.clear()
+        print "Disk cache cleared, {}".format(self.content_cache.path)
 
     def select_error_nodes(self,nodes):
         mc.select(nodes)      
 
-    def toggle_objects_grpbox_visibility(self,command):
-        if self.log_list_objects_grpbox[command].isVisible():            
-            self.log_list_objects_grpbox[command].setVisible(False)
-            self.log_list_command_btn[command].setIcon(QtGui.QIcon(":moveUVRight.png")) 
-        else:            
-            self.log_list_objects_grpbox[command].setVisible(True)
-            self.log_list_command_btn[command].setIcon(QtGui.QIcon(":moveUVDown.png")) 
+    def select_command_errors(self,command):
+        if command in self.result_rows:
+            self.select_error_nodes(self.log_model.tree.command_result(self.result_rows[command]).error_nodes())
+
+    def select_log_nodes(self,*args):
+        nodes = []
+        for index in self.log_view.selectionModel().selectedRows():
+            nodes.extend(self.log_model.data(index, inspector_log.NODES_ROLE))
+        if nodes:
+            self.select_error_nodes(nodes)
 
     def clear_log(self):
-        while self.log_list_layout.count() > 0:
-            log_item = self.log_list_layout.takeAt(0)
-            if log_item.widget():
-                log_item.widget().deleteLater()
+        self.cancel_run()
+        self.log_model.clear()
+        self.log_label.setText("Log:")
+        self.run_stats = None
+        self.result_rows = {}
         
-        for category in self.settings_list:            
-            for command in category[1]: 
-                self.command_label[command[0]].setStyleSheet("") 
-                self.command_sl[command[0]].setEnabled(False)              
+        for command in self.command_label:
+            self.command_label[command].setStyleSheet("") 
+            self.command_sl[command].setEnabled(False)              
+            self.command_fix[command].setEnabled(False)
+
+    def preset_changed(self,command,field,value):
+        # built rows follow checked and visible state of the preset model
+        if command not in self.command_cb:
+            return
+        if field == "checked":
+            self.command_cb[command].setChecked(value)
+        elif field == "visible":
+            self.commands_row_wdg[command].setVisible(value)
 
     def update_check_box_list(self,command_index,cb_state):            
-        for category in self.settings_list:            
-            for command in category[1]:                               
-                if command[0] == command_index:                     
-                    if cb_state == 2:                     
-                        command[1][0] = 1 
-                    else:
-                        command[1][0] = 0  
+        self.preset.set_checked(command_index, cb_state == 2)
 
     def check_all_category(self,command):
-        if self.commands_row_wdg[command].isVisible():
-            self.command_cb[command].setChecked(True)  
+        if self.preset.is_visible(command):
+            self.preset.set_checked(command, True)
     
     def uncheck_all_category(self,command):
-        if self.commands_row_wdg[command].isVisible():
-            self.command_cb[command].setChecked(False) 
+        if self.preset.is_visible(command):
+            self.preset.set_checked(command, False)
 
     def invert_all_category(self,command):
-        if self.commands_row_wdg[command].isVisible():
-            if self.command_cb[command].isChecked():
-                self.command_cb[command].setChecked(False) 
-            else:
-                self.command_cb[command].setChecked(True) 
+        if self.preset.is_visible(command):
+            self.preset.set_checked(command, not self.preset.is_checked(command))
  
     def off_command_row_visibility(self,category_index):
-        for category in self.settings_list:
-            if category[0] == category_index:
-                for command in category[1]:                    
-                    if self.command_cb[command[0]].isChecked():
-                        self.commands_row_wdg[command[0]].setVisible(False)
-                        self.command_cb[command[0]].setChecked(False)
-                        command[1][1] = 0    
+        for command in self.preset.commands(category_index):
+            if self.preset.is_checked(command[0]):
+                self.preset.set_visible(command[0], False)
+                self.preset.set_checked(command[0], False)
                 
     def on_command_row_visibility(self,command_index):
-        for category in self.settings_list:
-            for command in category[1]:
-                if command[0] == command_index:
-                    if self.commands_row_wdg[command_index].isVisible():
-                        pass
-                    else:
-                        self.commands_row_wdg[command_index].setVisible(True) 
-                        self.command_cb[command[0]].setChecked(True)
-                        command[1][1] = 1                                  
+        if not self.preset.is_visible(command_index):
+            self.preset.set_visible(command_index, True)
+            self.preset.set_checked(command_index, True)
 
     def toggle_commands_visibility(self,category):       
-        if self.commands_scroll_wdg[category].isVisible():
+        if not self.commands_scroll_wdg[category].isHidden():
             self.commands_scroll_wdg[category].setVisible(False)            
             self.category_collapse_btn[category].setIcon(QtGui.QIcon(":moveUVLeft.png")) 
         else:
+            self.build_category(category)
             self.commands_scroll_wdg[category].setVisible(True)              
             self.category_collapse_btn[category].setIcon(QtGui.QIcon(":moveUVDown.png"))                    
             
     def show_option_window(self,command, options_dic):        
         options_windows = {}
 
-        options_windows[command] = OptionsDialog(options_dic)
+        options_windows[command] = OptionsDialog(options_dic, self)
 
         result = options_windows[command].exec_()
 
         if result == QtWidgets.QDialog.Accepted:
-            options_windows[command].update_setting_list()
+            for key, value in options_windows[command].values().items():
+                self.preset.set_option(command, key, value)
     
     def run_all_checked(self):       
         self.clear_log()
         if self.obj_item_list.count() == 0:
             print "Error, there is no object to inspect"
         else:
-            count = 0
-            for category in self.settings_list:            
-                for command in category[1]:
-                    if self.command_cb[command[0]].isChecked():                  
-                        self.run_command(command)     
-                        count = count + 1
-            if count == 0:
+            # checked state is kept by the preset model, rows of collapsed categories may not exist
+            checked_commands = self.preset.checked_commands()
+            if len(checked_commands) == 0:
                 print "Nothing is checked"
+            else:
+                self.run_commands(checked_commands)
 
     def save_preset(self):                        
         file_path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
                                     self, "Save Preset", 
-                                    "{}".format(os.path.join(mc.internalVar(usd=True),"Inspector/presets/custom")),
-                                    "Text files (*.txt)")
+                                    os.path.join(self.presets_dir, "custom"),
+                                    "Inspector presets (*.insp);;Legacy presets (*.txt)")
         if file_path:
-            saved_preset_path = file_path
-            input_name = re.split('[_.]',os.path.split(file_path)[1])            
-            file_name = input_name[0]
-            for w in input_name[1:]:
-                if w != 'txt':
-                    file_name = file_name + " "  + w
-            
-            preset_index = [file_name,saved_preset_path]
+            file_name = in_presets.preset_name(file_path)
             # save preset
-            file_write = open(saved_preset_path,"wb")
-            cPickle.dump(self.settings_list, file_write)
-            file_write.close()
+            in_presets.save_preset(file_path, self.settings_list)
             # modify current preset
-            current_preset_write = open(self.current_preset_path,"wb")
-            cPickle.dump(preset_index, current_preset_write)
-            current_preset_write.close()
-            # set label name
+            in_presets.set_current_preset(self.presets_dir, file_name, file_path)
+            # reports and history name the saved preset from now on
+            self.preset_name = file_name
+            self.current_preset_list = [file_name, file_path]
             self.preset_label.setText(file_name)    
 
+    def export_report(self):
+        if not self.log_model.tree.results:
+            print "Log is empty, nothing to export"
+            return
+        file_path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+                                    self, "Export Report", 
+                                    os.path.join(mc.workspace(q=True, rootDirectory=True), "report.jsonl"),
+                                    "JSON Lines (*.jsonl);;CSV (*.csv)")
+        if file_path:
+            with in_reports.ReportWriter.open(file_path, preset_name=self.preset_name) as writer:
+                writer.write_results(self.log_model.tree.results)
+                if self.run_stats is not None:
+                    writer.write_stats(self.run_stats)
+
     def load_preset(self):                 
         file_path, selected_filter = QtWidgets.QFileDialog.getOpenFileName(
                                     self, "Load Preset", 
-                                    "{}".format(os.path.join(mc.internalVar(usd=True),"Inspector/presets/custom")),
-                                    "Text files (*.txt)")
+                                    os.path.join(self.presets_dir, "custom"),
+                                    "Presets (*.insp *.txt)")
         if file_path:
-            loaded_preset_path = file_path
-            input_name = re.split('[_.]' ,os.path.split(file_path)[1])            
-            file_name = input_name[0]
-            for w in input_name[1:]:
-                if w != 'txt':
-                    file_name = file_name + " "  + w
-
-            preset_index = [file_name,loaded_preset_path]
             # modify current preset
-            current_preset_write = open(self.current_preset_path,"wb")
-            cPickle.dump(preset_index, current_preset_write)
-            current_preset_write.close()     
-
-            try:
-                inspector_win.close() # pylint: disable=E0601
-                inspector_win.deleteLater()
-            except:
-                pass          
-
-            self.show_dialog() 
+            in_presets.set_current_preset(self.presets_dir, in_presets.preset_name(file_path), file_path)
+            self.reopen() 
 
     def reload_preset(self):            
-        try:
-            inspector_win.close() # pylint: disable=E0601
-            inspector_win.deleteLater()
-        except:
-            pass 
+        self.reopen() 
 
-        self.show_dialog() 
+    def reopen(self):
+        # dialog is built again from current preset
+        if self.dlg_instance is not self:
+            self.dispose()
+        self.show_dialog(reload=True)
 
 if __name__ == "__main__":
-    try:
-        inspector_win.close() # pylint: disable=E0601
-        inspector_win.deleteLater()
-    except:
-        pass
-
-    inspector_win = Inspector()
-    inspector_win.show()
+    Inspector.show_dialog(reload=True)
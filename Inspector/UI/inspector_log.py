@@ -0,0 +1,147 @@
+"""
+Item model of the Inspector log.
+Top level rows are commands, their children are objects. Object rows are
+fetched in batches while the view scrolls, so no widgets are created per object.
+"""
+
+from PySide2 import QtCore
+from PySide2 import QtGui
+
+import Inspector.core.in_log as in_log
+
+
+SUCCESS_COLOR = QtGui.QColor(0, 255, 67, 66)
+ERROR_COLOR = QtGui.QColor(206, 67, 67, 230)
+COMMAND_ERROR_COLOR = QtGui.QColor(144, 22, 22)
+
+# role returning list of nodes to select for a row
+NODES_ROLE = QtCore.Qt.UserRole + 1
+
+
+class LogModel(QtCore.QAbstractItemModel):
+
+    COLUMNS = ("Name", "Status", "Message")
+    FETCH_SIZE = 200
+
+    def __init__(self, parent=None):
+        super(LogModel, self).__init__(parent)
+        self.tree = in_log.LogTree()
+        self._fetched = []
+
+    # internal id 0 marks command rows, object rows store their command row + 1
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        if parent.isValid():
+            return self.createIndex(row, column, parent.row() + 1)
+        return self.createIndex(row, column, 0)
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == 0:
+            return QtCore.QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return self.tree.command_count()
+        if parent.internalId() == 0 and parent.column() == 0:
+            return self._fetched[parent.row()]
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(self.COLUMNS)
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return self.tree.command_count() > 0
+        if parent.internalId() == 0 and parent.column() == 0:
+            return self.tree.object_count(parent.row()) > 0
+        return False
+
+    def canFetchMore(self, parent):
+        if not parent.isValid() or parent.internalId() != 0:
+            return False
+        return self._fetched[parent.row()] < self.tree.object_count(parent.row())
+
+    def fetchMore(self, parent):
+        command_row = parent.row()
+        total = self.tree.object_count(command_row)
+        count = min(self.FETCH_SIZE, total - self._fetched[command_row])
+        if count <= 0:
+            return
+        first = self._fetched[command_row]
+        self.beginInsertRows(parent, first, first + count - 1)
+        self._fetched[command_row] += count
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.internalId() == 0:
+            result = self.tree.command_result(index.row())
+            if role == QtCore.Qt.DisplayRole:
+                return (result.name, " -> SUCCESS! " if result.state else " -> ERROR! ", "")[index.column()]
+            if role == QtCore.Qt.BackgroundRole:
+                return SUCCESS_COLOR if result.state else COMMAND_ERROR_COLOR
+            if role == NODES_ROLE:
+                return result.error_nodes()
+            return None
+
+        row = self.tree.object_row(index.internalId() - 1, index.row())
+        if role == QtCore.Qt.DisplayRole:
+            return (row.obj, " -> SUCCESS! " if row.state else " -> ERROR! ", row.message)[index.column()]
+        if role == QtCore.Qt.BackgroundRole:
+            return SUCCESS_COLOR if row.state else ERROR_COLOR
+        if role == NODES_ROLE:
+            return row.error_nodes()
+        return None
+
+    def add_result(self, command_result):
+        row = self.tree.command_count()
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        self.tree.add_result(command_result)
+        self._fetched.append(0)
+        self.endInsertRows()
+        return row
+
+    def update_result(self, row):
+        """
+        Result of command row got more objects, new object rows are fetched when the view asks
+        """
+        self.tree.refresh(row)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+        # keep first page filled, expanded rows wouldn't ask for it on their own
+        parent = self.index(row, 0)
+        if self._fetched[row] < self.FETCH_SIZE and self.canFetchMore(parent):
+            self.fetchMore(parent)
+
+    def replace_result(self, row, command_result):
+        """
+        Result of command row was replaced, fetched object rows are dropped and the first page fetched again
+        """
+        parent = self.index(row, 0)
+        if self._fetched[row]:
+            self.beginRemoveRows(parent, 0, self._fetched[row] - 1)
+            self._fetched[row] = 0
+            self.endRemoveRows()
+        self.tree.replace_result(row, command_result)
+        self.dataChanged.emit(parent, self.index(row, len(self.COLUMNS) - 1))
+        if self.canFetchMore(parent):
+            self.fetchMore(parent)
+
+    def set_failures_only(self, failures_only):
+        self.beginResetModel()
+        self.tree.set_failures_only(failures_only)
+        self._fetched = [0] * self.tree.command_count()
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self.tree.clear()
+        self._fetched = []
+        self.endResetModel()
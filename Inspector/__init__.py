@@ -1 +1 @@
-import checks,UI
\ No newline at end of file
+import checks,core
\ No newline at end of file
@@ -1 +0,0 @@
-import in_commands
\ No newline at end of file
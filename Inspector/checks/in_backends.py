@@ -0,0 +1,304 @@
+"""
+Mesh query backends used by MeshData.
+CmdsBackend goes through maya.cmds, OpenMayaBackend walks meshes with
+maya.api.OpenMaya and FakeBackend serves pure Python meshes so checks can be
+exercised and benchmarked without Maya. All of them return the same values:
+triangle count, lamina face indices as array("i"), uv shell count, history length,
+mesh Topology arrays, vertices with locked normals and local transform matrix.
+fingerprint() hashes mesh topology, points, UVs and their face assignment for the
+persistent result cache.
+"""
+
+import re
+import hashlib
+from array import array
+
+from in_topology import Topology
+
+
+FACE_RE = re.compile(r"\.f\[(\d+)(?::(\d+))?\]$")
+IDENTITY = (1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+
+
+def lamina_indices(face_vertices):
+    """
+    Indices of faces that share all their vertices with another face
+    """
+    faces = {}
+    for index, vertices in enumerate(face_vertices):
+        faces.setdefault(tuple(sorted(vertices)), []).append(index)
+    lamina = array("i")
+    for indices in faces.values():
+        if len(indices) > 1:
+            lamina.extend(indices)
+    return array("i", sorted(lamina))
+
+
+def face_indices(components):
+    """
+    Convert polyInfo face strings like "pCube1.f[3]" or "pCube1.f[3:5]" to array of indices
+    """
+    indices = array("i")
+    for component in components or []:
+        match = FACE_RE.search(component)
+        if match is None:
+            continue
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        indices.extend(range(start, end + 1))
+    return indices
+
+
+def content_hash(*parts):
+    """
+    Hex digest of mesh data parts (strings or arrays)
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, array):
+            part = part.tostring()
+        digest.update(str(len(part)))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class MeshBackend(object):
+    """
+    Base backend, subclasses implement one method per MeshData attribute
+    """
+    name = None
+
+    def triangles(self, obj):
+        raise NotImplementedError
+
+    def lamina_faces(self, obj):
+        raise NotImplementedError
+
+    def uv_shells(self, obj):
+        raise NotImplementedError
+
+    def history(self, obj):
+        raise NotImplementedError
+
+    def topology(self, obj):
+        raise NotImplementedError
+
+    def locked_normals(self, obj):
+        raise NotImplementedError
+
+    def transform(self, obj):
+        raise NotImplementedError
+
+    def fingerprint(self, obj):
+        raise NotImplementedError
+
+
+class CmdsBackend(MeshBackend):
+    name = "cmds"
+
+    def __init__(self):
+        import maya.cmds as mc
+        self.mc = mc
+
+    def triangles(self, obj):
+        return self.mc.polyEvaluate(obj, t=True)
+
+    def lamina_faces(self, obj):
+        return face_indices(self.mc.polyInfo(obj, lf=True))
+
+    def bulk_lamina_faces(self, objects_list):
+        """
+        One polyInfo call for all objects, faces are split back by their node name.
+        Returns None if components can't be matched back to the given objects.
+        """
+        try:
+            faces = self.mc.polyInfo(objects_list, lf=True)
+        except RuntimeError:
+            return None
+        names = {}
+        for obj in objects_list:
+            names[obj] = obj
+            names.setdefault(obj.rsplit("|", 1)[-1], obj)
+        grouped = {}
+        for face in faces or []:
+            obj = names.get(face.split(".", 1)[0])
+            if obj is None:
+                return None
+            grouped.setdefault(obj, []).append(face)
+        return dict((obj, face_indices(grouped.get(obj))) for obj in objects_list)
+
+    def uv_shells(self, obj):
+        return self.mc.polyEvaluate(obj, uvShell=True)
+
+    def history(self, obj):
+        return len(self.mc.listHistory(obj))
+
+    def mesh_fn(self, obj):
+        import maya.api.OpenMaya as om
+        selection = om.MSelectionList()
+        selection.add(obj)
+        dag_path = selection.getDagPath(0)
+        dag_path.extendToShape()
+        return om.MFnMesh(dag_path)
+
+    def topology(self, obj):
+        # maya.cmds can't query UV ids per face in one call, face-vertex arrays are read from MFnMesh
+        mesh_fn = self.mesh_fn(obj)
+        counts, vertices = mesh_fn.getVertices()
+        points = array("d")
+        for point in mesh_fn.getPoints():
+            points.extend((point.x, point.y, point.z))
+        uv_set = mesh_fn.currentUVSetName()
+        if not uv_set or mesh_fn.numUVs(uv_set) == 0:
+            return Topology(counts, vertices, points)
+        us, vs = mesh_fn.getUVs(uv_set)
+        uvs = array("d")
+        for u, v in zip(us, vs):
+            uvs.extend((u, v))
+        uv_counts, uv_ids = mesh_fn.getAssignedUVs(uv_set)
+        return Topology(counts, vertices, points, uv_counts, uv_ids, uvs)
+
+    def locked_normals(self, obj):
+        frozen = self.mc.polyNormalPerVertex("{}.vtx[*]".format(obj), q=True, freezeNormal=True) or []
+        return array("i", [index for index, locked in enumerate(frozen) if locked])
+
+    def transform(self, obj):
+        return self.mc.xform(obj, q=True, matrix=True, objectSpace=True)
+
+    def fingerprint(self, obj):
+        mc = self.mc
+        counts = mc.polyEvaluate(obj)
+        topology = mc.polyInfo(obj, faceToVertex=True) or []
+        points = mc.xform("{}.vtx[*]".format(obj), q=True, objectSpace=True, translation=True) or []
+        uvs = []
+        uv_set = ""
+        uv_counts = uv_ids = array("i")
+        if counts.get("uvcoord"):
+            uvs = mc.polyEditUV("{}.map[*]".format(obj), q=True) or []
+            # overlapping and flipped UV checks read which UVs faces use, not only UV coordinates
+            uv_set = (mc.polyUVSet(obj, q=True, currentUVSet=True) or [""])[0]
+            uv_counts, uv_ids = self.mesh_fn(obj).getAssignedUVs(uv_set)
+            uv_counts, uv_ids = array("i", uv_counts), array("i", uv_ids)
+        return content_hash(repr(sorted(counts.items())), "".join(topology), array("d", points), array("d", uvs),
+                            uv_set.encode("utf-8"), uv_counts, uv_ids)
+
+
+class OpenMayaBackend(CmdsBackend):
+    """
+    Geometry queries through MFnMesh arrays, history, normals and transforms still go through maya.cmds
+    """
+    name = "OpenMaya"
+
+    def __init__(self):
+        super(OpenMayaBackend, self).__init__()
+        import maya.api.OpenMaya as om
+        self.om = om
+
+    def triangles(self, obj):
+        counts, vertices = self.mesh_fn(obj).getTriangles()
+        return int(sum(counts))
+
+    def lamina_faces(self, obj):
+        counts, vertices = self.mesh_fn(obj).getVertices()
+        face_vertices = []
+        offset = 0
+        for count in counts:
+            face_vertices.append(vertices[offset:offset + count])
+            offset += count
+        return lamina_indices(face_vertices)
+
+    def bulk_lamina_faces(self, objects_list):
+        return None
+
+    def fingerprint(self, obj):
+        mesh_fn = self.mesh_fn(obj)
+        counts, vertices = mesh_fn.getVertices()
+        points = array("d")
+        for point in mesh_fn.getPoints():
+            points.extend((point.x, point.y, point.z))
+        uv_set = mesh_fn.currentUVSetName()
+        us, vs = mesh_fn.getUVs(uv_set)
+        uv_counts, uv_ids = mesh_fn.getAssignedUVs(uv_set)
+        return content_hash(array("i", counts), array("i", vertices), points, array("f", us), array("f", vs),
+                            uv_set.encode("utf-8"), array("i", uv_counts), array("i", uv_ids))
+
+    def uv_shells(self, obj):
+        mesh_fn = self.mesh_fn(obj)
+        uv_set = mesh_fn.currentUVSetName()
+        if mesh_fn.numUVs(uv_set) == 0:
+            return 0
+        return mesh_fn.getUvShellsIds(uv_set)[0]
+
+
+class FakeMesh(object):
+    """
+    Pure Python mesh description served by FakeBackend
+    """
+    __slots__ = ("face_vertices", "uv_shells", "history", "points", "face_uvs", "locked_normals", "matrix")
+
+    def __init__(self, face_vertices, uv_shells=1, history=1, points=(), face_uvs=None, locked_normals=(),
+                 matrix=IDENTITY):
+        self.face_vertices = face_vertices
+        self.uv_shells = uv_shells
+        self.history = history
+        self.points = points
+        # (u, v) of every face corner, None for mesh without UVs
+        self.face_uvs = face_uvs
+        self.locked_normals = locked_normals
+        self.matrix = matrix
+
+    @classmethod
+    def cube(cls, **kwargs):
+        faces = [(0, 1, 3, 2), (2, 3, 5, 4), (4, 5, 7, 6), (6, 7, 1, 0), (1, 7, 5, 3), (6, 0, 2, 4)]
+        points = [(-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (-0.5, 0.5, 0.5), (0.5, 0.5, 0.5),
+                  (-0.5, 0.5, -0.5), (0.5, 0.5, -0.5), (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5)]
+        # faces laid out in a column of UV space
+        face_uvs = [[(0.0, row / 6.0), (1.0, row / 6.0), (1.0, (row + 1) / 6.0), (0.0, (row + 1) / 6.0)]
+                    for row in range(6)]
+        kwargs.setdefault("points", points)
+        kwargs.setdefault("face_uvs", face_uvs)
+        return cls(faces, **kwargs)
+
+
+class FakeBackend(MeshBackend):
+    name = "fake"
+
+    def __init__(self, meshes=None):
+        self.meshes = meshes if meshes is not None else {}
+
+    def triangles(self, obj):
+        return sum(len(face) - 2 for face in self.meshes[obj].face_vertices)
+
+    def lamina_faces(self, obj):
+        return lamina_indices(self.meshes[obj].face_vertices)
+
+    def uv_shells(self, obj):
+        return self.meshes[obj].uv_shells
+
+    def history(self, obj):
+        return self.meshes[obj].history
+
+    def topology(self, obj):
+        mesh = self.meshes[obj]
+        return Topology.from_faces(mesh.face_vertices, mesh.points, mesh.face_uvs)
+
+    def locked_normals(self, obj):
+        return array("i", self.meshes[obj].locked_normals)
+
+    def transform(self, obj):
+        return list(self.meshes[obj].matrix)
+
+    def fingerprint(self, obj):
+        mesh = self.meshes[obj]
+        return content_hash(repr(mesh.face_vertices), repr(mesh.points), repr(mesh.face_uvs), str(mesh.uv_shells))
+
+
+BACKENDS = {
+    CmdsBackend.name: CmdsBackend,
+    OpenMayaBackend.name: OpenMayaBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+
+def get_backend(name=None):
+    return BACKENDS[name or CmdsBackend.name]()
@@ -1,52 +1,173 @@
-import maya.cmds as mc
+import in_naming
+import in_topology
+from in_mesh_data import MeshData
+from in_registry import check, fix, get
+from in_discrepancy import Discrepancy
+
+def get_mesh_data(command, objects_list, mesh_data):
+    # checks called directly query their own mesh data
+    if mesh_data is None:
+        mesh_data = MeshData()
+        mesh_data.collect(objects_list, get(command).requires)
+    return mesh_data
+
+def component_discrepancies(objects_list,mesh_data,attribute,find,error,component,nodes=True):
+    # topology checks share one Topology per object, find returns failing component indices
+    discrepancy_list = []
+    for obj in objects_list:
+        indices = find(mesh_data.get(obj, attribute))
+        if indices:
+            if not nodes:
+                discrepancy_list.append(Discrepancy(obj,error,(len(indices),)))
+                continue
+            discrepancy_list.append(Discrepancy(obj,error,(len(indices),),component,indices))
+    return discrepancy_list
  
-def triangle_count(objects_list,settings):
+@check(category="geometry", options=[{"max": ["QLineEdit", 5000]}], requires=("triangles",))
+def triangle_count(objects_list,settings,mesh_data=None):
     max_count = settings["options"][0]["max"][1]         
     discrepancy_list = []  
+    mesh_data = get_mesh_data("triangle_count", objects_list, mesh_data)
     for obj in objects_list:
-        count = mc.polyEvaluate(obj, t=True)             
+        count = mesh_data.get(obj, "triangles")             
         if count > int(max_count):                      
-            error = "Object has {} triangles and exceeds {} maximum count".format(count,max_count)
-            discrepancy_list.append([obj,error])         
+            error = "Object has {} triangles and exceeds {} maximum count"
+            discrepancy_list.append(Discrepancy(obj,error,(count,max_count)))         
     return discrepancy_list
 
-def lamina_faces(objects_list):  
+@check(category="geometry", requires=("lamina_faces",))
+def lamina_faces(objects_list,mesh_data=None,nodes=True):  
     discrepancy_list = []      
+    mesh_data = get_mesh_data("lamina_faces", objects_list, mesh_data)
     for obj in objects_list:
-        lamina_faces = mc.polyInfo(obj, lf=True)
-        if lamina_faces != None:
+        faces = mesh_data.get(obj, "lamina_faces")
+        if faces:
             error = "Object has lamina faces"
-            discrepancy_list.append([obj,error,lamina_faces])
+            if not nodes:
+                # count only runs skip face indices
+                discrepancy_list.append(Discrepancy(obj,error))
+                continue
+            discrepancy_list.append(Discrepancy(obj,error,component="f",indices=faces))
     return discrepancy_list           
 
-def missing_UVS(objects_list):
+@fix("lamina_faces")
+def cleanup_lamina_faces(discrepancy_list,settings=None):
+    import maya.cmds as mc
+    import maya.mel as mel
+    objects_list = [index[0] for index in discrepancy_list]
+    # polyCleanup on selection, only "lamina faces" option is on, one face of every lamina pair is kept
+    mc.select(objects_list, replace=True)
+    mel.eval('polyCleanupArgList 4 { "0","1","1","0","0","0","0","0","0","1e-05","0","1e-05","0","1e-05","0","-1","1","0" }')
+    mc.select(clear=True)
+    return objects_list
+
+@check(category="geometry", requires=("topology",))
+def non_manifold(objects_list,mesh_data=None,nodes=True):
+    mesh_data = get_mesh_data("non_manifold", objects_list, mesh_data)
+    error = "Object has {} non-manifold vertices"
+    return component_discrepancies(objects_list,mesh_data,"topology",in_topology.non_manifold_vertices,error,"vtx",nodes)
+
+@check(category="geometry", options=[{"area": ["QLineEdit", 1e-06]}], requires=("topology",))
+def zero_area_faces(objects_list,settings,mesh_data=None,nodes=True):
+    tolerance = float(settings["options"][0]["area"][1])
+    mesh_data = get_mesh_data("zero_area_faces", objects_list, mesh_data)
+    find = lambda topology: in_topology.zero_area_faces(topology, tolerance)
+    error = "Object has {} zero area faces"
+    return component_discrepancies(objects_list,mesh_data,"topology",find,error,"f",nodes)
+
+@check(category="geometry", options=[{"length": ["QLineEdit", 1e-05]}], requires=("topology",))
+def zero_length_edges(objects_list,settings,mesh_data=None,nodes=True):
+    tolerance = float(settings["options"][0]["length"][1])
+    mesh_data = get_mesh_data("zero_length_edges", objects_list, mesh_data)
+    find = lambda topology: in_topology.zero_length_vertices(topology, tolerance)
+    # edges are reported by their vertices, face-vertex arrays don't carry Maya edge ids
+    error = "Object has {} vertices on zero length edges"
+    return component_discrepancies(objects_list,mesh_data,"topology",find,error,"vtx",nodes)
+
+@check(category="geometry", requires=("topology",))
+def ngons(objects_list,mesh_data=None,nodes=True):
+    mesh_data = get_mesh_data("ngons", objects_list, mesh_data)
+    error = "Object has {} faces with more than 4 sides"
+    return component_discrepancies(objects_list,mesh_data,"topology",in_topology.ngons,error,"f",nodes)
+
+@check(category="geometry", requires=("locked_normals",))
+def locked_normals(objects_list,mesh_data=None,nodes=True):
+    mesh_data = get_mesh_data("locked_normals", objects_list, mesh_data)
+    error = "Object has {} vertices with locked normals"
+    return component_discrepancies(objects_list,mesh_data,"locked_normals",lambda indices: indices,error,"vtx",nodes)
+
+@check(category="uvs", requires=("uv_shells",))
+def missing_UVS(objects_list,mesh_data=None):
     discrepancy_list  = []   
+    mesh_data = get_mesh_data("missing_UVS", objects_list, mesh_data)
     for obj in objects_list:        
-        if mc.polyEvaluate(obj, uvShell=True) == 0:
+        if mesh_data.get(obj, "uv_shells") == 0:
             error = "Object has no uv shells"
-            discrepancy_list.append([obj,error])  
+            discrepancy_list.append(Discrepancy(obj,error))  
     return discrepancy_list
 
+@fix("missing_UVS")
+def auto_project_uvs(discrepancy_list,settings=None):
+    import maya.cmds as mc
+    objects_list = [index[0] for index in discrepancy_list]
+    mc.polyAutoProjection(objects_list, layoutMethod=0, layout=2, percentageSpace=0.2, createNewMap=False)
+    return objects_list
+
+@check(category="uvs", requires=("topology",))
+def overlapping_UVS(objects_list,mesh_data=None,nodes=True):
+    mesh_data = get_mesh_data("overlapping_UVS", objects_list, mesh_data)
+    error = "Object has {} faces with overlapping uvs"
+    return component_discrepancies(objects_list,mesh_data,"topology",in_topology.overlapping_uv_faces,error,"f",nodes)
+
+@check(category="uvs", requires=("topology",))
+def flipped_UVS(objects_list,mesh_data=None,nodes=True):
+    mesh_data = get_mesh_data("flipped_UVS", objects_list, mesh_data)
+    error = "Object has {} faces with flipped uvs"
+    return component_discrepancies(objects_list,mesh_data,"topology",in_topology.flipped_uv_faces,error,"f",nodes)
+
+@check(category="naming", options=[{"first_prefix_": ["QLineEdit", "mdl_"]}, {"second_prefix": ["QLineEdit", "char_"]}], parallel_safe=True)
 def naming_convention(objects_list,settings):  
-    discrepancy_list  = [] 
-    prefixes = ""
-    error_obj = []
-    for p in settings["options"]:
-        prefixes = prefixes + p.values()[0][1]  
-        for obj in objects_list:                     
-            if prefixes not in obj:
-                error = "Object name {} doesn`t have {} prefix".format(obj,prefixes)  
-                if obj not in error_obj:         
-                    discrepancy_list.append([obj,error])        
-        for index in discrepancy_list:
-            error_obj.append(index[0])
-    return discrepancy_list
+    rules = in_naming.compile_rules(settings["options"])
+    return in_naming.validate(objects_list, rules)
+
+@fix("naming_convention")
+def rename_to_prefix(discrepancy_list,settings):
+    import maya.cmds as mc
+    rules = in_naming.compile_rules(settings["options"])
+    renamed = {}
+    for index in discrepancy_list:
+        # names failing regex or glob patterns can't be fixed automatically
+        if getattr(index, "template", None) != in_naming.PREFIX_ERROR:
+            continue
+        new_name = in_naming.prefixed_name(index[0], rules)
+        if new_name is not None:
+            renamed[index[0]] = mc.rename(index[0], new_name)
+    return renamed
 
-def history(objects_list):
+@check(category="other", requires=("history",))
+def history(objects_list,mesh_data=None):
     discrepancy_list  = []  
+    mesh_data = get_mesh_data("history", objects_list, mesh_data)
     for obj in objects_list:
-        if len(mc.listHistory(obj)) > 1:
+        if mesh_data.get(obj, "history") > 1:
             error = "Object has history"
-            discrepancy_list.append([obj,error])
+            discrepancy_list.append(Discrepancy(obj,error))
     return discrepancy_list  
 
+@fix("history")
+def delete_history(discrepancy_list,settings=None):
+    import maya.cmds as mc
+    objects_list = [index[0] for index in discrepancy_list]
+    mc.delete(objects_list, constructionHistory=True)
+    return objects_list
+
+@check(category="other", requires=("transform",))
+def unfrozen_transforms(objects_list,mesh_data=None):
+    discrepancy_list  = []  
+    mesh_data = get_mesh_data("unfrozen_transforms", objects_list, mesh_data)
+    for obj in objects_list:
+        if in_topology.unfrozen(mesh_data.get(obj, "transform")):
+            error = "Object has unfrozen transforms"
+            discrepancy_list.append(Discrepancy(obj,error))
+    return discrepancy_list
+  
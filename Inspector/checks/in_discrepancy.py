@@ -0,0 +1,107 @@
+"""
+Compact discrepancy returned by checks.
+Keeps the failing object, a message template with its parameters and component
+indices as an integer array. Component names are built only when asked for,
+in ranged form ("pCube1.f[0:99]"). Discrepancy still reads like the legacy
+[obj, error, nodes] list, so code indexing results keeps working.
+"""
+
+from array import array
+
+
+def index_ranges(indices):
+    """
+    Sorted (start, end) ranges of consecutive indices
+    """
+    ranges = []
+    for index in sorted(set(indices)):
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1][1] = index
+        else:
+            ranges.append([index, index])
+    return [tuple(index_range) for index_range in ranges]
+
+
+class Discrepancy(object):
+    __slots__ = ("obj", "template", "params", "component", "indices")
+
+    def __init__(self, obj, template, params=(), component=None, indices=None):
+        self.obj = obj
+        self.template = template
+        self.params = tuple(params)
+        # component type ("f", "e", "vtx", "map") of indices, None when the object itself is the error node
+        self.component = component
+        self.indices = indices if indices is None or isinstance(indices, array) else array("i", indices)
+
+    @property
+    def message(self):
+        if self.params:
+            return self.template.format(*self.params)
+        return self.template
+
+    def nodes(self):
+        """
+        Error nodes to select, components in ranged form
+        """
+        if self.component is None:
+            return [self.obj]
+        nodes = []
+        for start, end in index_ranges(self.indices):
+            if start == end:
+                nodes.append("{}.{}[{}]".format(self.obj, self.component, start))
+            else:
+                nodes.append("{}.{}[{}:{}]".format(self.obj, self.component, start, end))
+        return nodes
+
+    def node_count(self):
+        if self.component is None:
+            return 1
+        return len(self.indices)
+
+    def renamed(self, obj):
+        return Discrepancy(obj, self.template, self.params, self.component, self.indices)
+
+    def without_nodes(self):
+        return Discrepancy(self.obj, self.template, self.params)
+
+    def to_list(self):
+        if self.component is None:
+            return [self.obj, self.message]
+        return [self.obj, self.message, self.nodes()]
+
+    # legacy list protocol, [obj, error] or [obj, error, nodes]
+    def __len__(self):
+        if self.component is None:
+            return 2
+        return 3
+
+    def __getitem__(self, index):
+        if index == 0:
+            return self.obj
+        if index == 1:
+            return self.message
+        return self.to_list()[index]
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    # equal to discrepancies and legacy lists with the same [obj, error, nodes]
+    def __eq__(self, other):
+        if isinstance(other, Discrepancy):
+            return self.to_list() == other.to_list()
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return NotImplemented
+        return not equal
+
+    def __hash__(self):
+        # equal discrepancies share object and message, nodes aren't built for hashing
+        return hash((self.obj, self.message))
+
+    def __repr__(self):
+        return "Discrepancy({!r}, {!r})".format(self.obj, self.message)
@@ -0,0 +1,89 @@
+"""
+Mesh data collector shared by checks.
+Gathers every attribute needed by a run in a single pass per object (or a single
+bulk call where the backend allows it) and keeps it for the duration of the run.
+"""
+
+import time
+
+import in_backends
+
+
+ATTRIBUTES = ("triangles", "lamina_faces", "uv_shells", "history", "topology", "locked_normals", "transform")
+
+
+class MeshData(object):
+    """
+    Per run cache of mesh attributes keyed by object and attribute name
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._data = {}
+        # backend queries made and seconds spent querying each object, read by profiling
+        self.calls = 0
+        self.object_seconds = {}
+        self.bulk_seconds = 0.0
+        # attribute -> [seconds, objects] of its queries, read by core.in_planner cost model
+        self.attribute_seconds = {}
+
+    @property
+    def backend(self):
+        # default backend is created on first query, runs without mesh data never touch Maya
+        if self._backend is None:
+            self._backend = in_backends.get_backend()
+        return self._backend
+
+    def collect(self, objects_list, attributes):
+        attributes = [attr for attr in attributes if attr in ATTRIBUTES]
+        per_object = []
+        for attr in attributes:
+            missing = [obj for obj in objects_list if attr not in self._data.get(obj, ())]
+            if not missing:
+                continue
+            bulk = None
+            bulk_query = getattr(self.backend, "bulk_" + attr, None)
+            if bulk_query is not None and len(missing) > 1:
+                start = time.time()
+                bulk = bulk_query(missing)
+                self.calls += 1
+                seconds = time.time() - start
+                self.bulk_seconds += seconds
+                self._add_seconds(attr, seconds, len(missing))
+            if bulk is None:
+                per_object.append(attr)
+            else:
+                for obj in missing:
+                    self._data.setdefault(obj, {})[attr] = bulk[obj]
+
+        if per_object:
+            queries = [(attr, getattr(self.backend, attr)) for attr in per_object]
+            object_seconds = self.object_seconds
+            for obj in objects_list:
+                start = time.time()
+                data = self._data.setdefault(obj, {})
+                for attr, query in queries:
+                    if attr not in data:
+                        query_start = time.time()
+                        data[attr] = query(obj)
+                        self.calls += 1
+                        self._add_seconds(attr, time.time() - query_start, 1)
+                object_seconds[obj] = object_seconds.get(obj, 0.0) + time.time() - start
+
+    def _add_seconds(self, attr, seconds, objects):
+        total = self.attribute_seconds.setdefault(attr, [0.0, 0])
+        total[0] += seconds
+        total[1] += objects
+
+    def get(self, obj, attribute):
+        data = self._data.get(obj)
+        if data is None or attribute not in data:
+            self.collect([obj], [attribute])
+        return self._data[obj][attribute]
+
+    def clear(self):
+        self._data = {}
+        self.calls = 0
+        self.object_seconds = {}
+        self.bulk_seconds = 0.0
+        self.attribute_seconds = {}
@@ -0,0 +1,125 @@
+"""
+Naming rules used by naming_convention.
+Preset option values are compiled once into ordered rules and all names are
+validated in a single pass. Plain values are prefixes concatenated in option
+order, values starting with "re:" are regular expressions and values starting
+with "glob:" are glob patterns matched against the whole name. Invalid regular
+expressions fail every name with a message pointing at the pattern.
+"""
+
+import re
+import fnmatch
+from collections import OrderedDict
+
+from in_discrepancy import Discrepancy
+
+
+REGEX_TAG = "re:"
+GLOB_TAG = "glob:"
+
+PREFIX_ERROR = "Object name {} doesn`t have {} prefix"
+PATTERN_ERROR = "Object name {} doesn`t match {} pattern"
+INVALID_PATTERN_ERROR = "Object name {} can`t be checked, invalid pattern {}"
+
+# rule sets of the last option values used, oldest are dropped first
+MAX_COMPILED_RULES = 8
+_compiled_rules = OrderedDict()
+
+
+class NamingRule(object):
+    __slots__ = ("label", "error", "match")
+
+    def __init__(self, label, error, match):
+        self.label = label
+        self.error = error
+        self.match = match
+
+
+def _prefix_match(prefixes):
+    return lambda name: prefixes in name
+
+
+def _never_match(name):
+    return False
+
+
+def _regex_rule(pattern):
+    try:
+        return NamingRule(pattern, PATTERN_ERROR, re.compile(pattern).search)
+    except re.error as error:
+        return NamingRule("{} ({})".format(pattern, error), INVALID_PATTERN_ERROR, _never_match)
+
+
+def option_values(options):
+    values = []
+    for opt in options:
+        value = opt.values()[0][1]
+        if not isinstance(value, basestring):
+            value = str(value)
+        values.append(value)
+    return tuple(values)
+
+
+def compile_rules(options):
+    """
+    Return rules for naming_convention options, compiled rules are reused while options don't change
+    """
+    values = option_values(options)
+    rules = _compiled_rules.get(values)
+    if rules is None:
+        rules = []
+        prefixes = None
+        for value in values:
+            if value.startswith(REGEX_TAG):
+                rules.append(_regex_rule(value[len(REGEX_TAG):]))
+            elif value.startswith(GLOB_TAG):
+                pattern = value[len(GLOB_TAG):]
+                rules.append(NamingRule(pattern, PATTERN_ERROR, re.compile(fnmatch.translate(pattern)).match))
+            elif value or prefixes is None:
+                # empty prefix line adds nothing to concatenated prefixes
+                prefixes = (prefixes or "") + value
+                rules.append(NamingRule(prefixes, PREFIX_ERROR, _prefix_match(prefixes)))
+        while len(_compiled_rules) >= MAX_COMPILED_RULES:
+            _compiled_rules.popitem(last=False)
+        _compiled_rules[values] = rules
+    return rules
+
+
+def prefixed_name(obj, rules):
+    """
+    Short name (namespace kept) of obj with full prefix of prefix rules, partial prefix it starts with is replaced.
+    None when rules have no prefix.
+    """
+    labels = [rule.label for rule in rules if rule.error == PREFIX_ERROR and rule.label]
+    if not labels:
+        return None
+    name = obj.rsplit("|", 1)[-1]
+    namespace, sep, name = name.rpartition(":")
+    for label in reversed(labels):
+        if name.startswith(label):
+            name = name[len(label):]
+            break
+    return namespace + sep + labels[-1] + name
+
+
+def validate(objects_list, rules):
+    """
+    Check every name against rules in order, name is reported once for the first rule it breaks.
+    Discrepancies are grouped by rule, in object order inside a rule.
+    """
+    failed = [[] for rule in rules]
+    seen = set()
+    for obj in objects_list:
+        if obj in seen:
+            continue
+        seen.add(obj)
+        for index, rule in enumerate(rules):
+            if not rule.match(obj):
+                failed[index].append(obj)
+                break
+
+    discrepancy_list = []
+    for rule, objects in zip(rules, failed):
+        for obj in objects:
+            discrepancy_list.append(Discrepancy(obj, rule.error, (obj, rule.label)))
+    return discrepancy_list
@@ -0,0 +1,167 @@
+"""
+Registry of check commands.
+Checks declare themselves with the @check decorator: name, category, default
+options (in preset format), mesh data they read, whether results can be cached
+(pure) and whether they can run off the main thread (parallel_safe).
+Check modules are discovered in Inspector/checks (in_commands.py and *_checks.py)
+and in studio folders listed in INSPECTOR_CHECK_PATHS, and only imported when
+a check they may contain is looked up.
+"""
+
+import os
+import imp
+import glob
+import inspect
+
+from in_discrepancy import Discrepancy
+
+
+CHECK_PATHS_ENV = "INSPECTOR_CHECK_PATHS"
+CHECKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILTIN_MODULES = ("Inspector.checks.in_commands",)
+
+_checks = {}
+_fixes = {}
+_pending = []
+_imported = []
+_discovered = False
+
+
+class CheckSpec(object):
+    __slots__ = ("name", "function", "category", "options", "requires", "pure", "parallel_safe", "module",
+                 "accepts_nodes")
+
+    def __init__(self, name, function, category=None, options=None, requires=(), pure=True, parallel_safe=False):
+        self.name = name
+        self.function = function
+        self.category = category
+        self.options = options
+        self.requires = tuple(requires)
+        self.pure = pure
+        self.parallel_safe = parallel_safe
+        self.module = function.__module__
+        # checks taking nodes=False can skip building error node lists
+        self.accepts_nodes = "nodes" in inspect.getargspec(function).args
+
+    def default_settings(self):
+        if self.options is None:
+            return None
+        return {"options": [dict((key, list(value)) for key, value in opt.items()) for opt in self.options]}
+
+    def run(self, objects_list, settings=None, mesh_data=None, nodes=True):
+        """
+        Discrepancy list of the check, without error node lists when nodes is False
+        """
+        args = [objects_list]
+        if self.options is not None or settings is not None:
+            args.append(settings if settings is not None else self.default_settings())
+        kwargs = {}
+        if self.requires and mesh_data is not None:
+            kwargs["mesh_data"] = mesh_data
+        if not nodes and self.accepts_nodes:
+            kwargs["nodes"] = False
+        discrepancies = self.function(*args, **kwargs) or []
+        if not nodes:
+            return [index.without_nodes() if isinstance(index, Discrepancy) else index[:2] for index in discrepancies]
+        return discrepancies
+
+
+def check(name=None, category=None, options=None, requires=(), pure=True, parallel_safe=False):
+    """
+    Decorator registering function as check command
+    """
+    def decorator(function):
+        register(CheckSpec(name or function.__name__, function, category, options, requires, pure, parallel_safe))
+        return function
+    return decorator
+
+
+def register(spec):
+    _checks[spec.name] = spec
+    return spec
+
+
+def fix(check_name):
+    """
+    Decorator registering bulk fix of a check. Fix is called with (discrepancies, settings), changes
+    every failing object at once and returns touched objects, or dict of old name -> new name
+    when it renames them.
+    """
+    def decorator(function):
+        _fixes[check_name] = function
+        return function
+    return decorator
+
+
+def get_fix(name):
+    """
+    Fix function of check, None when check has no fix
+    """
+    get(name)
+    return _fixes.get(name)
+
+
+def check_paths():
+    return [path for path in os.environ.get(CHECK_PATHS_ENV, "").split(os.pathsep) if path]
+
+
+def discover():
+    """
+    Queue check modules for lazy import, nothing is imported here
+    """
+    global _discovered
+    _discovered = True
+    candidates = list(BUILTIN_MODULES)
+    for path in sorted(glob.glob(os.path.join(CHECKS_DIR, "*_checks.py"))):
+        candidates.append("Inspector.checks." + os.path.splitext(os.path.basename(path))[0])
+    for directory in check_paths():
+        for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+            if not os.path.basename(path).startswith("_"):
+                candidates.append(path)
+    for candidate in candidates:
+        if candidate not in _pending and candidate not in _imported:
+            _pending.append(candidate)
+
+
+def _module_name(candidate):
+    # studio check files are loaded under a prefixed name to avoid clashes
+    if candidate.endswith(".py"):
+        return "inspector_studio_checks_" + os.path.splitext(os.path.basename(candidate))[0]
+    return candidate
+
+
+def _import_next():
+    candidate = _pending.pop(0)
+    _imported.append(candidate)
+    if candidate.endswith(".py"):
+        imp.load_source(_module_name(candidate), candidate)
+    else:
+        __import__(candidate)
+
+
+def get(name):
+    """
+    CheckSpec by name, check modules are imported one by one until it is found
+    """
+    spec = _checks.get(name)
+    if spec is not None:
+        return spec
+    if not _discovered:
+        discover()
+    while _pending:
+        _import_next()
+        if name in _checks:
+            return _checks[name]
+    # helpers and fixes living in check modules are never run as checks
+    raise KeyError("Unknown command {}, checks have to be registered with @check".format(name))
+
+
+def all_checks():
+    """
+    Every registered check, imports all discovered modules
+    """
+    if not _discovered:
+        discover()
+    while _pending:
+        _import_next()
+    return dict(_checks)
@@ -0,0 +1,297 @@
+"""
+Shared topology pass of geometry checks.
+Topology keeps mesh data as flat face-vertex arrays (the layout of MFnMesh
+getVertices / getAssignedUVs) queried once per object. Adjacency (edges with
+their faces, vertices with their edges) is built on first use and kept on the
+instance, so every topology check of a run reads the same arrays instead of
+querying Maya again.
+"""
+
+import math
+from array import array
+
+
+class Topology(object):
+    """
+    Face-vertex arrays of a mesh. uv_counts holds number of UVs of every face
+    (0 for faces without UVs), uv_ids index into uvs given as flat u, v pairs.
+    """
+    __slots__ = ("face_counts", "face_vertices", "points", "uv_counts", "uv_ids", "uvs",
+                 "_offsets", "_uv_offsets", "_edge_faces", "_vertex_edges")
+
+    def __init__(self, face_counts, face_vertices, points, uv_counts=None, uv_ids=None, uvs=None):
+        self.face_counts = array("i", face_counts)
+        self.face_vertices = array("i", face_vertices)
+        self.points = array("d", points)
+        self.uv_counts = array("i", uv_counts or ())
+        self.uv_ids = array("i", uv_ids or ())
+        self.uvs = array("d", uvs or ())
+        self._offsets = None
+        self._uv_offsets = None
+        self._edge_faces = None
+        self._vertex_edges = None
+
+    @classmethod
+    def from_faces(cls, faces, points, face_uvs=None):
+        """
+        Topology from lists of face vertices, points as (x, y, z) and per face lists of (u, v)
+        """
+        face_counts = [len(face) for face in faces]
+        face_vertices = [vertex for face in faces for vertex in face]
+        flat_points = [coordinate for point in points for coordinate in point]
+        if face_uvs is None:
+            return cls(face_counts, face_vertices, flat_points)
+        uv_counts = []
+        uv_ids = []
+        uvs = []
+        for face_uv in face_uvs:
+            uv_counts.append(len(face_uv))
+            for u, v in face_uv:
+                uv_ids.append(len(uvs) // 2)
+                uvs.extend((u, v))
+        return cls(face_counts, face_vertices, flat_points, uv_counts, uv_ids, uvs)
+
+    def face_count(self):
+        return len(self.face_counts)
+
+    def offsets(self):
+        if self._offsets is None:
+            self._offsets = _offsets(self.face_counts)
+        return self._offsets
+
+    def face(self, index):
+        start = self.offsets()[index]
+        return self.face_vertices[start:start + self.face_counts[index]]
+
+    def point(self, vertex):
+        return self.points[vertex * 3:vertex * 3 + 3]
+
+    def face_uvs(self, index):
+        """
+        (u, v) of face corners, empty when face has no UVs
+        """
+        if not self.uv_counts or not self.uv_counts[index]:
+            return []
+        if self._uv_offsets is None:
+            self._uv_offsets = _offsets(self.uv_counts)
+        start = self._uv_offsets[index]
+        uvs = self.uvs
+        return [(uvs[uv_id * 2], uvs[uv_id * 2 + 1]) for uv_id in self.uv_ids[start:start + self.uv_counts[index]]]
+
+    def edge_faces(self):
+        """
+        Faces of every edge keyed by (lower vertex, higher vertex)
+        """
+        if self._edge_faces is None:
+            edge_faces = {}
+            vertex_edges = {}
+            for index in range(self.face_count()):
+                face = self.face(index)
+                for corner in range(len(face)):
+                    a = face[corner]
+                    b = face[corner - 1]
+                    edge = (a, b) if a < b else (b, a)
+                    faces = edge_faces.get(edge)
+                    if faces is None:
+                        edge_faces[edge] = [index]
+                        vertex_edges.setdefault(a, []).append(edge)
+                        vertex_edges.setdefault(b, []).append(edge)
+                    elif faces[-1] != index:
+                        faces.append(index)
+            self._edge_faces = edge_faces
+            self._vertex_edges = vertex_edges
+        return self._edge_faces
+
+    def vertex_edges(self):
+        self.edge_faces()
+        return self._vertex_edges
+
+
+def _offsets(counts):
+    offsets = array("i")
+    offset = 0
+    for count in counts:
+        offsets.append(offset)
+        offset += count
+    return offsets
+
+
+def non_manifold_vertices(topology):
+    """
+    Vertices of edges shared by more than two faces and vertices joining face fans
+    which don't share an edge (bowtie vertices)
+    """
+    edge_faces = topology.edge_faces()
+    vertices = set()
+    for edge, faces in edge_faces.items():
+        if len(faces) > 2:
+            vertices.update(edge)
+    for vertex, edges in topology.vertex_edges().items():
+        if vertex in vertices or len(edges) < 3:
+            continue
+        # faces around vertex are one fan when they are all connected through its edges
+        parents = {}
+        for edge in edges:
+            faces = edge_faces[edge]
+            for face in faces:
+                parents.setdefault(face, face)
+            first = _root(parents, faces[0])
+            for face in faces[1:]:
+                parents[_root(parents, face)] = first
+        if len(set(_root(parents, face) for face in parents)) > 1:
+            vertices.add(vertex)
+    return array("i", sorted(vertices))
+
+
+def _root(parents, face):
+    while parents[face] != face:
+        parents[face] = parents[parents[face]]
+        face = parents[face]
+    return face
+
+
+def face_area(topology, index):
+    """
+    Area of polygon from its Newell normal, exact for planar faces
+    """
+    face = topology.face(index)
+    points = topology.points
+    nx = ny = nz = 0.0
+    for corner in range(len(face)):
+        a = face[corner - 1] * 3
+        b = face[corner] * 3
+        ax, ay, az = points[a], points[a + 1], points[a + 2]
+        bx, by, bz = points[b], points[b + 1], points[b + 2]
+        nx += (ay - by) * (az + bz)
+        ny += (az - bz) * (ax + bx)
+        nz += (ax - bx) * (ay + by)
+    return math.sqrt(nx * nx + ny * ny + nz * nz) / 2.0
+
+
+def zero_area_faces(topology, tolerance):
+    return array("i", [index for index in range(topology.face_count()) if face_area(topology, index) <= tolerance])
+
+
+def zero_length_vertices(topology, tolerance):
+    """
+    Vertices of edges not longer than tolerance
+    """
+    points = topology.points
+    limit = tolerance * tolerance
+    vertices = set()
+    for a, b in topology.edge_faces():
+        dx = points[a * 3] - points[b * 3]
+        dy = points[a * 3 + 1] - points[b * 3 + 1]
+        dz = points[a * 3 + 2] - points[b * 3 + 2]
+        if dx * dx + dy * dy + dz * dz <= limit:
+            vertices.add(a)
+            vertices.add(b)
+    return array("i", sorted(vertices))
+
+
+def ngons(topology, max_sides=4):
+    return array("i", [index for index, count in enumerate(topology.face_counts) if count > max_sides])
+
+
+def uv_area(uvs):
+    """
+    Signed area of UV polygon, negative for faces wound clockwise in UV space
+    """
+    area = 0.0
+    for corner in range(len(uvs)):
+        u0, v0 = uvs[corner - 1]
+        u1, v1 = uvs[corner]
+        area += u0 * v1 - u1 * v0
+    return area / 2.0
+
+
+def flipped_uv_faces(topology, tolerance=1e-12):
+    flipped = array("i")
+    for index in range(topology.face_count()):
+        uvs = topology.face_uvs(index)
+        if len(uvs) > 2 and uv_area(uvs) < -tolerance:
+            flipped.append(index)
+    return flipped
+
+
+def _triangles(uvs):
+    # fan triangulation, faces are expected to be convex in UV space
+    return [(uvs[0], uvs[corner], uvs[corner + 1]) for corner in range(1, len(uvs) - 1)]
+
+
+def _separated(first, second, tolerance):
+    """
+    Separating axis test of two triangles, touching triangles count as separated
+    """
+    for triangle in (first, second):
+        for corner in range(3):
+            u0, v0 = triangle[corner - 1]
+            u1, v1 = triangle[corner]
+            axis_u, axis_v = v0 - v1, u1 - u0
+            first_projection = [u * axis_u + v * axis_v for u, v in first]
+            second_projection = [u * axis_u + v * axis_v for u, v in second]
+            length = math.sqrt(axis_u * axis_u + axis_v * axis_v)
+            if length == 0.0:
+                continue
+            margin = tolerance * length
+            if max(first_projection) <= min(second_projection) + margin or \
+                    max(second_projection) <= min(first_projection) + margin:
+                return True
+    return False
+
+
+def overlapping_uv_faces(topology, tolerance=1e-7):
+    """
+    Faces whose UVs overlap UVs of another face. Faces are bucketed into a grid
+    by their UV bounds so only faces sharing a cell are compared.
+    """
+    faces = []
+    for index in range(topology.face_count()):
+        uvs = topology.face_uvs(index)
+        if len(uvs) < 3 or abs(uv_area(uvs)) <= tolerance * tolerance:
+            continue
+        us = [u for u, v in uvs]
+        vs = [v for u, v in uvs]
+        faces.append((index, _triangles(uvs), min(us), min(vs), max(us), max(vs)))
+    if len(faces) < 2:
+        return array("i")
+
+    min_u = min(face[2] for face in faces)
+    min_v = min(face[3] for face in faces)
+    width = max(face[4] for face in faces) - min_u
+    height = max(face[5] for face in faces) - min_v
+    # roughly one face per cell
+    cell = max(math.sqrt(width * height / len(faces)), tolerance, 1e-9)
+    grid = {}
+    for position, face in enumerate(faces):
+        for column in range(int((face[2] - min_u) / cell), int((face[4] - min_u) / cell) + 1):
+            for row in range(int((face[3] - min_v) / cell), int((face[5] - min_v) / cell) + 1):
+                grid.setdefault((column, row), []).append(position)
+
+    overlapping = set()
+    compared = set()
+    for positions in grid.values():
+        for first_index in range(len(positions)):
+            first = faces[positions[first_index]]
+            for position in positions[first_index + 1:]:
+                pair = (positions[first_index], position)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                second = faces[position]
+                if first[4] <= second[2] or second[4] <= first[2] or first[5] <= second[3] or second[5] <= first[3]:
+                    continue
+                if any(not _separated(a, b, tolerance) for a in first[1] for b in second[1]):
+                    overlapping.add(first[0])
+                    overlapping.add(second[0])
+    return array("i", sorted(overlapping))
+
+
+def unfrozen(matrix, tolerance=1e-6):
+    """
+    True when local matrix (16 values, row major) isn't identity
+    """
+    for index, value in enumerate(matrix):
+        if abs(value - (1.0 if index % 5 == 0 else 0.0)) > tolerance:
+            return True
+    return False
@@ -0,0 +1,360 @@
+"""
+Batch validation of scene files.
+Every scene is opened in its own worker process (mayapy in production), checked
+with the headless engine and the per scene results are merged into one JSON report.
+Crashed workers are retried, workers running over the timeout are killed and skipped.
+With --serve a worker stays alive and validates JSON jobs read line by line from
+stdin, Maya, presets and check modules are loaded only once (see in_service).
+
+    mayapy -m Inspector.core.in_batch scenes/ --preset presets/default.txt --output report.json --jobs 4
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import traceback
+import subprocess
+from multiprocessing.pool import ThreadPool
+
+import Inspector.core.in_presets as in_presets
+import Inspector.core.in_profiling as in_profiling
+import Inspector.core.in_scene as in_scene
+import Inspector.core.in_planner as in_planner
+from Inspector.core.in_content_cache import ContentCache
+from Inspector.core.in_history import History
+from Inspector.core.in_engine import Engine, CommandResult, MODES, MODE_FULL
+from Inspector.core.in_reports import ReportWriter
+
+
+SCENE_EXTENSIONS = (".ma", ".mb")
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# exit codes of the batch run
+EXIT_PASSED = 0
+EXIT_DISCREPANCIES = 1
+EXIT_INCOMPLETE = 2
+
+
+def find_scenes(paths):
+    """
+    Scene files from given files and directories (walked recursively), sorted per directory
+    """
+    scenes = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file_name in sorted(files):
+                    if file_name.lower().endswith(SCENE_EXTENSIONS):
+                        scenes.append(os.path.join(root, file_name))
+        else:
+            scenes.append(path)
+    return scenes
+
+
+def validate_scene(scene, settings_list, stats=None, mode=MODE_FULL, budget=None, cache=None, planner=None):
+    """
+    Open scene in current Maya session and return list of CommandResult dicts
+    """
+    import maya.cmds as mc
+    mc.file(scene, open=True, force=True)
+    results = Engine(settings_list, cache=cache, planner=planner).run(in_scene.gather_meshes(), stats=stats, mode=mode, budget=budget)
+    return [result.to_dict() for result in results]
+
+
+def initialize_maya():
+    try:
+        import maya.standalone
+    except ImportError:
+        return
+    maya.standalone.initialize(name="python")
+
+
+def run_job(scene, preset_path, profile_path=None, mode=MODE_FULL, budget=None, cache=None, planner=None):
+    """
+    Validate scene in current Maya session, returns worker output {"results": ..., "stats": ...}
+    """
+    stats = in_profiling.RunStats()
+    with in_profiling.profiled(profile_path):
+        # parsed presets are cached by file modification time, warm workers parse them once
+        results = validate_scene(scene, in_presets.load_preset(preset_path), stats, mode, budget, cache, planner)
+    return {"results": results, "stats": stats.summary()}
+
+
+def worker_env():
+    """
+    Environment of worker processes, package root is put on PYTHONPATH
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(path for path in (PACKAGE_ROOT, env.get("PYTHONPATH")) if path)
+    return env
+
+
+def make_planner(costs_path=None):
+    """
+    Planner learning costs into given file, None without one (commands run in preset order)
+    """
+    if not costs_path:
+        return None
+    return in_planner.Planner(in_planner.CostModel(costs_path))
+
+
+def worker_main(scene, preset_path, result_path, profile_path=None, mode=MODE_FULL, budget=None, cache_path=None,
+                costs_path=None):
+    initialize_maya()
+    cache = ContentCache(cache_path) if cache_path else None
+    output = run_job(scene, preset_path, profile_path, mode, budget, cache, make_planner(costs_path))
+    if cache is not None:
+        cache.close()
+    with open(result_path, "w") as result_file:
+        json.dump(output, result_file)
+
+
+def serve_worker(input_stream=None, output_stream=None):
+    """
+    Warm worker loop: one JSON job per input line ({"id", "scene", "preset", "mode", "budget", "cache", "costs"}),
+    one JSON line written back per job with "output" or "error". Ends on empty line or end of input.
+    """
+    initialize_maya()
+    input_stream = input_stream or sys.stdin
+    if output_stream is None:
+        # replies get their own descriptor, anything printed by Maya or checks goes to stderr
+        sys.stdout.flush()
+        output_stream = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    caches = {}
+    planners = {}
+    try:
+        while True:
+            line = input_stream.readline()
+            if not line.strip():
+                break
+            job = json.loads(line)
+            reply = {"id": job.get("id")}
+            start = time.time()
+            try:
+                cache = None
+                if job.get("cache"):
+                    cache = caches.get(job["cache"])
+                    if cache is None:
+                        cache = caches[job["cache"]] = ContentCache(job["cache"])
+                    # session results are keyed by object name, another scene may reuse the names
+                    cache.reset_session()
+                if job.get("costs") and job["costs"] not in planners:
+                    planners[job["costs"]] = make_planner(job["costs"])
+                reply["output"] = run_job(job["scene"], job["preset"], job.get("profile"),
+                                          job.get("mode") or MODE_FULL, job.get("budget"), cache,
+                                          planners.get(job.get("costs")))
+            except Exception:
+                reply["error"] = traceback.format_exc()[-2000:]
+            reply["seconds"] = round(time.time() - start, 3)
+            output_stream.write(json.dumps(reply) + "\n")
+            output_stream.flush()
+    finally:
+        for cache in caches.values():
+            cache.close()
+
+
+class BatchValidator(object):
+    """
+    Runs one worker process per scene over a pool of `jobs` concurrent workers
+    """
+
+    def __init__(self, preset_path, interpreter=None, jobs=1, timeout=None, retries=1, profile_dir=None,
+                 mode=MODE_FULL, budget=None, cache_path=None, costs_path=None):
+        self.preset_path = os.path.abspath(preset_path)
+        # content cache database shared by workers, see in_content_cache
+        self.cache_path = os.path.abspath(cache_path) if cache_path else None
+        # check costs learned by workers, commands run in planned order when set, see in_planner
+        self.costs_path = os.path.abspath(costs_path) if costs_path else None
+        # engine run mode of workers and its time budget per scene, see in_engine.MODES
+        self.mode = mode
+        self.budget = budget
+        # cProfile output of every worker is saved here as <scene name>_<path hash>.prof
+        self.profile_dir = profile_dir
+        self.interpreter = interpreter or sys.executable
+        self.jobs = max(1, jobs)
+        self.timeout = timeout
+        self.retries = retries
+
+    def profile_name(self, scene):
+        # hash of the full path keeps profiles of scenes with the same name in different folders apart
+        path = os.path.abspath(scene)
+        if not isinstance(path, bytes):
+            path = path.encode("utf-8")
+        digest = hashlib.md5(path).hexdigest()[:8]
+        return "{}_{}.prof".format(os.path.basename(scene), digest)
+
+    def worker_command(self, scene, result_path):
+        command = [self.interpreter, "-m", "Inspector.core.in_batch",
+                   "--worker", scene, "--preset", self.preset_path, "--result-file", result_path]
+        if self.profile_dir:
+            command += ["--profile", os.path.join(self.profile_dir, self.profile_name(scene))]
+        if self.mode != MODE_FULL:
+            command += ["--mode", self.mode]
+        if self.budget is not None:
+            command += ["--budget", str(self.budget)]
+        if self.cache_path:
+            command += ["--cache", self.cache_path]
+        if self.costs_path:
+            command += ["--costs", self.costs_path]
+        return command
+
+    def worker_env(self):
+        return worker_env()
+
+    def run_worker(self, scene):
+        """
+        Single worker attempt, returns (status, worker output, error message)
+        """
+        result_fd, result_path = tempfile.mkstemp(suffix=".json")
+        os.close(result_fd)
+        log_file = tempfile.TemporaryFile()
+        try:
+            process = subprocess.Popen(self.worker_command(scene, result_path), env=self.worker_env(),
+                                       stdout=log_file, stderr=subprocess.STDOUT)
+            start = time.time()
+            while process.poll() is None:
+                if self.timeout and time.time() - start > self.timeout:
+                    process.kill()
+                    process.wait()
+                    return "timeout", None, "Worker exceeded {} seconds".format(self.timeout)
+                time.sleep(0.05)
+
+            if process.returncode != 0:
+                log_file.seek(0)
+                return "crashed", None, log_file.read()[-2000:]
+            with open(result_path) as result_file:
+                return "ok", json.load(result_file), None
+        finally:
+            log_file.close()
+            os.remove(result_path)
+
+    def validate(self, scene):
+        start = time.time()
+        attempts = 0
+        while True:
+            attempts += 1
+            status, output, error = self.run_worker(scene)
+            if status != "crashed" or attempts > self.retries:
+                break
+        return {
+            "scene": scene,
+            "status": status,
+            "attempts": attempts,
+            "seconds": round(time.time() - start, 3),
+            "error": error,
+            "results": output["results"] if output else [],
+            "stats": output["stats"] if output else None,
+        }
+
+    def run(self, scenes, writer=None, history=None):
+        """
+        Validate scenes and return merged report, rows are streamed to ReportWriter as scenes finish
+        and validated scenes are recorded into in_history.History when given
+        """
+        pool = ThreadPool(self.jobs)
+        scene_reports = []
+        try:
+            for scene_report in pool.imap_unordered(self.validate, scenes):
+                scene_reports.append(scene_report)
+                if writer is not None:
+                    writer.scene = scene_report["scene"]
+                    writer.write_results(CommandResult.from_dict(result) for result in scene_report["results"])
+                if history is not None and scene_report["status"] == "ok":
+                    history.record_run([CommandResult.from_dict(result) for result in scene_report["results"]],
+                                       scene_report["scene"], preset=in_presets.preset_name(self.preset_path),
+                                       mode=self.mode, stats=scene_report["stats"])
+        finally:
+            pool.close()
+            pool.join()
+        order = dict((scene, index) for index, scene in enumerate(scenes))
+        scene_reports.sort(key=lambda scene_report: order[scene_report["scene"]])
+        return merge_reports(in_presets.preset_name(self.preset_path), self.preset_path, scene_reports)
+
+
+def merge_reports(preset_name, preset_path, scene_reports):
+    summary = {"scenes": len(scene_reports), "ok": 0, "crashed": 0, "timeout": 0, "failed_scenes": 0, "discrepancies": 0}
+    for scene_report in scene_reports:
+        summary[scene_report["status"]] += 1
+        discrepancies = sum(len(result["discrepancies"]) for result in scene_report["results"])
+        summary["discrepancies"] += discrepancies
+        if discrepancies:
+            summary["failed_scenes"] += 1
+    return {"preset": preset_name, "preset_path": preset_path, "summary": summary, "scenes": scene_reports}
+
+
+def exit_code(report):
+    summary = report["summary"]
+    if summary["ok"] != summary["scenes"]:
+        return EXIT_INCOMPLETE
+    if summary["discrepancies"]:
+        return EXIT_DISCREPANCIES
+    return EXIT_PASSED
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Validate scene files against Inspector preset")
+    parser.add_argument("paths", nargs="*", help="scene files or directories with .ma/.mb files")
+    parser.add_argument("--preset", help="preset file (.insp or legacy .txt)")
+    parser.add_argument("--output", help="report path, printed to stdout if not set")
+    parser.add_argument("--report", help="discrepancies streamed to .jsonl or .csv file while scenes finish")
+    parser.add_argument("--jobs", type=int, default=1, help="number of concurrent worker processes")
+    parser.add_argument("--timeout", type=float, help="seconds before a worker is killed and its scene skipped")
+    parser.add_argument("--retries", type=int, default=1, help="how many times a crashed worker is restarted")
+    parser.add_argument("--interpreter", help="python used for workers, mayapy in production (default: current)")
+    parser.add_argument("--profile", help="directory for cProfile output of every scene")
+    parser.add_argument("--mode", choices=MODES, default=MODE_FULL,
+                        help="fail-fast stops at first discrepancy per command, count-only skips error nodes, "
+                             "time-budget checks what fits into --budget seconds per scene, "
+                             "gate stops at first discrepancy of the scene")
+    parser.add_argument("--budget", type=float, help="seconds per scene for time-budget mode")
+    parser.add_argument("--cache", help="content cache database, unchanged meshes reuse stored results")
+    parser.add_argument("--costs", help="check costs file, cheapest and most often failing checks run first")
+    parser.add_argument("--history", help="run history database every validated scene is recorded into")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+    if not (args.preset or args.serve):
+        parser.error("argument --preset is required")
+    return args
+
+
+def main(args=None):
+    args = parse_args(args)
+    if args.serve:
+        serve_worker()
+        return EXIT_PASSED
+    if args.worker:
+        worker_main(args.worker, args.preset, args.result_file, args.profile, args.mode, args.budget, args.cache,
+                    args.costs)
+        return EXIT_PASSED
+
+    validator = BatchValidator(args.preset, args.interpreter, args.jobs, args.timeout, args.retries, args.profile,
+                               args.mode, args.budget, args.cache, args.costs)
+    scenes = find_scenes(args.paths)
+    history = History(args.history) if args.history else None
+    try:
+        if args.report:
+            with ReportWriter.open(args.report, preset_name=in_presets.preset_name(args.preset)) as writer:
+                report = validator.run(scenes, writer, history)
+        else:
+            report = validator.run(scenes, history=history)
+    finally:
+        if history is not None:
+            history.close()
+    if args.output:
+        with open(args.output, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return exit_code(report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Result cache for incremental re-inspection.
+Results are remembered per (object, command, options) and reused until the
+object's change counter moves, so only dirty objects are checked again.
+"""
+
+# results kept per command, outdated ones are dropped first when there are more
+MAX_OBJECTS = 100000
+
+
+def options_key(command):
+    """
+    Hashable key of command options as they are set in the preset
+    """
+    if len(command) > 2:
+        return repr(command[2])
+    return None
+
+
+class DirtyTracker(object):
+    """
+    Change counter per object. Anything calling mark_dirty invalidates cached results.
+    """
+
+    def __init__(self):
+        self._epoch = 0
+        self._versions = {}
+
+    def version(self, obj):
+        return self._epoch, self._versions.get(obj, 0)
+
+    def mark_dirty(self, obj):
+        self._versions[obj] = self._versions.get(obj, 0) + 1
+
+    def mark_all_dirty(self):
+        self._epoch += 1
+
+    def watch(self, objects_list):
+        pass
+
+    def release(self):
+        pass
+
+
+class CallbackDirtyTracker(DirtyTracker):
+    """
+    Marks objects dirty from OpenMaya node messages (dirty plugs, rename, delete)
+    and everything dirty when a scene is opened or created.
+    """
+
+    def __init__(self):
+        super(CallbackDirtyTracker, self).__init__()
+        import maya.api.OpenMaya as om
+        self.om = om
+        self._callbacks = {}
+        self._scene_callbacks = [
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, self._on_scene_changed),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, self._on_scene_changed),
+        ]
+
+    def watch(self, objects_list):
+        om = self.om
+        for obj in objects_list:
+            selection = om.MSelectionList()
+            try:
+                selection.add(obj)
+            except RuntimeError:
+                continue
+            dag_path = selection.getDagPath(0)
+            entry = self._callbacks.get(obj)
+            if entry is not None:
+                if entry[0].isValid() and entry[0].object() == dag_path.node():
+                    continue
+                # another node took the name, e.g. after its parent was renamed
+                self._release_node(obj)
+            nodes = [dag_path.node()]
+            for i in range(dag_path.numberOfShapesDirectlyBelow()):
+                shape_path = om.MDagPath(dag_path)
+                shape_path.extendToShape(i)
+                nodes.append(shape_path.node())
+
+            # client data of callbacks, renames update the name in place
+            name = [obj]
+            callback_ids = []
+            for node in nodes:
+                callback_ids.append(om.MNodeMessage.addNodeDirtyCallback(node, self._on_dirty, name))
+            callback_ids.append(om.MNodeMessage.addNameChangedCallback(nodes[0], self._on_renamed, name))
+            callback_ids.append(om.MNodeMessage.addNodePreRemovalCallback(nodes[0], self._on_removed, name))
+            self._callbacks[obj] = (om.MObjectHandle(nodes[0]), callback_ids)
+
+    def release(self):
+        self._release_nodes()
+        for callback_id in self._scene_callbacks:
+            self.om.MMessage.removeCallback(callback_id)
+        self._scene_callbacks = []
+
+    def _release_node(self, obj):
+        handle, callback_ids = self._callbacks.pop(obj)
+        self.om.MMessage.removeCallbacks(callback_ids)
+
+    def _release_nodes(self):
+        for handle, callback_ids in self._callbacks.values():
+            self.om.MMessage.removeCallbacks(callback_ids)
+        self._callbacks = {}
+
+    def _on_dirty(self, node, name):
+        self.mark_dirty(name[0])
+
+    def _on_renamed(self, node, previous_name, name):
+        obj = name[0]
+        dag_path = self.om.MDagPath.getAPathTo(node)
+        new_name = dag_path.fullPathName() if obj.startswith("|") else dag_path.partialPathName()
+        if new_name == obj:
+            return
+        # callbacks follow the node, a node created under the old name is watched on its own
+        entry = self._callbacks.pop(obj, None)
+        if new_name in self._callbacks:
+            self._release_node(new_name)
+        if entry is not None:
+            self._callbacks[new_name] = entry
+        name[0] = new_name
+        self.mark_dirty(obj)
+        self.mark_dirty(new_name)
+
+    def _on_removed(self, node, name):
+        obj = name[0]
+        if obj in self._callbacks:
+            self._release_node(obj)
+        self.mark_dirty(obj)
+
+    def _on_scene_changed(self, client_data=None):
+        self._release_nodes()
+        self.mark_all_dirty()
+
+
+class ResultCache(object):
+    """
+    Discrepancies per (command, options) and object, tagged with object version.
+    Every command keeps results of at most max_objects objects.
+    """
+
+    def __init__(self, tracker=None, max_objects=MAX_OBJECTS):
+        self.tracker = tracker if tracker is not None else DirtyTracker()
+        self.max_objects = max_objects
+        self._entries = {}
+
+    def _entry(self, command):
+        return self._entries.setdefault((command[0], options_key(command)), {})
+
+    def watch(self, objects_list):
+        self.tracker.watch(objects_list)
+
+    def stale(self, command, objects_list):
+        """
+        Objects whose result for this command is missing or outdated
+        """
+        entry = self._entry(command)
+        version = self.tracker.version
+        stale = []
+        for obj in objects_list:
+            cached = entry.get(obj)
+            if cached is None or cached[0] != version(obj):
+                stale.append(obj)
+        return stale
+
+    def update(self, command, objects_list, discrepancies):
+        entry = self._entry(command)
+        version = self.tracker.version
+        positions = {}
+        for position, obj in enumerate(objects_list):
+            entry[obj] = (version(obj), [])
+            positions.setdefault(obj, position)
+        # discrepancies are stored with the pass of the command output they came from, a pass ends
+        # where output goes back to an earlier object (e.g. naming discrepancies grouped by rule)
+        output_pass = 0
+        last = -1
+        for index in discrepancies:
+            position = positions.get(index[0])
+            if position is None:
+                continue
+            if position < last:
+                output_pass += 1
+            last = position
+            entry[index[0]][1].append((output_pass, index))
+        if len(entry) > self.max_objects:
+            self.prune(entry, positions)
+
+    def prune(self, entry, keep=()):
+        """
+        Drop outdated results, they never match again as versions only grow (deleted, renamed
+        objects and every object after a scene change). When that isn't enough results of
+        objects other than keep are dropped too.
+        """
+        version = self.tracker.version
+        for obj in [obj for obj, cached in entry.items() if cached[0] != version(obj)]:
+            del entry[obj]
+        if len(entry) > self.max_objects:
+            for obj in [obj for obj in entry if obj not in keep]:
+                del entry[obj]
+
+    def results(self, command, objects_list):
+        """
+        Discrepancies in the order the command returns them. Results updated by one call come back
+        in their original order, results of several calls are merged pass by pass.
+        """
+        entry = self._entry(command)
+        keyed = []
+        for position, obj in enumerate(objects_list):
+            for output_pass, index in entry[obj][1]:
+                keyed.append((output_pass, position, index))
+        # sort is stable, discrepancies of one object within a pass keep their order
+        keyed.sort(key=lambda item: item[:2])
+        return [item[2] for item in keyed]
+
+    def clear(self):
+        self._entries = {}
@@ -0,0 +1,317 @@
+"""
+Persistent result cache keyed by mesh content.
+Results of geometry checks are stored in SQLite per (mesh fingerprint, command,
+options), so an unchanged asset is validated instantly in every scene and by
+every user sharing the database. Fingerprints hash topology, points and UVs
+through the mesh backend. Least recently used rows are evicted above the size limits.
+ContentCache wraps in_cache.ResultCache: the session cache is asked first,
+the database only for objects the session doesn't know.
+
+    python -m Inspector.core.in_content_cache inspector_cache.sqlite --stats
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+
+import Inspector.checks.in_registry as in_registry
+from Inspector.checks import in_backends
+from Inspector.checks.in_discrepancy import Discrepancy
+from Inspector.core.in_cache import ResultCache, options_key
+
+
+CACHE_FILE_NAME = "inspector_cache.sqlite"
+# mesh data a fingerprint covers, checks reading anything else (history, names) stay session only
+CONTENT_ATTRIBUTES = ("triangles", "lamina_faces", "uv_shells", "topology")
+MAX_ENTRIES = 200000
+MAX_BYTES = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    fingerprint TEXT NOT NULL,
+    command TEXT NOT NULL,
+    options TEXT NOT NULL,
+    discrepancies TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (fingerprint, command, options)
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def default_path(presets_dir):
+    """
+    Database next to presets directory
+    """
+    return os.path.join(os.path.dirname(os.path.normpath(presets_dir)), CACHE_FILE_NAME)
+
+
+def content_check(command):
+    spec = in_registry.get(command[0])
+    return spec.pure and bool(spec.requires) and all(attr in CONTENT_ATTRIBUTES for attr in spec.requires)
+
+
+def relative_discrepancies(obj, discrepancies):
+    """
+    Discrepancies without object name, Discrepancy as [template, params, component, indices]
+    and lists as [message, node suffixes]. None if a node isn't part of the object.
+    """
+    rows = []
+    for index in discrepancies:
+        if isinstance(index, Discrepancy):
+            indices = None if index.indices is None else index.indices.tolist()
+            rows.append([index.template, list(index.params), index.component, indices])
+            continue
+        nodes = None
+        if len(index) > 2:
+            nodes = []
+            for node in index[2]:
+                if node != obj and not node.startswith(obj + "."):
+                    return None
+                nodes.append(node[len(obj):])
+        rows.append([index[1], nodes])
+    return rows
+
+
+def absolute_discrepancies(obj, rows):
+    discrepancies = []
+    for row in rows:
+        if len(row) == 4:
+            discrepancies.append(Discrepancy(obj, *row))
+            continue
+        message, nodes = row
+        if nodes is None:
+            discrepancies.append([obj, message])
+        else:
+            discrepancies.append([obj, message, [obj + node for node in nodes]])
+    return discrepancies
+
+
+class ContentCache(object):
+
+    def __init__(self, path, backend=None, session=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.path = path
+        self._backend = backend
+        self.session = session if session is not None else ResultCache()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # fingerprints per object, valid while session tracker version doesn't change
+        self._fingerprints = {}
+        # objects served from the database and objects checked and stored, stale() runs more than once per command
+        # (mesh data collection and the command itself) so misses are counted where results are stored
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+
+    @property
+    def tracker(self):
+        return self.session.tracker
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = in_backends.get_backend()
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend):
+        self._backend = backend
+        self._fingerprints = {}
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def fingerprint(self, obj):
+        version = self.tracker.version(obj)
+        cached = self._fingerprints.get(obj)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        try:
+            fingerprint = self.backend.fingerprint(obj)
+        except Exception:
+            # objects which can't be fingerprinted (no backend support, queries failing) are only cached in session
+            fingerprint = None
+        self._fingerprints[obj] = (version, fingerprint)
+        return fingerprint
+
+    def reset_session(self):
+        """
+        Forget session results and fingerprints, they are keyed by object name and belong to the open scene.
+        Stored results stay, processes validating several scenes call this for every scene.
+        """
+        self.session.clear()
+        self._fingerprints = {}
+
+    def watch(self, objects_list):
+        self.session.watch(objects_list)
+
+    def stale(self, command, objects_list):
+        """
+        Objects unknown to session and database, database hits are moved into session cache
+        """
+        stale = self.session.stale(command, objects_list)
+        if not stale or not content_check(command):
+            return stale
+        fingerprints = {}
+        for obj in stale:
+            fingerprint = self.fingerprint(obj)
+            if fingerprint is not None:
+                fingerprints.setdefault(fingerprint, []).append(obj)
+        rows = self._select(command, list(fingerprints))
+
+        missing = []
+        hits = 0
+        for obj in stale:
+            fingerprint = self.fingerprint(obj)
+            if fingerprint in rows:
+                self.session.update(command, [obj], absolute_discrepancies(obj, rows[fingerprint]))
+                hits += 1
+            else:
+                missing.append(obj)
+        self.hits += hits
+        if rows:
+            self._touch(command, list(rows), hits)
+        return missing
+
+    def update(self, command, objects_list, discrepancies):
+        self.session.update(command, objects_list, discrepancies)
+        if not content_check(command):
+            return
+        grouped = {}
+        for index in discrepancies:
+            grouped.setdefault(index[0], []).append(index)
+        now = time.time()
+        options = options_key(command) or ""
+        records = []
+        for obj in objects_list:
+            fingerprint = self.fingerprint(obj)
+            rows = relative_discrepancies(obj, grouped.get(obj, []))
+            if fingerprint is None or rows is None:
+                continue
+            data = json.dumps(rows, separators=(",", ":"))
+            records.append((fingerprint, command[0], options, data, len(data), now))
+        self.misses += len(records)
+        if records:
+            with self.connection:
+                self.connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", records)
+            self.evict()
+
+    def results(self, command, objects_list):
+        return self.session.results(command, objects_list)
+
+    def _select(self, command, fingerprints):
+        rows = {}
+        options = options_key(command) or ""
+        # sqlite limits number of query parameters
+        for start in range(0, len(fingerprints), 500):
+            part = fingerprints[start:start + 500]
+            query = "SELECT fingerprint, discrepancies FROM results WHERE command = ? AND options = ? " \
+                    "AND fingerprint IN ({})".format(",".join("?" * len(part)))
+            for fingerprint, data in self.connection.execute(query, [command[0], options] + part):
+                rows[fingerprint] = json.loads(data)
+        return rows
+
+    def _touch(self, command, fingerprints, hits):
+        now = time.time()
+        options = options_key(command) or ""
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE results SET used = ? WHERE fingerprint = ? AND command = ? AND options = ?",
+                [(now, fingerprint, command[0], options) for fingerprint in fingerprints])
+            self._count("hits", hits)
+
+    def _count(self, name, value):
+        self.connection.execute("INSERT OR IGNORE INTO counters VALUES (?, 0)", (name,))
+        self.connection.execute("UPDATE counters SET value = value + ? WHERE name = ?", (value, name))
+
+    def evict(self):
+        """
+        Drop least recently used rows above max_entries or max_bytes
+        """
+        entries, size = self.connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return 0
+        # newest rows are kept down to 90% of the limits, so eviction doesn't run on every write
+        max_entries = int(self.max_entries * 0.9)
+        max_bytes = int(self.max_bytes * 0.9)
+        keep = 0
+        kept_size = 0
+        for row_size, in self.connection.execute("SELECT size FROM results ORDER BY used DESC"):
+            if keep >= max_entries or kept_size + row_size > max_bytes:
+                break
+            keep += 1
+            kept_size += row_size
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM results WHERE rowid NOT IN (SELECT rowid FROM results ORDER BY used DESC LIMIT ?)", (keep,))
+            self._count("evicted", cursor.rowcount)
+        return cursor.rowcount
+
+    def stats(self):
+        entries, size, oldest, newest = self.connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), MIN(used), MAX(used) FROM results").fetchone()
+        counters = dict(self.connection.execute("SELECT name, value FROM counters"))
+        commands = dict(self.connection.execute("SELECT command, COUNT(*) FROM results GROUP BY command"))
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "oldest": oldest,
+            "newest": newest,
+            "commands": commands,
+            "session_hits": self.hits,
+            "session_misses": self.misses,
+            "total_hits": counters.get("hits", 0),
+            "evicted": counters.get("evicted", 0),
+        }
+
+    def stats_text(self):
+        stats = self.stats()
+        return "{} entries, {:.1f} MB, {} hits / {} misses this session, {} hits and {} evictions in total\n{}".format(
+            stats["entries"], stats["bytes"] / 1048576.0, stats["session_hits"], stats["session_misses"],
+            stats["total_hits"], stats["evicted"], stats["path"])
+
+    def clear(self):
+        """
+        Remove every stored result, session results included
+        """
+        self.session.clear()
+        self._fingerprints = {}
+        with self.connection:
+            self.connection.execute("DELETE FROM results")
+            self.connection.execute("DELETE FROM counters")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspector content cache statistics")
+    parser.add_argument("path", help="cache database")
+    parser.add_argument("--clear", action="store_true", help="remove every stored result")
+    parser.add_argument("--stats", action="store_true", help="print statistics as JSON")
+    args = parser.parse_args()
+    if not os.path.isfile(args.path):
+        sys.exit("No cache database at {}".format(args.path))
+    cache = ContentCache(args.path)
+    if args.clear:
+        cache.clear()
+    if args.stats or not args.clear:
+        print(json.dumps(cache.stats(), indent=2, sort_keys=True))
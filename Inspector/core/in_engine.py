@@ -0,0 +1,412 @@
+"""
+Headless check engine.
+Runs preset commands registered in checks.in_registry and returns structured results,
+without touching Qt, so it can be driven from the dialog or from mayapy.
+"""
+
+import time
+from contextlib import contextmanager
+
+import Inspector.checks.in_registry as in_registry
+from Inspector.checks.in_mesh_data import MeshData
+from Inspector.checks.in_discrepancy import Discrepancy
+from Inspector.core.in_presets import PresetModel
+
+
+# run modes: full diagnostic, stop at first discrepancy per command,
+# discrepancies without error nodes, as many objects as fit into a time budget,
+# pass/fail verdict stopping the whole run at the first discrepancy
+MODE_FULL = "full"
+MODE_FAIL_FAST = "fail-fast"
+MODE_COUNT_ONLY = "count-only"
+MODE_TIME_BUDGET = "time-budget"
+MODE_GATE = "gate"
+MODES = (MODE_FULL, MODE_FAIL_FAST, MODE_COUNT_ONLY, MODE_TIME_BUDGET, MODE_GATE)
+
+# objects checked at once by fail-fast and time-budget runs, slices grow up to MAX_SLICE
+FIRST_SLICE = 16
+MAX_SLICE = 1024
+
+class CommandResult(object):
+    """
+    Outcome of one command over a list of objects
+    """
+    __slots__ = ("name", "category", "objects", "discrepancies", "seconds", "total", "executed")
+
+    def __init__(self, name, category, objects, discrepancies, seconds=0.0, total=None, executed=None):
+        self.name = name
+        self.category = category
+        self.objects = objects
+        self.discrepancies = discrepancies
+        # wall time of the command, mesh data collected for the whole run is not included
+        self.seconds = seconds
+        # objects requested when run stopped before checking all of them, None when all were checked
+        self.total = total
+        # objects the command actually ran on, the rest came from cache, all objects when None
+        self.executed = len(objects) if executed is None else executed
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["command"], data["category"], data["objects"], data["discrepancies"], data.get("seconds", 0.0),
+                   data.get("total"))
+
+    @property
+    def coverage(self):
+        if not self.total:
+            return 1.0
+        return float(len(self.objects)) / self.total
+
+    @property
+    def state(self):
+        # same convention as the dialog log: 1 success, 0 error
+        if self.discrepancies:
+            return 0
+        return 1
+
+    def failed_objects(self):
+        return [index[0] for index in self.discrepancies]
+
+    def error_nodes(self):
+        nodes = []
+        for index in self.discrepancies:
+            if len(index) > 2:
+                nodes.extend(index[2])
+            else:
+                nodes.append(index[0])
+        return nodes
+
+    def renamed(self, names):
+        """
+        Copy of result with objects renamed by dict of old name -> new name
+        """
+        discrepancies = []
+        for index in self.discrepancies:
+            new_name = names.get(index[0])
+            if new_name is None:
+                discrepancies.append(index)
+            elif isinstance(index, Discrepancy):
+                discrepancies.append(index.renamed(new_name))
+            else:
+                renamed_index = [new_name, index[1]]
+                if len(index) > 2:
+                    renamed_index.append([new_name + node[len(index[0]):] if node.startswith(index[0]) else node
+                                          for node in index[2]])
+                discrepancies.append(renamed_index)
+        objects_list = [names.get(obj, obj) for obj in self.objects]
+        return CommandResult(self.name, self.category, objects_list, discrepancies, self.seconds, self.total,
+                             self.executed)
+
+    def to_dict(self):
+        return {
+            "command": self.name,
+            "category": self.category,
+            "state": self.state,
+            "objects": list(self.objects),
+            "discrepancies": [list(index) for index in self.discrepancies],
+            "seconds": self.seconds,
+            "total": self.total,
+            "coverage": self.coverage,
+        }
+
+
+def iter_commands(settings_list, checked_only=False):
+    """
+    Yield (category name, command) pairs from preset settings list
+    """
+    for category in settings_list:
+        for command in category[1]:
+            if checked_only and command[1][0] != 1:
+                continue
+            yield category[0], command
+
+
+def required_data(commands):
+    """
+    Union of mesh attributes the given commands declare they read from MeshData
+    """
+    attributes = []
+    for command in commands:
+        for attr in in_registry.get(command[0]).requires:
+            if attr not in attributes:
+                attributes.append(attr)
+    return attributes
+
+
+def command_settings(command):
+    if len(command) > 2:
+        return command[2]
+    return None
+
+
+def run_command(command, objects_list, mesh_data=None, nodes=True):
+    """
+    Run single preset command and return its raw discrepancy list
+    """
+    return in_registry.get(command[0]).run(objects_list, command_settings(command), mesh_data, nodes)
+
+
+@contextmanager
+def undo_chunk(name):
+    """
+    Maya changes made in the block are undone in one step
+    """
+    import maya.cmds as mc
+    mc.undoInfo(openChunk=True, chunkName=name)
+    try:
+        yield
+    finally:
+        mc.undoInfo(closeChunk=True)
+
+
+class Engine(object):
+
+    def __init__(self, settings_list, backend=None, cache=None, planner=None):
+        # settings list or in_presets.PresetModel shared with the dialog, commands are looked up by name,
+        # checked state has to be changed through the model
+        self.preset = settings_list if isinstance(settings_list, PresetModel) else PresetModel(settings_list)
+        self.settings_list = self.preset.settings_list
+        # mesh query backend shared by MeshData, see checks.in_backends
+        self.backend = backend
+        # optional in_cache.ResultCache, only dirty objects are checked again when set
+        self.cache = cache
+        # optional in_planner.Planner, commands run cheapest and most often failing first
+        # and learn their costs from every run when set, in preset order otherwise
+        self.planner = planner
+
+    def find_category(self, command_name):
+        if command_name in self.preset:
+            return self.preset.category(command_name)
+        return None
+
+    def checked_commands(self):
+        return self.preset.checked_commands()
+
+    def run_command(self, command, objects_list, category=None, mesh_data=None, nodes=True):
+        if category is None:
+            category = self.find_category(command[0])
+        start = time.time()
+        objects_list = list(objects_list)
+        if mesh_data is None:
+            mesh_data = MeshData(self.backend)
+        if not nodes:
+            # results without error nodes are never cached
+            discrepancies = run_command(command, objects_list, mesh_data, nodes=False)
+            return CommandResult(command[0], category, objects_list, discrepancies, time.time() - start)
+        stale = self.stale_objects(command, objects_list)
+        discrepancies = run_command(command, stale, mesh_data) if stale else []
+        return self.command_result(command, category, objects_list, stale, discrepancies, time.time() - start)
+
+    def cached(self, command):
+        return self.cache is not None and in_registry.get(command[0]).pure
+
+    def stale_objects(self, command, objects_list):
+        """
+        Objects the command has to check, all of them unless its results are cached
+        """
+        if not self.cached(command):
+            return objects_list
+        self.cache.watch(objects_list)
+        return self.cache.stale(command, objects_list)
+
+    def command_result(self, command, category, objects_list, stale, discrepancies, seconds=0.0):
+        """
+        CommandResult of command checked on stale objects, cached results fill in the rest
+        """
+        if self.cached(command):
+            if stale:
+                self.cache.update(command, stale, discrepancies)
+            discrepancies = self.cache.results(command, objects_list)
+        return CommandResult(command[0], category, objects_list, discrepancies, seconds, executed=len(stale))
+
+    def command_pairs(self, commands=None):
+        """
+        (category, command) pairs to run, in planned order when engine has a planner
+        """
+        if commands is None:
+            pairs = self.preset.pairs(checked_only=True)
+        else:
+            pairs = [(self.find_category(command[0]), command) for command in commands]
+        if self.planner is not None:
+            return self.planner.order(pairs)
+        return pairs
+
+    def record_result(self, command_result, stats=None):
+        if stats is not None:
+            stats.add_result(command_result)
+        if self.planner is not None:
+            self.planner.record_result(command_result)
+
+    def record_mesh_data(self, mesh_data, stats=None):
+        if stats is not None:
+            stats.add_mesh_data(mesh_data)
+        if self.planner is not None:
+            self.planner.record_mesh_data(mesh_data)
+
+    def collect_mesh_data(self, objects_list, pairs, mesh_data=None):
+        # every mesh attribute is queried once here and shared by all commands of the run,
+        # attributes already in given mesh_data aren't queried again
+        if mesh_data is None:
+            mesh_data = MeshData(self.backend)
+        if self.cache is None:
+            mesh_data.collect(objects_list, required_data([command for category, command in pairs]))
+        else:
+            self.cache.watch(objects_list)
+            for category, command in pairs:
+                if in_registry.get(command[0]).pure:
+                    mesh_data.collect(self.cache.stale(command, objects_list), required_data([command]))
+                else:
+                    mesh_data.collect(objects_list, required_data([command]))
+        return mesh_data
+
+    def iter_run(self, objects_list, commands=None, chunk_size=None, stats=None, mode=MODE_FULL, budget=None):
+        """
+        Yield CommandResult as soon as each command finishes. With chunk_size objects are
+        processed in chunks, one result per command and chunk, so memory stays bounded.
+        Timings and query counts are recorded into in_profiling.RunStats when given.
+        mode is one of MODES, budget is the time-budget mode limit in seconds.
+        """
+        if mode not in MODES:
+            raise ValueError("Unknown run mode {}, expected one of {}".format(mode, ", ".join(MODES)))
+        pairs = self.command_pairs(commands)
+        objects_list = list(objects_list)
+        if mode in (MODE_FAIL_FAST, MODE_GATE):
+            results = self.fail_fast_run(objects_list, pairs, stats, stop=mode == MODE_GATE)
+        elif mode == MODE_TIME_BUDGET:
+            if budget is None:
+                raise ValueError("Time budget run needs budget in seconds")
+            results = self.budget_run(objects_list, pairs, budget, stats)
+        else:
+            results = self.chunked_run(objects_list, pairs, chunk_size, stats, nodes=mode != MODE_COUNT_ONLY)
+        checked = 0
+        finished = False
+        try:
+            for result in results:
+                self.record_result(result, stats)
+                checked = max(checked, len(result.objects))
+                yield result
+            finished = True
+        finally:
+            # also runs when the caller stops early, e.g. all() over a gate run
+            if self.planner is not None:
+                self.planner.save()
+            if stats is not None:
+                stats.add_objects(len(objects_list) if finished and mode in (MODE_FULL, MODE_COUNT_ONLY) else checked)
+                stats.finish()
+
+    def chunked_run(self, objects_list, pairs, chunk_size=None, stats=None, nodes=True):
+        chunk_size = chunk_size or len(objects_list) or 1
+        for start in range(0, max(len(objects_list), 1), chunk_size):
+            chunk = objects_list[start:start + chunk_size]
+            mesh_data = self.collect_mesh_data(chunk, pairs)
+            for category, command in pairs:
+                yield self.run_command(command, chunk, category, mesh_data, nodes)
+            self.record_mesh_data(mesh_data, stats)
+
+    def fail_fast_run(self, objects_list, pairs, stats=None, stop=False):
+        """
+        Fail-fast result of every command, with stop the run ends at the first failing command.
+        Mesh attributes are collected when a command first needs them and shared by later commands.
+        """
+        mesh_data = MeshData(self.backend)
+        try:
+            for category, command in pairs:
+                result = self.fail_fast_command(command, objects_list, category, mesh_data=mesh_data)
+                yield result
+                if stop and result.discrepancies:
+                    return
+        finally:
+            self.record_mesh_data(mesh_data, stats)
+
+    def fail_fast_command(self, command, objects_list, category=None, stats=None, mesh_data=None):
+        """
+        Check objects in growing slices until the first discrepancy, which is the only one returned
+        """
+        start = time.time()
+        checked = []
+        discrepancies = []
+        executed = 0
+        size = FIRST_SLICE
+        while len(checked) < len(objects_list) and not discrepancies:
+            chunk = objects_list[len(checked):len(checked) + size]
+            chunk_data = self.collect_mesh_data(chunk, [(category, command)], mesh_data)
+            chunk_result = self.run_command(command, chunk, category, chunk_data)
+            discrepancies = chunk_result.discrepancies[:1]
+            executed += chunk_result.executed
+            checked.extend(chunk)
+            size = min(size * 2, MAX_SLICE)
+            if mesh_data is None:
+                self.record_mesh_data(chunk_data, stats)
+        total = len(objects_list) if len(checked) < len(objects_list) else None
+        return CommandResult(command[0], category, checked, discrepancies, time.time() - start, total, executed)
+
+    def budget_run(self, objects_list, pairs, budget, stats=None):
+        """
+        Check as many objects as fit into budget seconds with all commands, results report coverage
+        """
+        deadline = time.time() + budget
+        results = [CommandResult(command[0], category, [], []) for category, command in pairs]
+        position = 0
+        size = FIRST_SLICE
+        while position < len(objects_list):
+            chunk = objects_list[position:position + size]
+            chunk_start = time.time()
+            mesh_data = self.collect_mesh_data(chunk, pairs)
+            for result, (category, command) in zip(results, pairs):
+                chunk_result = self.run_command(command, chunk, category, mesh_data)
+                result.objects.extend(chunk_result.objects)
+                result.discrepancies.extend(chunk_result.discrepancies)
+                result.seconds += chunk_result.seconds
+                result.executed += chunk_result.executed
+            self.record_mesh_data(mesh_data, stats)
+            position += len(chunk)
+            now = time.time()
+            if now >= deadline:
+                break
+            # next slice sized to what the measured speed leaves room for
+            per_object = (now - chunk_start) / len(chunk)
+            size = MAX_SLICE if not per_object else int((deadline - now) / per_object)
+            size = max(1, min(size, MAX_SLICE))
+        for result in results:
+            if position < len(objects_list):
+                result.total = len(objects_list)
+            yield result
+
+    def run(self, objects_list, commands=None, stats=None, mode=MODE_FULL, budget=None):
+        """
+        Run given commands (all checked ones by default) and return list of CommandResult
+        """
+        return list(self.iter_run(objects_list, commands, stats=stats, mode=mode, budget=budget))
+
+    def fix(self, command, command_result):
+        """
+        Apply bulk fix of command to all its discrepancies in one undo chunk and check touched objects again.
+        Returns (dict of old name -> new name of touched objects, CommandResult updated with new checks).
+        """
+        fix = in_registry.get_fix(command[0])
+        if fix is None:
+            raise ValueError("Command {} has no fix".format(command[0]))
+        if not command_result.discrepancies:
+            return {}, command_result
+        with undo_chunk("Inspector fix {}".format(command[0])):
+            touched = fix(command_result.discrepancies, command_settings(command))
+        if not isinstance(touched, dict):
+            touched = dict((obj, obj) for obj in touched)
+        if self.cache is not None:
+            for obj in touched.keys() + touched.values():
+                self.cache.tracker.mark_dirty(obj)
+
+        fixed = sorted(set(touched.values()))
+        pairs = [(command_result.category, command)]
+        checked = self.run_command(command, fixed, command_result.category, self.collect_mesh_data(fixed, pairs))
+        result = command_result.renamed(touched)
+        fixed = set(fixed)
+        result.discrepancies = [index for index in result.discrepancies if index[0] not in fixed]
+        result.discrepancies.extend(checked.discrepancies)
+        result.seconds += checked.seconds
+        return touched, result
+
+    def passed(self, objects_list, commands=None):
+        """
+        Pass/fail gate, the run stops at the first discrepancy found
+        """
+        return all(result.state for result in self.iter_run(objects_list, commands, mode=MODE_GATE))
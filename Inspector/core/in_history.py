@@ -0,0 +1,361 @@
+"""
+History of engine runs.
+Every run is recorded into SQLite: scene, asset, preset, user, timings of every
+command and every failing object with its message. Rows of a run are buffered
+and written in one transaction when the run ends, so recording doesn't slow
+the checks down. Queries answer what started failing since a given time, which
+checks are slowest and how failures of a check develop over days.
+
+    python -m Inspector.core.in_history inspector_history.sqlite new-failures --since 1d
+    python -m Inspector.core.in_history inspector_history.sqlite slowest --since 7d
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import getpass
+import sqlite3
+import argparse
+import datetime
+import threading
+
+
+HISTORY_FILE_NAME = "inspector_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    seconds REAL NOT NULL,
+    scene TEXT,
+    asset TEXT,
+    preset TEXT,
+    user TEXT,
+    host TEXT,
+    mode TEXT,
+    objects INTEGER NOT NULL,
+    maya_calls INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+CREATE INDEX IF NOT EXISTS runs_scene ON runs (scene, id);
+CREATE TABLE IF NOT EXISTS commands (
+    run INTEGER NOT NULL,
+    command TEXT NOT NULL,
+    category TEXT,
+    objects INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    discrepancies INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (run, command)
+);
+CREATE INDEX IF NOT EXISTS commands_command ON commands (command);
+CREATE TABLE IF NOT EXISTS failures (
+    run INTEGER NOT NULL,
+    command TEXT NOT NULL,
+    object TEXT NOT NULL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS failures_run ON failures (run, command, object);
+"""
+
+SINCE_RE = re.compile(r"^(\d+(?:\.\d+)?)([mhdw])$")
+SINCE_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def default_path(presets_dir):
+    """
+    Database next to presets directory
+    """
+    return os.path.join(os.path.dirname(os.path.normpath(presets_dir)), HISTORY_FILE_NAME)
+
+
+def parse_since(text, now=None):
+    """
+    Timestamp from relative age ("12h", "1d", "2w"), "today", "yesterday" (local midnight)
+    or date ("2024-05-31", "2024-05-31 18:00")
+    """
+    if text.strip() in ("today", "yesterday"):
+        midnight = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        if text.strip() == "yesterday":
+            midnight -= datetime.timedelta(days=1)
+        return time.mktime(midnight.timetuple())
+    match = SINCE_RE.match(text.strip())
+    if match:
+        return (now or time.time()) - float(match.group(1)) * SINCE_UNITS[match.group(2)]
+    for date_format in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(datetime.datetime.strptime(text.strip(), date_format).timetuple())
+        except ValueError:
+            pass
+    raise ValueError("Can't read time {!r}, expected age as 12h, 1d, 2w, today, yesterday or date as YYYY-MM-DD".format(text))
+
+
+def asset_name(scene):
+    """
+    Asset of scene file, its name without extension
+    """
+    if not scene:
+        return None
+    return os.path.splitext(os.path.basename(scene))[0]
+
+
+class RunRecorder(object):
+    """
+    Rows of one run kept in memory until finish() writes them at once
+    """
+
+    def __init__(self, history, scene=None, asset=None, preset=None, mode=None, started=None):
+        self.history = history
+        self.run = {
+            "started": started or time.time(),
+            "scene": scene,
+            "asset": asset or asset_name(scene),
+            "preset": preset,
+            "user": getpass.getuser(),
+            "host": socket.gethostname(),
+            "mode": mode,
+        }
+        self.commands = {}
+        self.failures = []
+
+    def add_result(self, command_result):
+        """
+        Add CommandResult, chunk results of the same command are summed
+        """
+        command = self.commands.get(command_result.name)
+        if command is None:
+            command = self.commands[command_result.name] = {
+                "category": command_result.category, "objects": 0, "failed": set(), "discrepancies": 0, "seconds": 0.0}
+        command["objects"] += len(command_result.objects)
+        command["discrepancies"] += len(command_result.discrepancies)
+        command["seconds"] += command_result.seconds
+        for index in command_result.discrepancies:
+            command["failed"].add(index[0])
+            self.failures.append((command_result.name, index[0], index[1]))
+
+    def finish(self, stats=None):
+        """
+        Write the run, returns its id. stats is in_profiling.RunStats summary of the run.
+        """
+        if stats is None:
+            stats = {"seconds": time.time() - self.run["started"],
+                     "objects": max([command["objects"] for command in self.commands.values()] or [0])}
+        return self.history.write_run(self.run, stats["seconds"], stats["objects"], stats.get("maya_calls"),
+                                      self.commands, self.failures)
+
+
+class History(object):
+    """
+    Run history database, connection is shared by threads of the process
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def recorder(self, scene=None, asset=None, preset=None, mode=None, started=None):
+        return RunRecorder(self, scene, asset, preset, mode, started)
+
+    def record_run(self, results, scene=None, asset=None, preset=None, mode=None, stats=None):
+        """
+        Record finished run from CommandResult list, returns run id.
+        stats is in_profiling.RunStats summary of the run.
+        """
+        started = time.time() - stats["seconds"] if stats is not None else None
+        recorder = self.recorder(scene, asset, preset, mode, started)
+        for command_result in results:
+            recorder.add_result(command_result)
+        return recorder.finish(stats)
+
+    def write_run(self, run, seconds, objects, maya_calls, commands, failures):
+        with self._lock:
+            connection = self.connection
+            with connection:
+                cursor = connection.execute(
+                    "INSERT INTO runs (started, seconds, scene, asset, preset, user, host, mode, objects, maya_calls) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run["started"], seconds, run["scene"], run["asset"], run["preset"], run["user"], run["host"],
+                     run["mode"], objects, maya_calls))
+                run_id = cursor.lastrowid
+                connection.executemany(
+                    "INSERT OR REPLACE INTO commands VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, name, command["category"], command["objects"], len(command["failed"]),
+                      command["discrepancies"], command["seconds"]) for name, command in commands.items()])
+                connection.executemany("INSERT INTO failures VALUES (?, ?, ?, ?)",
+                                       ((run_id,) + failure for failure in failures))
+        return run_id
+
+    def _query(self, query, parameters=()):
+        with self._lock:
+            cursor = self.connection.execute(query, parameters)
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def runs(self, since=None, scene=None, limit=50):
+        """
+        Latest runs, newest first
+        """
+        query = "SELECT * FROM runs WHERE started >= ?"
+        parameters = [since or 0]
+        if scene is not None:
+            query += " AND scene = ?"
+            parameters.append(scene)
+        return self._query(query + " ORDER BY id DESC LIMIT ?", parameters + [limit])
+
+    def new_failures(self, since, scene=None):
+        """
+        Failures of the latest run of every scene since given time which the same check didn't
+        report in the latest run of that scene before it. Scenes without earlier run are skipped.
+        """
+        scene_filter = " AND scene = ?" if scene is not None else ""
+        parameters = [since] + ([scene] if scene is not None else []) + [since]
+        query = """
+            SELECT latest.scene AS scene, runs.asset AS asset, failures.command AS command,
+                   failures.object AS object, MIN(failures.message) AS message,
+                   latest.run AS run, runs.started AS started, previous.run AS previous_run
+            FROM (SELECT scene, MAX(id) AS run FROM runs WHERE started >= ?{0} GROUP BY scene) AS latest
+            JOIN (SELECT scene, MAX(id) AS run FROM runs WHERE started < ? GROUP BY scene) AS previous
+                ON previous.scene = latest.scene
+            JOIN runs ON runs.id = latest.run
+            JOIN failures ON failures.run = latest.run
+            JOIN commands ON commands.run = previous.run AND commands.command = failures.command
+            WHERE NOT EXISTS (
+                SELECT 1 FROM failures AS earlier
+                WHERE earlier.run = previous.run AND earlier.command = failures.command
+                    AND earlier.object = failures.object)
+            GROUP BY latest.scene, failures.command, failures.object
+            ORDER BY latest.scene, failures.command, failures.object
+        """.format(scene_filter)
+        return self._query(query, parameters)
+
+    def slowest_commands(self, since=None, limit=10):
+        """
+        Commands by mean seconds per run since given time
+        """
+        return self._query("""
+            SELECT command, COUNT(*) AS runs, AVG(commands.seconds) AS mean_seconds,
+                   MAX(commands.seconds) AS max_seconds, SUM(commands.seconds) AS total_seconds,
+                   SUM(commands.seconds) / MAX(SUM(commands.objects), 1) AS seconds_per_object
+            FROM commands JOIN runs ON runs.id = commands.run
+            WHERE runs.started >= ?
+            GROUP BY command ORDER BY mean_seconds DESC LIMIT ?
+        """, (since or 0, limit))
+
+    def failure_trend(self, command=None, since=None):
+        """
+        Runs, failing objects and failing runs per day, of one command or all of them
+        """
+        query = """
+            SELECT date(runs.started, 'unixepoch', 'localtime') AS day, COUNT(DISTINCT runs.id) AS runs,
+                   SUM(commands.failures) AS failures, COUNT(DISTINCT CASE WHEN commands.failures > 0
+                   THEN runs.id END) AS failed_runs
+            FROM commands JOIN runs ON runs.id = commands.run
+            WHERE runs.started >= ?"""
+        parameters = [since or 0]
+        if command is not None:
+            query += " AND commands.command = ?"
+            parameters.append(command)
+        return self._query(query + " GROUP BY day ORDER BY day", parameters)
+
+    def prune(self, before):
+        """
+        Delete runs started before given time, returns number of deleted runs
+        """
+        with self._lock:
+            connection = self.connection
+            with connection:
+                old = "SELECT id FROM runs WHERE started < ?"
+                connection.execute("DELETE FROM failures WHERE run IN ({})".format(old), (before,))
+                connection.execute("DELETE FROM commands WHERE run IN ({})".format(old), (before,))
+                return connection.execute("DELETE FROM runs WHERE started < ?", (before,)).rowcount
+
+
+def _print_rows(rows, columns):
+    print("  ".join(columns))
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row[column]
+            if column == "started" and value is not None:
+                value = time.strftime("%Y-%m-%d %H:%M", time.localtime(value))
+            elif isinstance(value, float):
+                value = "{:.4g}".format(value)
+            values.append(u"{}".format(value))
+        print(u"  ".join(values).encode("utf-8"))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Inspector run history queries")
+    parser.add_argument("path", help="history database")
+    parser.add_argument("--json", action="store_true", help="print rows as JSON")
+    queries = parser.add_subparsers(dest="query")
+    new_failures = queries.add_parser("new-failures", help="failures which started since given time")
+    new_failures.add_argument("--since", default="1d", help="age (12h, 1d, 2w), today, yesterday or date (YYYY-MM-DD)")
+    new_failures.add_argument("--scene")
+    slowest = queries.add_parser("slowest", help="slowest checks since given time")
+    slowest.add_argument("--since", default="7d")
+    slowest.add_argument("--limit", type=int, default=10)
+    trend = queries.add_parser("trend", help="failures per day")
+    trend.add_argument("--command")
+    trend.add_argument("--since", default="30d")
+    runs = queries.add_parser("runs", help="latest runs")
+    runs.add_argument("--since", default="7d")
+    runs.add_argument("--scene")
+    runs.add_argument("--limit", type=int, default=50)
+    prune = queries.add_parser("prune", help="delete runs older than given time")
+    prune.add_argument("--before", default="90d")
+    args = parser.parse_args(args)
+
+    if not os.path.isfile(args.path):
+        sys.exit("No history database at {}".format(args.path))
+    history = History(args.path)
+    try:
+        if args.query == "prune":
+            print("{} runs deleted".format(history.prune(parse_since(args.before))))
+            return 0
+        since = parse_since(args.since)
+        if args.query == "new-failures":
+            rows = history.new_failures(since, args.scene)
+            columns = ("started", "scene", "command", "object", "message")
+        elif args.query == "slowest":
+            rows = history.slowest_commands(since, args.limit)
+            columns = ("command", "runs", "mean_seconds", "max_seconds", "seconds_per_object")
+        elif args.query == "trend":
+            rows = history.failure_trend(args.command, since)
+            columns = ("day", "runs", "failed_runs", "failures")
+        else:
+            rows = history.runs(since, args.scene, args.limit)
+            columns = ("id", "started", "scene", "preset", "user", "objects", "seconds")
+    except ValueError as error:
+        sys.exit(str(error))
+    finally:
+        history.close()
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_rows(rows, columns)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Result log data behind the dialog log view.
+Command rows hold CommandResult, object rows are built per command only when
+first requested, optionally filtered down to failures. Discrepancies are mapped
+to objects through ResultIndex, built once per command in a single pass.
+No Qt is needed here, UI.inspector_log wraps it into an item model.
+"""
+
+from collections import OrderedDict
+
+SUCCESS = 1
+ERROR = 0
+
+
+class LogRow(object):
+    """
+    Object row of a command, discrepancy is None for objects that passed
+    """
+    __slots__ = ("obj", "discrepancy")
+
+    def __init__(self, obj, discrepancy=None):
+        self.obj = obj
+        self.discrepancy = discrepancy
+
+    @property
+    def state(self):
+        if self.discrepancy is None:
+            return SUCCESS
+        return ERROR
+
+    @property
+    def message(self):
+        if self.discrepancy is None:
+            return ""
+        return self.discrepancy[1]
+
+    def error_nodes(self):
+        if self.discrepancy is None:
+            return []
+        if len(self.discrepancy) > 2:
+            return self.discrepancy[2]
+        return [self.obj]
+
+
+def error_type(discrepancy):
+    # message template groups errors whose messages differ only by parameters
+    return getattr(discrepancy, "template", None) or discrepancy[1]
+
+
+class ResultIndex(object):
+    """
+    Discrepancies of one CommandResult keyed by object and by error type
+    """
+
+    def __init__(self, command_result):
+        self.result = command_result
+        self.by_object = {}
+        for index in command_result.discrepancies:
+            self.by_object.setdefault(index[0], []).append(index)
+
+    def discrepancies(self, obj):
+        return self.by_object.get(obj, [])
+
+    def failed(self, obj):
+        return obj in self.by_object
+
+    def failed_count(self):
+        return len(self.by_object)
+
+    def row_count(self):
+        # every object gets a row, failed objects one per discrepancy
+        return len(self.result.objects) + len(self.result.discrepancies) - len(self.by_object)
+
+    def rows(self, failures_only=False):
+        if failures_only:
+            return [LogRow(index[0], index) for index in self.result.discrepancies]
+        rows = []
+        for obj in self.result.objects:
+            failed = self.by_object.get(obj)
+            if failed is None:
+                rows.append(LogRow(obj))
+            else:
+                rows.extend(LogRow(obj, index) for index in failed)
+        return rows
+
+    def by_error(self):
+        """
+        OrderedDict of error type -> OrderedDict of object -> discrepancies, in first occurrence order
+        """
+        groups = OrderedDict()
+        for index in self.result.discrepancies:
+            groups.setdefault(error_type(index), OrderedDict()).setdefault(index[0], []).append(index)
+        return groups
+
+
+class LogTree(object):
+
+    def __init__(self, failures_only=False):
+        self.failures_only = failures_only
+        self.results = []
+        self._rows = []
+        self._indexes = []
+
+    def add_result(self, command_result):
+        self.results.append(command_result)
+        self._rows.append(None)
+        self._indexes.append(None)
+        return len(self.results) - 1
+
+    def refresh(self, command_row):
+        """
+        Drop built rows after result of the command grew, rows are appended so earlier ones keep their place
+        """
+        self._rows[command_row] = None
+        self._indexes[command_row] = None
+
+    def replace_result(self, command_row, command_result):
+        """
+        Result of the command changed as a whole (fixed objects, renames), rows are rebuilt
+        """
+        self.results[command_row] = command_result
+        self.refresh(command_row)
+
+    def clear(self):
+        self.results = []
+        self._rows = []
+        self._indexes = []
+
+    def set_failures_only(self, failures_only):
+        if failures_only != self.failures_only:
+            self.failures_only = failures_only
+            self._rows = [None] * len(self.results)
+
+    def command_count(self):
+        return len(self.results)
+
+    def command_result(self, command_row):
+        return self.results[command_row]
+
+    def index(self, command_row):
+        index = self._indexes[command_row]
+        if index is None:
+            index = self._indexes[command_row] = ResultIndex(self.results[command_row])
+        return index
+
+    def object_count(self, command_row):
+        if self.failures_only:
+            return len(self.results[command_row].discrepancies)
+        if self._rows[command_row] is None:
+            return self.index(command_row).row_count()
+        return len(self._rows[command_row])
+
+    def object_row(self, command_row, row):
+        return self.rows(command_row)[row]
+
+    def rows(self, command_row):
+        rows = self._rows[command_row]
+        if rows is None:
+            rows = self._rows[command_row] = self.index(command_row).rows(self.failures_only)
+        return rows
+
+    def error_groups(self, command_row):
+        return self.index(command_row).by_error()
@@ -0,0 +1,171 @@
+"""
+Cost aware ordering of commands.
+Commands and the mesh attributes they declare (CheckSpec.requires) form a
+dependency graph, an attribute is collected once before the first command
+needing it and shared by every later one. Planner orders commands cheapest and
+most often failing first: each step takes the command with the lowest expected
+cost per failure, counting only attributes not collected by earlier steps.
+Costs (seconds per object of commands and attribute queries) and failure rates
+are learned from previous runs and kept in a small JSON file next to presets.
+"""
+
+import os
+import json
+import tempfile
+
+import Inspector.checks.in_registry as in_registry
+
+
+COSTS_FILE_NAME = "inspector_costs.json"
+
+# seconds per object assumed before a command or attribute was ever timed
+DEFAULT_COMMAND_SECONDS = 1e-4
+DEFAULT_ATTRIBUTE_SECONDS = {
+    "triangles": 2e-4,
+    "history": 2e-4,
+    "transform": 1e-4,
+    "uv_shells": 5e-4,
+    "locked_normals": 5e-4,
+    "lamina_faces": 1e-3,
+    "topology": 2e-3,
+}
+# weight of the newest run in learned averages
+LEARNING_RATE = 0.3
+# failure rate every command starts with and the lowest one used for ordering,
+# commands which never fail are still ordered by cost
+PRIOR_FAILURE_RATE = 0.1
+MIN_FAILURE_RATE = 1e-3
+
+
+def default_path(presets_dir):
+    """
+    Costs file next to presets directory
+    """
+    return os.path.join(os.path.dirname(os.path.normpath(presets_dir)), COSTS_FILE_NAME)
+
+
+def _average(old, new):
+    if old is None:
+        return new
+    return old + LEARNING_RATE * (new - old)
+
+
+class CostModel(object):
+    """
+    Learned seconds per object of commands and attributes and how often commands fail
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.commands = {}
+        self.attributes = {}
+        self.changed = False
+        if path and os.path.isfile(path):
+            try:
+                with open(path) as costs_file:
+                    data = json.load(costs_file)
+                self.commands = data.get("commands", {})
+                self.attributes = data.get("attributes", {})
+            except (IOError, ValueError, AttributeError) as error:
+                print("Error reading check costs, {}".format(error))
+
+    def command_seconds(self, name):
+        return self.commands.get(name, {}).get("seconds", DEFAULT_COMMAND_SECONDS)
+
+    def failure_rate(self, name):
+        return self.commands.get(name, {}).get("failure_rate", PRIOR_FAILURE_RATE)
+
+    def attribute_seconds(self, attribute):
+        return self.attributes.get(attribute, DEFAULT_ATTRIBUTE_SECONDS.get(attribute, DEFAULT_COMMAND_SECONDS))
+
+    def record_result(self, command_result):
+        # results served from cache take next to no time, only objects the command ran on are timed
+        if not command_result.executed:
+            return
+        costs = self.commands.setdefault(command_result.name, {})
+        costs["seconds"] = _average(costs.get("seconds"), command_result.seconds / command_result.executed)
+        costs["failure_rate"] = _average(costs.get("failure_rate"), 1.0 if command_result.discrepancies else 0.0)
+        self.changed = True
+
+    def record_mesh_data(self, mesh_data):
+        for attribute, (seconds, objects) in mesh_data.attribute_seconds.items():
+            if objects:
+                self.attributes[attribute] = _average(self.attributes.get(attribute), seconds / objects)
+                self.changed = True
+
+    def save(self):
+        if not (self.path and self.changed):
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        # written next to the target and renamed, readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as costs_file:
+                json.dump({"commands": self.commands, "attributes": self.attributes}, costs_file, indent=1)
+            if os.name == "nt" and os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError) as error:
+            print("Error saving check costs, {}".format(error))
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.changed = False
+
+
+class PlanStep(object):
+    __slots__ = ("category", "command", "attributes", "cost", "failure_rate")
+
+    def __init__(self, category, command, attributes, cost, failure_rate):
+        self.category = category
+        self.command = command
+        # attributes first needed by this step, collected right before it
+        self.attributes = attributes
+        # expected seconds per object of the step including its new attributes
+        self.cost = cost
+        self.failure_rate = failure_rate
+
+
+class Planner(object):
+
+    def __init__(self, costs=None):
+        self.costs = costs if costs is not None else CostModel()
+
+    def plan(self, pairs):
+        """
+        PlanStep list of (category, command) pairs in execution order
+        """
+        remaining = []
+        for position, (category, command) in enumerate(pairs):
+            requires = in_registry.get(command[0]).requires
+            remaining.append((position, category, command, requires))
+        collected = set()
+        steps = []
+        while remaining:
+            best = None
+            for entry in remaining:
+                position, category, command, requires = entry
+                new = [attr for attr in requires if attr not in collected]
+                cost = self.costs.command_seconds(command[0]) + sum(self.costs.attribute_seconds(attr) for attr in new)
+                failure_rate = self.costs.failure_rate(command[0])
+                # preset position breaks ties so equal commands keep their order
+                key = (cost / max(failure_rate, MIN_FAILURE_RATE), position)
+                if best is None or key < best[0]:
+                    best = (key, entry, new, cost, failure_rate)
+            key, entry, new, cost, failure_rate = best
+            remaining.remove(entry)
+            collected.update(new)
+            steps.append(PlanStep(entry[1], entry[2], new, cost, failure_rate))
+        return steps
+
+    def order(self, pairs):
+        return [(step.category, step.command) for step in self.plan(pairs)]
+
+    def record_result(self, command_result):
+        self.costs.record_result(command_result)
+
+    def record_mesh_data(self, mesh_data):
+        self.costs.record_mesh_data(mesh_data)
+
+    def save(self):
+        self.costs.save()
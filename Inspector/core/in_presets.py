@@ -0,0 +1,428 @@
+"""
+Preset files loading and saving.
+Presets are stored in a versioned binary format (.insp): magic bytes, format
+version and zlib compressed JSON of typed preset fields. Legacy presets, cPickle
+dumps of nested settings lists (.txt), are migrated on load without executing
+pickle payloads. Parsed presets are cached by file modification time.
+current_preset.txt holds [preset name, preset path] of the preset used last.
+
+    python -m Inspector.core.in_presets legacy_preset.txt new_preset.insp
+"""
+
+import os
+import re
+import sys
+import json
+import zlib
+import struct
+import cPickle
+from cStringIO import StringIO
+
+
+DEFAULT_PRESET_NAME = "Default Preset"
+PRESET_EXTENSION = ".insp"
+LEGACY_EXTENSION = ".txt"
+
+MAGIC = "INSP"
+HEADER = struct.Struct(">4sH")
+FORMAT_VERSION = 1
+
+_preset_cache = {}
+
+
+class PresetError(Exception):
+    pass
+
+
+class PresetOption(object):
+    __slots__ = ("key", "widget", "value")
+
+    def __init__(self, key, widget, value):
+        self.key = key
+        self.widget = widget
+        self.value = value
+
+
+class PresetCommand(object):
+    __slots__ = ("name", "checked", "visible", "options")
+
+    def __init__(self, name, checked=True, visible=True, options=None):
+        self.name = name
+        self.checked = checked
+        self.visible = visible
+        # list of PresetOption, None for commands without options
+        self.options = options
+
+
+class PresetCategory(object):
+    __slots__ = ("name", "commands")
+
+    def __init__(self, name, commands=None):
+        self.name = name
+        self.commands = commands if commands is not None else []
+
+
+class Preset(object):
+    __slots__ = ("name", "categories")
+
+    def __init__(self, name=None, categories=None):
+        self.name = name
+        self.categories = categories if categories is not None else []
+
+    @classmethod
+    def from_settings_list(cls, settings_list, name=None):
+        # legacy files can hold any pickled value, anything but a settings list is an invalid preset
+        try:
+            categories = []
+            for category in settings_list:
+                commands = []
+                for command in category[1]:
+                    options = None
+                    if len(command) > 2:
+                        options = []
+                        for opt in command[2]["options"]:
+                            for key, value in opt.items():
+                                options.append(PresetOption(_text(key), _text(value[0]), value[1]))
+                    commands.append(PresetCommand(_text(command[0]), bool(command[1][0]), bool(command[1][1]),
+                                                  options))
+                categories.append(PresetCategory(_text(category[0]), commands))
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError) as error:
+            raise PresetError("Invalid settings list, {}".format(error))
+        return cls(name, categories)
+
+    def to_settings_list(self):
+        settings_list = []
+        for category in self.categories:
+            commands = []
+            for command in category.commands:
+                command_list = [command.name, [int(command.checked), int(command.visible)]]
+                if command.options is not None:
+                    command_list.append({"options": [{opt.key: [opt.widget, opt.value]} for opt in command.options]})
+                commands.append(command_list)
+            settings_list.append([category.name, commands])
+        return settings_list
+
+    def to_dict(self):
+        return {
+            "version": FORMAT_VERSION,
+            "name": self.name,
+            "categories": [
+                {
+                    "name": category.name,
+                    "commands": [
+                        {
+                            "name": command.name,
+                            "checked": command.checked,
+                            "visible": command.visible,
+                            "options": None if command.options is None else [
+                                {"key": opt.key, "widget": opt.widget, "value": opt.value} for opt in command.options],
+                        } for command in category.commands],
+                } for category in self.categories],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        try:
+            categories = []
+            for category in data["categories"]:
+                commands = []
+                for command in category["commands"]:
+                    options = command.get("options")
+                    if options is not None:
+                        options = [PresetOption(_text(opt["key"]), _text(opt["widget"]), opt["value"]) for opt in options]
+                    commands.append(PresetCommand(_text(command["name"]), bool(command["checked"]),
+                                                  bool(command["visible"]), options))
+                categories.append(PresetCategory(_text(category["name"]), commands))
+        except (KeyError, TypeError, ValueError) as error:
+            raise PresetError("Invalid preset data, {}".format(error))
+        return cls(data.get("name"), categories)
+
+
+class PresetModel(object):
+    """
+    Settings list indexed by command name. Command lists stay shared with the settings
+    list (engine and preset files read them as before), changes made through the model
+    keep the index of checked commands and notify listeners with (command name, field, value),
+    field being "checked", "visible" or "options".
+    """
+
+    def __init__(self, settings_list):
+        self.settings_list = settings_list
+        self._commands = {}
+        self._categories = {}
+        self._order = {}
+        self._checked = set()
+        self._listeners = []
+        for category in settings_list:
+            for command in category[1]:
+                self._order[command[0]] = len(self._order)
+                self._commands[command[0]] = command
+                self._categories[command[0]] = category[0]
+                if command[1][0] == 1:
+                    self._checked.add(command[0])
+
+    @classmethod
+    def from_preset(cls, preset):
+        return cls(preset.to_settings_list())
+
+    def to_preset(self, name=None):
+        return Preset.from_settings_list(self.settings_list, name)
+
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, name, field, value):
+        for listener in self._listeners:
+            listener(name, field, value)
+
+    def __contains__(self, name):
+        return name in self._commands
+
+    def __len__(self):
+        return len(self._commands)
+
+    def command(self, name):
+        return self._commands[name]
+
+    def category(self, name):
+        return self._categories[name]
+
+    def categories(self):
+        return [category[0] for category in self.settings_list]
+
+    def commands(self, category=None):
+        """
+        Command lists in preset order, of one category when given
+        """
+        if category is None:
+            return [command for settings_category in self.settings_list for command in settings_category[1]]
+        for settings_category in self.settings_list:
+            if settings_category[0] == category:
+                return list(settings_category[1])
+        raise KeyError(category)
+
+    def pairs(self, checked_only=False):
+        """
+        (category name, command) pairs in preset order
+        """
+        if checked_only:
+            return [(self._categories[name], self._commands[name]) for name in self.checked_names()]
+        return [(category[0], command) for category in self.settings_list for command in category[1]]
+
+    def checked_names(self):
+        return sorted(self._checked, key=self._order.__getitem__)
+
+    def checked_commands(self):
+        return [self._commands[name] for name in self.checked_names()]
+
+    def is_checked(self, name):
+        return name in self._checked
+
+    def set_checked(self, name, checked=True):
+        command = self._commands[name]
+        if bool(checked) == (command[1][0] == 1):
+            return
+        command[1][0] = int(bool(checked))
+        if checked:
+            self._checked.add(name)
+        else:
+            self._checked.discard(name)
+        self._notify(name, "checked", bool(checked))
+
+    def set_checked_many(self, names, checked=True):
+        for name in names:
+            self.set_checked(name, checked)
+
+    def is_visible(self, name):
+        return self._commands[name][1][1] == 1
+
+    def set_visible(self, name, visible=True):
+        command = self._commands[name]
+        if bool(visible) == (command[1][1] == 1):
+            return
+        command[1][1] = int(bool(visible))
+        self._notify(name, "visible", bool(visible))
+
+    def options(self, name):
+        """
+        Options of command as {key: value}, None for commands without options
+        """
+        command = self._commands[name]
+        if len(command) < 3:
+            return None
+        return dict((key, value[1]) for opt in command[2]["options"] for key, value in opt.items())
+
+    def option(self, name, key):
+        return self.options(name)[key]
+
+    def set_option(self, name, key, value):
+        command = self._commands[name]
+        if len(command) < 3:
+            raise KeyError("Command {} has no options".format(name))
+        for opt in command[2]["options"]:
+            if key in opt:
+                if opt[key][1] != value:
+                    opt[key][1] = value
+                    self._notify(name, "options", self.options(name))
+                return
+        raise KeyError("Command {} has no option {}".format(name, key))
+
+
+def _text(value):
+    if not isinstance(value, basestring):
+        raise ValueError("expected text, got {!r}".format(value))
+    return value
+
+
+# format version -> function upgrading preset dict of that version to the next one
+MIGRATIONS = {}
+
+
+def migrate(data):
+    version = data.get("version", 0)
+    if version > FORMAT_VERSION:
+        raise PresetError("Preset format version {} is newer than supported {}".format(version, FORMAT_VERSION))
+    while version < FORMAT_VERSION:
+        if version not in MIGRATIONS:
+            raise PresetError("Preset format version {} can't be migrated".format(version))
+        data = MIGRATIONS[version](data)
+        version = data["version"]
+    return data
+
+
+def safe_unpickle(data):
+    """
+    Load legacy cPickle data refusing any class or function reference
+    """
+    unpickler = cPickle.Unpickler(StringIO(data))
+    unpickler.find_global = None
+    try:
+        return unpickler.load()
+    except (cPickle.UnpicklingError, EOFError, ValueError, KeyError, IndexError) as error:
+        raise PresetError("Invalid legacy preset, {}".format(error))
+
+
+def parse_preset(data, name=None):
+    if data.startswith(MAGIC):
+        if len(data) < HEADER.size:
+            raise PresetError("Invalid preset, truncated header")
+        magic, version = HEADER.unpack_from(data)
+        try:
+            payload = json.loads(zlib.decompress(data[HEADER.size:]).decode("utf-8"))
+        except (zlib.error, ValueError) as error:
+            raise PresetError("Invalid preset, {}".format(error))
+        payload["version"] = version
+        return Preset.from_dict(migrate(payload))
+    return Preset.from_settings_list(safe_unpickle(data), name)
+
+
+def dump_preset(preset):
+    payload = json.dumps(preset.to_dict(), separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(MAGIC, FORMAT_VERSION) + zlib.compress(payload)
+
+
+def presets_dir(scripts_dir):
+    return os.path.join(scripts_dir, "Inspector/presets")
+
+
+def read_preset(path):
+    """
+    Preset from binary or legacy file, parsed presets are reused while file mtime and size don't change
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (stat.st_mtime, stat.st_size)
+    cached = _preset_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as preset_file:
+        preset = parse_preset(preset_file.read(), preset_name(path))
+    _preset_cache[path] = (key, preset)
+    return preset
+
+
+def write_preset(path, preset):
+    """
+    Write preset, legacy .txt paths are kept as cPickle settings list for older Inspector versions
+    """
+    if path.lower().endswith(LEGACY_EXTENSION):
+        data = cPickle.dumps(preset.to_settings_list())
+    else:
+        data = dump_preset(preset)
+    with open(path, "wb") as preset_file:
+        preset_file.write(data)
+    _preset_cache.pop(os.path.abspath(path), None)
+
+
+def load_preset(path):
+    return read_preset(path).to_settings_list()
+
+
+def save_preset(path, settings_list):
+    write_preset(path, Preset.from_settings_list(settings_list, preset_name(path)))
+
+
+def preset_name(path):
+    """
+    Name shown in dialog label, "custom_preset.txt" becomes "custom preset"
+    """
+    input_name = re.split('[_.]', os.path.split(path)[1])
+    file_name = input_name[0]
+    for w in input_name[1:]:
+        if w not in ('txt', 'insp'):
+            file_name = file_name + " " + w
+    return file_name
+
+
+def set_current_preset(directory, name, path):
+    # kept as cPickle list, older Inspector versions read this file with cPickle.load
+    with open(os.path.join(directory, "current_preset.txt"), "wb") as current_file:
+        cPickle.dump([name, path], current_file)
+
+
+def read_current_preset(path):
+    # cPickle list, loaded without executing pickled code, JSON written by some versions is accepted too
+    with open(path, "rb") as current_file:
+        data = current_file.read()
+    try:
+        return json.loads(data)
+    except ValueError:
+        return safe_unpickle(data)
+
+
+def load_current_preset(directory):
+    """
+    Return ([preset name, preset path], settings list) of current preset.
+    Preset path is tried as is and then inside custom folder, default preset is loaded if both fail.
+    """
+    current_preset_path = os.path.join(directory, "current_preset.txt")
+    try:
+        current_preset_list = read_current_preset(current_preset_path)
+    except:
+        print("Error opening current preset file, {}".format(current_preset_path))
+        raise
+
+    for path in (current_preset_list[1], os.path.join(directory, "custom", current_preset_list[1])):
+        if os.path.isfile(path):
+            try:
+                return current_preset_list, load_preset(path)
+            except PresetError as error:
+                print("Error reading settings preset file, {}".format(error))
+                break
+
+    print("Error opening settings preset file, {}\nLoading Default Preset".format(current_preset_list[1]))
+    default_preset_path = os.path.join(directory, "default.txt")
+    return [DEFAULT_PRESET_NAME, default_preset_path], load_preset(default_preset_path)
+
+
+def convert(source, destination):
+    write_preset(destination, read_preset(source))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python -m Inspector.core.in_presets <source preset> <destination preset>")
+    convert(sys.argv[1], sys.argv[2])
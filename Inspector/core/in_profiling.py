@@ -0,0 +1,95 @@
+"""
+Run instrumentation.
+RunStats collects wall time per command and per object, number of backend
+(Maya) queries and peak result size of an engine run. profiled() dumps
+cProfile output of a block for finding hot spots.
+"""
+
+import time
+import cProfile
+from contextlib import contextmanager
+
+from Inspector.checks.in_discrepancy import Discrepancy
+
+
+class RunStats(object):
+
+    def __init__(self):
+        self.start = time.time()
+        self.seconds = 0.0
+        self.commands = {}
+        self.object_seconds = {}
+        self.bulk_seconds = 0.0
+        self.maya_calls = 0
+        self.peak_result_size = 0
+        self.objects = 0
+
+    def add_result(self, command_result):
+        stats = self.commands.setdefault(command_result.name, {"seconds": 0.0, "objects": 0, "discrepancies": 0})
+        stats["seconds"] += command_result.seconds
+        stats["objects"] += len(command_result.objects)
+        stats["discrepancies"] += len(command_result.discrepancies)
+        # result size counts discrepancies and every error node they carry
+        size = len(command_result.discrepancies)
+        for index in command_result.discrepancies:
+            if isinstance(index, Discrepancy):
+                # counted from component indices, names are never built here
+                if index.component is not None:
+                    size += index.node_count()
+            elif len(index) > 2:
+                size += len(index[2])
+        self.peak_result_size = max(self.peak_result_size, size)
+
+    def add_mesh_data(self, mesh_data):
+        self.maya_calls += mesh_data.calls
+        self.bulk_seconds += mesh_data.bulk_seconds
+        for obj, seconds in mesh_data.object_seconds.items():
+            self.object_seconds[obj] = self.object_seconds.get(obj, 0.0) + seconds
+
+    def add_objects(self, count):
+        self.objects += count
+
+    def finish(self):
+        self.seconds = time.time() - self.start
+
+    def slowest_commands(self, count=5):
+        return sorted(self.commands.items(), key=lambda item: item[1]["seconds"], reverse=True)[:count]
+
+    def slowest_objects(self, count=5):
+        return sorted(self.object_seconds.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def summary(self):
+        return {
+            "seconds": self.seconds,
+            "objects": self.objects,
+            "maya_calls": self.maya_calls,
+            "query_seconds": sum(self.object_seconds.values()) + self.bulk_seconds,
+            "peak_result_size": self.peak_result_size,
+            "commands": self.commands,
+            "slowest_objects": self.slowest_objects(),
+        }
+
+    def summary_text(self):
+        text = "{} commands, {} objects in {:.2f}s, {} Maya calls".format(
+            len(self.commands), self.objects, self.seconds, self.maya_calls)
+        slowest = self.slowest_commands(1)
+        if slowest:
+            text += ", slowest {} ({:.2f}s)".format(slowest[0][0], slowest[0][1]["seconds"])
+        return text
+
+
+@contextmanager
+def profiled(path=None):
+    """
+    Run block under cProfile and dump stats to path, without path the block runs unprofiled
+    """
+    if not path:
+        yield None
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
@@ -0,0 +1,127 @@
+"""
+Machine readable result reports.
+Discrepancies are written one row at a time to JSON Lines or CSV, so reports can
+be streamed while the engine runs and nothing has to be kept in memory.
+Row "type" is "discrepancy", or "command" and "run" for timing summary rows.
+"""
+
+import os
+import csv
+import json
+
+
+FORMATS = ("jsonl", "csv")
+FIELDS = ("type", "preset", "scene", "category", "command", "object", "message", "error_nodes", "seconds")
+
+
+def discrepancy_rows(command_result, preset_name=None, scene=None):
+    """
+    One row dict per discrepancy of CommandResult
+    """
+    for index in command_result.discrepancies:
+        yield {
+            "type": "discrepancy",
+            "preset": preset_name,
+            "scene": scene,
+            "category": command_result.category,
+            "command": command_result.name,
+            "object": index[0],
+            "message": index[1],
+            "error_nodes": list(index[2]) if len(index) > 2 else [index[0]],
+            "seconds": command_result.seconds,
+        }
+
+
+class ReportWriter(object):
+
+    def __init__(self, stream, report_format="jsonl", preset_name=None, scene=None):
+        if report_format not in FORMATS:
+            raise ValueError("Unknown report format {}, expected one of {}".format(report_format, ", ".join(FORMATS)))
+        self.stream = stream
+        self.report_format = report_format
+        self.preset_name = preset_name
+        # scene written with following rows, batch validation sets it per scene
+        self.scene = scene
+        self.rows = 0
+        self._csv = None
+        if report_format == "csv":
+            self._csv = csv.writer(stream)
+            self._csv.writerow(FIELDS)
+
+    @classmethod
+    def open(cls, path, report_format=None, preset_name=None):
+        """
+        Writer for file path, format is taken from extension when not given
+        """
+        if report_format is None:
+            report_format = os.path.splitext(path)[1].lstrip(".").lower() or FORMATS[0]
+        return cls(open(path, "wb"), report_format, preset_name)
+
+    def write_row(self, row):
+        if self._csv is not None:
+            self._csv.writerow([self._csv_value(row.get(field)) for field in FIELDS])
+        else:
+            self.stream.write(json.dumps(row, sort_keys=True) + "\n")
+        self.rows += 1
+
+    def write_result(self, command_result):
+        for row in discrepancy_rows(command_result, self.preset_name, self.scene):
+            self.write_row(row)
+        self.stream.flush()
+
+    def write_stats(self, stats):
+        """
+        Summary rows from in_profiling.RunStats, one per command and one for the whole run
+        """
+        for name, command_stats in sorted(stats.commands.items()):
+            row = {
+                "type": "command",
+                "preset": self.preset_name,
+                "scene": self.scene,
+                "command": name,
+                "message": "{} objects, {} discrepancies".format(command_stats["objects"], command_stats["discrepancies"]),
+                "seconds": command_stats["seconds"],
+            }
+            if self._csv is None:
+                row.update(command_stats)
+            self.write_row(row)
+
+        row = {
+            "type": "run",
+            "preset": self.preset_name,
+            "scene": self.scene,
+            "message": stats.summary_text(),
+            "seconds": stats.seconds,
+        }
+        if self._csv is None:
+            summary = stats.summary()
+            del summary["commands"]
+            row.update(summary)
+        self.write_row(row)
+        self.stream.flush()
+
+    def write_results(self, command_results):
+        """
+        Consume results (for example Engine.iter_run generator) writing each one as it arrives
+        """
+        for command_result in command_results:
+            self.write_result(command_result)
+
+    def close(self):
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _csv_value(value):
+        if isinstance(value, list):
+            value = " ".join(value)
+        if isinstance(value, unicode):
+            value = value.encode("utf-8")
+        if value is None:
+            value = ""
+        return value
@@ -0,0 +1,112 @@
+"""
+Scene gathering of meshes to inspect.
+Meshes are collected with a few bulk Maya queries (whole scene, selection,
+hierarchies under roots, namespaces, set members) and filtered by name
+patterns. ObjectSet keeps inspected objects in insertion order with O(1)
+add, remove and lookup.
+"""
+
+import fnmatch
+from collections import OrderedDict
+
+
+class ObjectSet(object):
+
+    def __init__(self, objects_list=()):
+        self._objects = OrderedDict()
+        self.update(objects_list)
+
+    def add(self, obj):
+        """
+        Add object, returns False if it was already in the set
+        """
+        if obj in self._objects:
+            return False
+        self._objects[obj] = None
+        return True
+
+    def update(self, objects_list):
+        """
+        Add objects, returns list of objects which weren't in the set yet
+        """
+        added = []
+        for obj in objects_list:
+            if obj not in self._objects:
+                self._objects[obj] = None
+                added.append(obj)
+        return added
+
+    def remove(self, obj):
+        del self._objects[obj]
+
+    def discard(self, obj):
+        self._objects.pop(obj, None)
+
+    def clear(self):
+        self._objects.clear()
+
+    def rename(self, names):
+        """
+        Replace objects by {old: new} names keeping their order
+        """
+        self._objects = OrderedDict((names.get(obj, obj), None) for obj in self._objects)
+
+    def __contains__(self, obj):
+        return obj in self._objects
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def __len__(self):
+        return len(self._objects)
+
+
+def unique(objects_list):
+    seen = set()
+    return [obj for obj in objects_list if not (obj in seen or seen.add(obj))]
+
+
+def short_name(obj):
+    return obj.rsplit("|", 1)[-1]
+
+
+def match_patterns(objects_list, patterns):
+    """
+    Objects whose short name (namespace included) matches any of glob patterns
+    """
+    return [obj for obj in objects_list if any(fnmatch.fnmatchcase(short_name(obj), pattern) for pattern in patterns)]
+
+
+def gather_meshes(roots=None, namespaces=None, sets=None, patterns=None, selection=False, long_names=True):
+    """
+    Transforms of non intermediate meshes from selection, under roots, in namespaces
+    and in sets (all meshes in scene when none is given), filtered by name patterns.
+    """
+    import maya.cmds as mc
+
+    shapes = []
+    if selection:
+        shapes += mc.ls(sl=True, dag=True, type="mesh", noIntermediate=True, long=True) or []
+    if roots:
+        descendants = mc.listRelatives(roots, allDescendents=True, type="mesh", fullPath=True) or []
+        if descendants:
+            shapes += mc.ls(descendants, noIntermediate=True, long=True) or []
+    if namespaces:
+        namespace_patterns = []
+        for namespace in namespaces:
+            namespace = namespace.strip(":")
+            namespace_patterns += ["{}:*".format(namespace), "{}:*:*".format(namespace)]
+        shapes += mc.ls(namespace_patterns, type="mesh", noIntermediate=True, long=True) or []
+    if sets:
+        members = mc.sets(sets, q=True) or []
+        if members:
+            shapes += mc.ls(members, dag=True, type="mesh", noIntermediate=True, long=True) or []
+    if not (selection or roots or namespaces or sets):
+        shapes = mc.ls(type="mesh", noIntermediate=True, long=True) or []
+    if not shapes:
+        return []
+
+    transforms = unique(mc.listRelatives(unique(shapes), parent=True, type="transform", fullPath=long_names) or [])
+    if patterns:
+        transforms = match_patterns(transforms, patterns)
+    return transforms
@@ -0,0 +1,192 @@
+"""
+Chunked execution of engine runs.
+Objects are split into chunks and the run advances one chunk per step(), so a
+host event loop (QTimer in the dialog, maya.utils.executeDeferred) can call it
+between UI events. Checks registered as parallel_safe run on a worker thread,
+cache bookkeeping and Maya queries stay on the calling thread. Results of every
+chunk are merged into one CommandResult per command and reported as they come.
+"""
+
+import time
+import Queue
+import threading
+
+import Inspector.checks.in_registry as in_registry
+from Inspector.core.in_engine import CommandResult, run_command
+
+
+CHUNK_SIZE = 250
+
+
+class Worker(object):
+    """
+    Background thread running jobs one by one, finished jobs are collected with done()
+    """
+
+    def __init__(self):
+        self.jobs = Queue.Queue()
+        self.finished = Queue.Queue()
+        self.cancelled = False
+        self.thread = threading.Thread(target=self._loop, name="InspectorWorker")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _loop(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            if self.cancelled:
+                continue
+            key, function, args = job
+            try:
+                self.finished.put((key, function(*args), None))
+            except Exception as error:
+                self.finished.put((key, None, error))
+
+    def submit(self, key, function, *args):
+        self.jobs.put((key, function, args))
+
+    def done(self):
+        finished = []
+        while True:
+            try:
+                finished.append(self.finished.get_nowait())
+            except Queue.Empty:
+                return finished
+
+    def stop(self, wait=False):
+        self.jobs.put(None)
+        if wait:
+            self.thread.join()
+
+
+class Scheduler(object):
+    """
+    Runs commands over objects in chunks. Callbacks:
+    on_result(command_result) after every chunk with merged result of the command,
+    on_progress(done, total) with finished command chunks,
+    on_finished(cancelled) once the run ends.
+    """
+
+    def __init__(self, engine, objects_list, commands=None, chunk_size=CHUNK_SIZE, stats=None,
+                 on_result=None, on_progress=None, on_finished=None, threaded=True):
+        self.engine = engine
+        self.objects_list = list(objects_list)
+        self.pairs = engine.command_pairs(commands)
+        self.chunk_size = chunk_size or len(self.objects_list) or 1
+        self.stats = stats
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+
+        self.results = [CommandResult(command[0], category, [], []) for category, command in self.pairs]
+        self.chunk_count = max(1, (len(self.objects_list) + self.chunk_size - 1) // self.chunk_size)
+        self.total = self.chunk_count * len(self.pairs)
+        self.done = 0
+        self.next_chunk = 0
+        self.pending = 0
+        self.cancelled = False
+        self.finished = False
+        self.worker = None
+        if threaded and any(in_registry.get(command[0]).parallel_safe for category, command in self.pairs):
+            self.worker = Worker()
+
+    def progress(self):
+        if not self.total:
+            return 1.0
+        return float(self.done) / self.total
+
+    def cancel(self):
+        if self.finished:
+            return
+        self.cancelled = True
+        if self.worker is not None:
+            self.worker.cancelled = True
+        self._finish()
+
+    def step(self):
+        """
+        Merge finished worker jobs and run next chunk, returns False once the run is over
+        """
+        if self.finished:
+            return False
+        try:
+            self._collect_worker()
+            if self.next_chunk < self.chunk_count:
+                self._run_chunk(self.next_chunk)
+                self.next_chunk += 1
+            elif not self.pending:
+                self._finish()
+                return False
+        except Exception:
+            # failed check ends the run instead of being retried every step
+            self.cancel()
+            raise
+        return True
+
+    def run(self, poll=0.005):
+        """
+        Run to the end on current thread, for headless use
+        """
+        while self.step():
+            if self.next_chunk >= self.chunk_count and self.pending:
+                time.sleep(poll)
+        return self.results
+
+    def _run_chunk(self, chunk_index):
+        start = chunk_index * self.chunk_size
+        chunk = self.objects_list[start:start + self.chunk_size]
+        mesh_data = self.engine.collect_mesh_data(chunk, self.pairs)
+        for index, (category, command) in enumerate(self.pairs):
+            if self.worker is not None and in_registry.get(command[0]).parallel_safe:
+                stale = self.engine.stale_objects(command, chunk)
+                self.pending += 1
+                self.worker.submit((index, chunk, stale), _timed_command, command, stale, mesh_data)
+            else:
+                self._add_result(index, self.engine.run_command(command, chunk, category, mesh_data))
+        self.engine.record_mesh_data(mesh_data, self.stats)
+        if self.stats is not None:
+            self.stats.add_objects(len(chunk))
+
+    def _collect_worker(self):
+        if self.worker is None:
+            return
+        for (index, chunk, stale), output, error in self.worker.done():
+            self.pending -= 1
+            if error is not None:
+                raise error
+            discrepancies, seconds = output
+            category, command = self.pairs[index]
+            self._add_result(index, self.engine.command_result(command, category, chunk, stale, discrepancies, seconds))
+
+    def _add_result(self, index, chunk_result):
+        result = self.results[index]
+        result.objects.extend(chunk_result.objects)
+        result.discrepancies.extend(chunk_result.discrepancies)
+        result.seconds += chunk_result.seconds
+        result.executed += chunk_result.executed
+        self.done += 1
+        self.engine.record_result(chunk_result, self.stats)
+        if self.on_result is not None:
+            self.on_result(result)
+        if self.on_progress is not None:
+            self.on_progress(self.done, self.total)
+
+    def _finish(self):
+        self.finished = True
+        if self.worker is not None:
+            # worker is idle once every job is collected, cancelled runs don't wait for a running job
+            self.worker.stop(wait=not self.cancelled)
+        if self.engine.planner is not None:
+            self.engine.planner.save()
+        if self.stats is not None:
+            self.stats.finish()
+        if self.on_finished is not None:
+            self.on_finished(self.cancelled)
+
+
+def _timed_command(command, objects_list, mesh_data):
+    start = time.time()
+    discrepancies = run_command(command, objects_list, mesh_data) if objects_list else []
+    return discrepancies, time.time() - start
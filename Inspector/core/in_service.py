@@ -0,0 +1,478 @@
+"""
+Validation service with warm workers.
+A pool of long lived worker processes (in_batch --serve, mayapy in production)
+keeps Maya initialized, presets parsed and check modules imported between jobs.
+Jobs ("validate this scene with this preset") are queued by priority and run
+by the first free worker, results are polled by job id over a local HTTP endpoint:
+
+    POST   /jobs             {"scene": path, "preset": path, "priority": 0, "mode": "full", "budget": null}
+    GET    /jobs/<id>        job status and result, ?wait=seconds blocks until the job finishes
+    DELETE /jobs/<id>        cancel queued job
+    GET    /status           queue and workers
+
+    mayapy -m Inspector.core.in_service --port 8765 --workers 2
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import Queue
+import urllib2
+import argparse
+import itertools
+import threading
+import subprocess
+import collections
+import BaseHTTPServer
+import SocketServer
+from urlparse import urlparse, parse_qs
+
+import Inspector.core.in_batch as in_batch
+import Inspector.core.in_presets as in_presets
+from Inspector.core.in_engine import CommandResult, MODES, MODE_FULL
+from Inspector.core.in_history import History
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_URL = "http://{}:{}".format(DEFAULT_HOST, DEFAULT_PORT)
+
+# job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# finished jobs kept for polling, oldest are forgotten first
+KEEP_FINISHED = 1000
+
+
+class WorkerDied(Exception):
+    pass
+
+
+class Job(object):
+    __slots__ = ("id", "scene", "preset", "priority", "mode", "budget", "status", "attempts", "worker",
+                 "submitted", "started", "finished", "output", "error", "_event")
+
+    def __init__(self, scene, preset, priority=0, mode=MODE_FULL, budget=None):
+        self.id = uuid.uuid4().hex
+        self.scene = scene
+        self.preset = preset
+        # higher priority runs sooner, jobs of same priority run in order of submission
+        self.priority = priority
+        self.mode = mode
+        self.budget = budget
+        self.status = QUEUED
+        self.attempts = 0
+        self.worker = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.output = None
+        self.error = None
+        self._event = threading.Event()
+
+    def finish(self, status, output=None, error=None):
+        self.status = status
+        self.output = output
+        self.error = error
+        self.finished = time.time()
+        self._event.set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    def request(self):
+        """
+        Job line sent to the worker
+        """
+        return {"id": self.id, "scene": self.scene, "preset": self.preset, "mode": self.mode, "budget": self.budget}
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "scene": self.scene,
+            "preset": self.preset,
+            "priority": self.priority,
+            "mode": self.mode,
+            "status": self.status,
+            "attempts": self.attempts,
+            "worker": self.worker,
+            "queued_seconds": round((self.started or time.time()) - self.submitted, 3),
+            "seconds": round(self.finished - self.started, 3) if self.finished and self.started else None,
+            "error": self.error,
+            "results": self.output["results"] if self.output else None,
+            "stats": self.output["stats"] if self.output else None,
+        }
+
+
+class WarmWorker(object):
+    """
+    One `in_batch --serve` process, replies and log lines are read on background threads
+    """
+
+    def __init__(self, interpreter=None, cache_path=None, costs_path=None):
+        self.interpreter = interpreter or sys.executable
+        self.cache_path = cache_path
+        self.costs_path = costs_path
+        self.process = None
+        self.replies = None
+        self.log = collections.deque(maxlen=50)
+        self.jobs_done = 0
+
+    def start(self):
+        self.process = subprocess.Popen([self.interpreter, "-m", "Inspector.core.in_batch", "--serve"],
+                                        env=in_batch.worker_env(), stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.replies = Queue.Queue()
+        self.jobs_done = 0
+        for target, args in ((self._read_replies, (self.process.stdout, self.replies)),
+                             (self._read_log, (self.process.stderr,))):
+            thread = threading.Thread(target=target, args=args)
+            thread.daemon = True
+            thread.start()
+
+    @staticmethod
+    def _read_replies(stream, replies):
+        for line in iter(stream.readline, ""):
+            replies.put(line)
+        # end of output, worker process is gone
+        replies.put(None)
+
+    def _read_log(self, stream):
+        for line in iter(stream.readline, ""):
+            self.log.append(line)
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def run(self, job, timeout=None):
+        """
+        Send job and return worker reply, None when timeout runs out. Raises WorkerDied when process exits.
+        """
+        request = job.request()
+        if self.cache_path:
+            request["cache"] = self.cache_path
+        if self.costs_path:
+            request["costs"] = self.costs_path
+        try:
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except (IOError, OSError):
+            raise WorkerDied(self.log_tail())
+        while True:
+            try:
+                line = self.replies.get(timeout=timeout)
+            except Queue.Empty:
+                return None
+            if line is None:
+                self.process.wait()
+                raise WorkerDied(self.log_tail() or "Worker exited with code {}".format(self.process.returncode))
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                # stray output of the interpreter itself
+                self.log.append(line)
+                continue
+            if reply.get("id") == job.id:
+                self.jobs_done += 1
+                return reply
+
+    def log_tail(self):
+        return "".join(self.log)[-2000:]
+
+    def stop(self):
+        if not self.alive():
+            return
+        try:
+            self.process.stdin.write("\n")
+            self.process.stdin.close()
+        except (IOError, OSError):
+            pass
+        for i in range(100):
+            if self.process.poll() is not None:
+                return
+            time.sleep(0.05)
+        self.kill()
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+            self.process.wait()
+
+
+class ValidationService(object):
+    """
+    Priority queue of jobs served by `workers` warm worker processes. Workers are started
+    with the service and restarted after a crash (job retried `retries` times), after a timeout
+    (job failed) and after `recycle` jobs when set.
+    """
+
+    def __init__(self, workers=2, interpreter=None, timeout=None, retries=1, cache_path=None, recycle=None,
+                 costs_path=None, history_path=None):
+        self.timeout = timeout
+        # finished jobs are recorded into run history database when set, see in_history
+        self.history = History(history_path) if history_path else None
+        self.retries = retries
+        self.recycle = recycle
+        cache_path = os.path.abspath(cache_path) if cache_path else None
+        costs_path = os.path.abspath(costs_path) if costs_path else None
+        self.workers = [WarmWorker(interpreter, cache_path, costs_path) for i in range(max(1, workers))]
+        self.queue = Queue.PriorityQueue()
+        self.jobs = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._threads = []
+        self.stopped = False
+
+    def start(self):
+        for index in range(len(self.workers)):
+            thread = threading.Thread(target=self._serve, args=(index,), name="InspectorService{}".format(index))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, scene, preset, priority=0, mode=MODE_FULL, budget=None):
+        if mode not in MODES:
+            raise ValueError("Unknown mode {}".format(mode))
+        preset = os.path.abspath(preset)
+        if not os.path.isfile(preset):
+            raise ValueError("Preset file not found, {}".format(preset))
+        job = Job(os.path.abspath(scene), preset, int(priority), mode, budget)
+        with self.lock:
+            if self.stopped:
+                raise RuntimeError("Service is stopped")
+            self.jobs[job.id] = job
+            self._forget_finished()
+        self.queue.put((-job.priority, next(self._sequence), job))
+        return job
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED]
+        for job_id in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+            del self.jobs[job_id]
+
+    def job(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancel queued job, returns False when job is unknown or already running
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return False
+            job.finish(CANCELLED)
+            return True
+
+    def _serve(self, index):
+        worker = self.workers[index]
+        # Maya starts before the first job comes
+        worker.start()
+        while True:
+            priority, sequence, job = self.queue.get()
+            if job is None:
+                worker.stop()
+                return
+            with self.lock:
+                if job.status != QUEUED:
+                    continue
+                job.status = RUNNING
+                job.worker = index
+                job.started = time.time()
+            self._run(worker, job)
+            if self.recycle and worker.jobs_done >= self.recycle:
+                worker.stop()
+
+    def _run(self, worker, job):
+        while True:
+            job.attempts += 1
+            if not worker.alive():
+                worker.start()
+            try:
+                reply = worker.run(job, self.timeout)
+            except WorkerDied as error:
+                if job.attempts > self.retries:
+                    job.finish(FAILED, error="Worker crashed\n{}".format(error))
+                    return
+                continue
+            if reply is None:
+                worker.kill()
+                job.finish(FAILED, error="Worker exceeded {} seconds".format(self.timeout))
+            elif reply.get("error"):
+                job.finish(FAILED, error=reply["error"])
+            else:
+                self._record(job, reply["output"])
+                job.finish(DONE, reply["output"])
+            return
+
+    def _record(self, job, output):
+        if self.history is None:
+            return
+        try:
+            self.history.record_run([CommandResult.from_dict(result) for result in output["results"]], job.scene,
+                                    preset=in_presets.preset_name(job.preset), mode=job.mode, stats=output["stats"])
+        except Exception as error:
+            # job result is still returned when it can't be recorded
+            print("Error recording job {} into history, {}".format(job.id, error))
+
+    def status(self):
+        with self.lock:
+            counts = collections.Counter(job.status for job in self.jobs.values())
+        return {
+            "jobs": dict((status, counts[status]) for status in (QUEUED, RUNNING) + FINISHED),
+            "workers": [{"alive": worker.alive(), "jobs_done": worker.jobs_done} for worker in self.workers],
+        }
+
+    def stop(self, wait=True):
+        """
+        Cancel queued jobs and stop workers once their running jobs finish
+        """
+        with self.lock:
+            self.stopped = True
+            for job in self.jobs.values():
+                if job.status == QUEUED:
+                    job.finish(CANCELLED)
+        for thread in self._threads:
+            self.queue.put((float("-inf"), next(self._sequence), None))
+        if wait:
+            for thread in self._threads:
+                thread.join()
+            if self.history is not None:
+                self.history.close()
+
+
+class ServiceHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def send_json(self, code, data):
+        body = json.dumps(data)
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def route(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        return parts, parse_qs(url.query)
+
+    def do_GET(self):
+        service = self.server.service
+        parts, query = self.route()
+        if parts == ["status"]:
+            return self.send_json(200, service.status())
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = service.job(parts[1])
+            if job is None:
+                return self.send_json(404, {"error": "Unknown job {}".format(parts[1])})
+            if "wait" in query:
+                try:
+                    job.wait(float(query["wait"][0]))
+                except ValueError:
+                    return self.send_json(400, {"error": "wait takes seconds"})
+            return self.send_json(200, job.to_dict())
+        self.send_json(404, {"error": "Unknown path {}".format(self.path)})
+
+    def do_POST(self):
+        parts, query = self.route()
+        if parts != ["jobs"]:
+            return self.send_json(404, {"error": "Unknown path {}".format(self.path)})
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            job = self.server.service.submit(data["scene"], data["preset"], data.get("priority", 0),
+                                             data.get("mode") or MODE_FULL, data.get("budget"))
+        except (KeyError, TypeError, ValueError) as error:
+            return self.send_json(400, {"error": "Invalid job, {}".format(error)})
+        except RuntimeError as error:
+            return self.send_json(503, {"error": str(error)})
+        self.send_json(202, {"id": job.id, "status": job.status})
+
+    def do_DELETE(self):
+        parts, query = self.route()
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self.send_json(404, {"error": "Unknown path {}".format(self.path)})
+        if not self.server.service.cancel(parts[1]):
+            return self.send_json(409, {"error": "Job {} can't be cancelled".format(parts[1])})
+        self.send_json(200, {"id": parts[1], "status": CANCELLED})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class ServiceServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT, verbose=False):
+        BaseHTTPServer.HTTPServer.__init__(self, (host, port), ServiceHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def _request(method, url, data=None):
+    request = urllib2.Request(url, json.dumps(data) if data is not None else None,
+                              {"Content-Type": "application/json"})
+    request.get_method = lambda: method
+    try:
+        return json.loads(urllib2.urlopen(request).read())
+    except urllib2.HTTPError as error:
+        raise RuntimeError(json.loads(error.read()).get("error"))
+
+
+def submit(scene, preset, priority=0, mode=MODE_FULL, budget=None, url=DEFAULT_URL):
+    """
+    Submit job to a running service, returns job id
+    """
+    data = {"scene": scene, "preset": preset, "priority": priority, "mode": mode, "budget": budget}
+    return _request("POST", url + "/jobs", data)["id"]
+
+
+def result(job_id, wait=None, url=DEFAULT_URL):
+    """
+    Job dict of a running service, waits up to `wait` seconds for job to finish
+    """
+    query = "?wait={}".format(wait) if wait is not None else ""
+    return _request("GET", "{}/jobs/{}{}".format(url, job_id, query))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Inspector validation service with warm workers")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=2, help="number of warm worker processes")
+    parser.add_argument("--timeout", type=float, help="seconds before a worker is killed and its job failed")
+    parser.add_argument("--retries", type=int, default=1, help="how many times a job of crashed worker is retried")
+    parser.add_argument("--recycle", type=int, help="restart worker after this many jobs")
+    parser.add_argument("--interpreter", help="python used for workers, mayapy in production (default: current)")
+    parser.add_argument("--cache", help="content cache database shared by workers")
+    parser.add_argument("--costs", help="check costs file, cheapest and most often failing checks run first")
+    parser.add_argument("--history", help="run history database finished jobs are recorded into")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(args)
+
+    service = ValidationService(args.workers, args.interpreter, args.timeout, args.retries, args.cache,
+                                args.recycle, args.costs, args.history).start()
+    server = ServiceServer(service, args.host, args.port, args.verbose)
+    print("Inspector service listening on http://{}:{}".format(*server.server_address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
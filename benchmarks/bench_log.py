@@ -0,0 +1,87 @@
+"""
+Benchmark of log construction from command results.
+Builds log rows, error nodes and error groups of one command for growing object
+counts where every object fails. Time per object should stay flat (linear
+scaling). The previous builder, scanning all results for every object, is timed
+up to 2k objects for comparison.
+
+    python benchmarks/bench_log.py
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Inspector.checks.in_discrepancy import Discrepancy
+from Inspector.core.in_engine import CommandResult
+from Inspector.core.in_log import LogTree
+
+
+SIZES = (1000, 2000, 10000, 100000)
+LEGACY_MAX_SIZE = 2000
+
+
+def legacy_log(objects_list, result):
+    # row building of the widget log, without creating widgets
+    rows = []
+    index_list = []
+    command_error_nodes = []
+    for obj in objects_list:
+        for index in result:
+            index_list.append(index[0])
+        if obj not in index_list:
+            rows.append((obj, ""))
+        else:
+            for index in result:
+                if index[0] == obj:
+                    rows.append((obj, index[1]))
+                    if len(index) > 2:
+                        command_error_nodes = command_error_nodes + index[2]
+                    else:
+                        command_error_nodes = command_error_nodes + [obj]
+    return rows, command_error_nodes
+
+
+def build_log(command_result):
+    tree = LogTree()
+    row = tree.add_result(command_result)
+    rows = [(log_row.obj, log_row.message) for log_row in tree.rows(row)]
+    return rows, command_result.error_nodes(), tree.error_groups(row)
+
+
+def synthetic_result(count):
+    # every object fails once, every fifth object also twice more with components
+    objects_list = ["mdl_char_obj{}".format(i) for i in range(count)]
+    discrepancies = []
+    for i, obj in enumerate(objects_list):
+        discrepancies.append(Discrepancy(obj, "Object has {} triangles and exceeds {} maximum count", (6000, 5000)))
+        if i % 5 == 0:
+            discrepancies.append(Discrepancy(obj, "Object has lamina faces", component="f", indices=range(i % 50)))
+            discrepancies.append(Discrepancy(obj, "Object has no uv shells"))
+    return objects_list, CommandResult("synthetic", "geometry", objects_list, discrepancies)
+
+
+def best_time(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main():
+    print("{:>8} {:>8} {:>12} {:>16} {:>12}".format("objects", "failures", "log (s)", "per object (us)", "legacy (s)"))
+    for size in SIZES:
+        objects_list, command_result = synthetic_result(size)
+        seconds = best_time(lambda: build_log(command_result))
+        legacy = ""
+        if size <= LEGACY_MAX_SIZE:
+            legacy_result = [list(index) for index in command_result.discrepancies]
+            assert legacy_log(objects_list, legacy_result)[0] == build_log(command_result)[0]
+            legacy = "{:.4f}".format(best_time(lambda: legacy_log(objects_list, legacy_result), repeat=1))
+        print("{:>8} {:>8} {:>12.4f} {:>16.3f} {:>12}".format(
+            size, len(command_result.discrepancies), seconds, seconds / size * 1e6, legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark of naming_convention on synthetic names.
+Prints time per run and per name for growing object counts, time per name should
+stay flat (linear scaling). The previous list based implementation is timed up to
+10k names for comparison.
+
+    python benchmarks/bench_naming.py
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Inspector.checks import in_commands
+
+
+SIZES = (1000, 10000, 100000)
+LEGACY_MAX_SIZE = 10000
+SETTINGS = {"options": [{"first_prefix_": ["QLineEdit", "mdl_"]}, {"second_prefix": ["QLineEdit", "char_"]}]}
+
+
+def legacy_naming_convention(objects_list, settings):
+    discrepancy_list = []
+    prefixes = ""
+    error_obj = []
+    for p in settings["options"]:
+        prefixes = prefixes + p.values()[0][1]
+        for obj in objects_list:
+            if prefixes not in obj:
+                error = "Object name {} doesn`t have {} prefix".format(obj, prefixes)
+                if obj not in error_obj:
+                    discrepancy_list.append([obj, error])
+        for index in discrepancy_list:
+            error_obj.append(index[0])
+    return discrepancy_list
+
+
+def synthetic_names(count):
+    # one third passing, one third missing second prefix, one third missing both
+    names = []
+    for i in range(count):
+        names.append(("mdl_char_box{}", "mdl_box{}", "box{}")[i % 3].format(i))
+    return names
+
+
+def best_time(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def main():
+    print("{:>8} {:>12} {:>14} {:>12}".format("names", "run (s)", "per name (us)", "legacy (s)"))
+    for size in SIZES:
+        names = synthetic_names(size)
+        seconds = best_time(lambda: in_commands.naming_convention(names, SETTINGS))
+        legacy = ""
+        if size <= LEGACY_MAX_SIZE:
+            assert legacy_naming_convention(names, SETTINGS) == in_commands.naming_convention(names, SETTINGS)
+            legacy = "{:.4f}".format(best_time(lambda: legacy_naming_convention(names, SETTINGS), repeat=1))
+        print("{:>8} {:>12.4f} {:>14.3f} {:>12}".format(size, seconds, seconds / size * 1e6, legacy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark of Inspector startup.
+Import time of the modules loaded when the tool opens is measured in a fresh
+interpreter per repeat (check modules must not be among them). When PySide2
+and Maya are available (mayapy) the dialog is also opened with a synthetic
+preset of --commands commands: time to first paint, reopening the cached
+dialog and building rows of every category are reported.
+
+    python benchmarks/bench_startup.py
+    mayapy benchmarks/bench_startup.py --commands 300
+"""
+
+import os
+import sys
+import json
+import time
+import pkgutil
+import argparse
+import subprocess
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_ROOT = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, PACKAGE_ROOT)
+
+CORE_MODULES = ("Inspector.core.in_engine", "Inspector.core.in_presets", "Inspector.core.in_content_cache",
+                "Inspector.core.in_scheduler", "Inspector.core.in_scene")
+UI_MODULE = "Inspector.UI.inspector_UI"
+CHECK_MODULES = ("Inspector.checks.in_commands",)
+
+IMPORT_SCRIPT = """
+import sys, time, json
+start = time.time()
+for module in {modules!r}:
+    __import__(module)
+seconds = time.time() - start
+print(json.dumps({{"seconds": seconds, "checks": [m for m in {checks!r} if m in sys.modules]}}))
+"""
+
+
+def import_time(modules, repeat, env=None):
+    """
+    Best import time of modules in a fresh interpreter and check modules they pulled in
+    """
+    script = IMPORT_SCRIPT.format(modules=tuple(modules), checks=CHECK_MODULES)
+    best = None
+    for i in range(repeat):
+        output = subprocess.check_output([sys.executable, "-c", script], cwd=PACKAGE_ROOT, env=env)
+        result = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def available(*modules):
+    """
+    True when modules can be imported, they are only looked up (parent packages get imported)
+    """
+    try:
+        return all(pkgutil.find_loader(module) is not None for module in modules)
+    except ImportError:
+        return False
+
+
+def synthetic_preset(commands, categories):
+    per_category = max(1, commands // categories)
+    settings_list = []
+    for category_index in range(categories):
+        category_commands = []
+        for command_index in range(per_category):
+            name = "check_{}_{}".format(category_index, command_index)
+            if command_index % 3 == 0:
+                category_commands.append([name, [1, 1], {"options": [{"max": ["QLineEdit", 5000]}]}])
+            else:
+                category_commands.append([name, [1, 1]])
+        settings_list.append(["category_{}".format(category_index), category_commands])
+    return settings_list
+
+
+def dialog_times(commands, categories):
+    """
+    Seconds to first paint, to reopen the cached dialog and to build rows of all categories
+    """
+    from PySide2 import QtWidgets
+    import Inspector.core.in_presets as in_presets
+    import Inspector.UI.inspector_UI as inspector_UI
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    settings_list = synthetic_preset(commands, categories)
+    # dialog reads the synthetic preset instead of the current one of the user
+    load_current_preset = in_presets.load_current_preset
+    in_presets.load_current_preset = lambda directory: (["Benchmark", ""], settings_list)
+    try:
+        start = time.time()
+        inspector_UI.Inspector.show_dialog(reload=True)
+        app.processEvents()
+        first_paint = time.time() - start
+
+        dialog = inspector_UI.Inspector.dlg_instance
+        dialog.close()
+        start = time.time()
+        inspector_UI.Inspector.show_dialog()
+        app.processEvents()
+        reopen = time.time() - start
+
+        start = time.time()
+        for category in settings_list:
+            dialog.build_category(category[0])
+        app.processEvents()
+        all_rows = time.time() - start
+        dialog.dispose()
+        inspector_UI.Inspector.dlg_instance = None
+    finally:
+        in_presets.load_current_preset = load_current_preset
+    return {"first_paint": first_paint, "reopen": reopen, "all_rows": all_rows}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Inspector startup benchmark")
+    parser.add_argument("--commands", type=int, default=300, help="commands in synthetic preset")
+    parser.add_argument("--categories", type=int, default=10, help="categories in synthetic preset")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(args)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(path for path in (PACKAGE_ROOT, env.get("PYTHONPATH")) if path)
+    core = import_time(CORE_MODULES, args.repeat, env)
+    print("{:<28} {:>9.1f}ms  check modules imported: {}".format(
+        "import core", core["seconds"] * 1000, ", ".join(core["checks"]) or "none"))
+
+    if not available("PySide2", "maya.OpenMayaUI"):
+        print("PySide2 or Maya not available, dialog timings skipped (run with mayapy)")
+        return 0
+
+    ui = import_time((UI_MODULE,), args.repeat, env)
+    print("{:<28} {:>9.1f}ms  check modules imported: {}".format(
+        "import " + UI_MODULE, ui["seconds"] * 1000, ", ".join(ui["checks"]) or "none"))
+    times = dialog_times(args.commands, args.categories)
+    for name in ("first_paint", "reopen", "all_rows"):
+        print("{:<28} {:>9.1f}ms  {} commands".format(name, times[name] * 1000, args.commands))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
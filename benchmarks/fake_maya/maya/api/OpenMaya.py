@@ -0,0 +1,87 @@
+"""
+Synthetic stand-in for maya.api.OpenMaya, only the MFnMesh array queries read by
+CmdsBackend and OpenMayaBackend. Meshes come from the fake maya.cmds scene, every
+query is counted as a call.
+"""
+
+from maya import cmds
+
+
+class MPoint(object):
+    __slots__ = ("x", "y", "z", "w")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = w
+
+
+class MDagPath(object):
+
+    def __init__(self, name):
+        self.name = name
+
+    def extendToShape(self):
+        return self
+
+    def partialPathName(self):
+        return self.name
+
+
+class MSelectionList(object):
+
+    def __init__(self):
+        self.names = []
+
+    def add(self, name):
+        cmds._call()
+        cmds._transform(name)
+        self.names.append(name)
+        return self
+
+    def getDagPath(self, index):
+        return MDagPath(self.names[index])
+
+
+class MFnMesh(object):
+
+    def __init__(self, dag_path):
+        self.node = cmds._node(dag_path.name)
+
+    def getVertices(self):
+        cmds._call()
+        return [len(face) for face in self.node.faces], [vertex for face in self.node.faces for vertex in face]
+
+    def getTriangles(self):
+        cmds._call()
+        # fan triangulation, the count of the last face makes up the node triangle count
+        counts = [len(face) - 2 for face in self.node.faces]
+        counts[-1] += self.node.triangles - sum(counts)
+        vertices = [vertex for face in self.node.faces for i in range(1, len(face) - 1)
+                    for vertex in (face[0], face[i], face[i + 1])]
+        return counts, vertices
+
+    def getUvShellsIds(self, uv_set=None):
+        cmds._call()
+        uv_count = self.numUVs(uv_set)
+        return self.node.uv_shells, [0] * uv_count
+
+    def getPoints(self, space=None):
+        cmds._call()
+        return [MPoint(*point) for point in self.node.points]
+
+    def currentUVSetName(self):
+        return "map1"
+
+    def numUVs(self, uv_set=None):
+        return sum(len(face_uv) for face_uv in self.node.face_uvs)
+
+    def getUVs(self, uv_set=None):
+        cmds._call()
+        uvs = [uv for face_uv in self.node.face_uvs for uv in face_uv]
+        return [u for u, v in uvs], [v for u, v in uvs]
+
+    def getAssignedUVs(self, uv_set=None):
+        cmds._call()
+        return cmds._assigned_uvs(self.node)
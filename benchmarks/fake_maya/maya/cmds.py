@@ -0,0 +1,296 @@
+"""
+Synthetic stand-in for maya.cmds used by benchmarks.
+Scene is a dict of transform name -> FakeNode, every command call is counted
+and can be delayed by LATENCY seconds to simulate Maya call overhead. Commands
+used by fixes (delete, rename, polyAutoProjection, polyCleanup through maya.mel)
+change the scene the same way Maya would. Mesh topology (points, faces, UVs) is a
+cube, failing objects get extra broken faces, and is served by maya.api.OpenMaya.
+Scenes saved with save_scene() are loaded back by file(path, open=True).
+Node names are flat, FakeNode.parent only links a node under another one for
+hierarchy queries, SETS holds members of object sets by set name.
+"""
+
+import re
+import time
+import fnmatch
+
+
+LATENCY = 0.0
+CALLS = {"count": 0}
+SCENE = {}
+SELECTION = []
+SETS = {}
+# scene files saved with save_scene, file(path, open=True) loads them into SCENE
+SCENE_FILES = {}
+
+FACE_RE = re.compile(r"^(.+)\.f\[")
+IDENTITY = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+CUBE_POINTS = [(-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (-0.5, 0.5, 0.5), (0.5, 0.5, 0.5),
+               (-0.5, 0.5, -0.5), (0.5, 0.5, -0.5), (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5)]
+CUBE_FACES = [(0, 1, 3, 2), (2, 3, 5, 4), (4, 5, 7, 6), (6, 7, 1, 0), (1, 7, 5, 3), (6, 0, 2, 4)]
+CUBE_UVS = [[(0.0, row / 6.0), (1.0, row / 6.0), (1.0, (row + 1) / 6.0), (0.0, (row + 1) / 6.0)] for row in range(6)]
+# face 0 doubled with reversed winding (non-manifold edges, overlapping and flipped UVs),
+# a degenerate triangle on a duplicated point (zero area, zero length edge) and a detached pentagon
+BROKEN_POINTS = CUBE_POINTS + [(-0.5, -0.5, 0.5), (2.0, 0.0, 0.0), (3.0, 0.0, 0.0), (3.3, 1.0, 0.0),
+                               (2.5, 1.6, 0.0), (1.7, 1.0, 0.0)]
+BROKEN_FACES = CUBE_FACES + [(2, 3, 1, 0), (0, 8, 1), (9, 10, 11, 12, 13)]
+BROKEN_UVS = CUBE_UVS + [CUBE_UVS[0][::-1], [(0.0, 0.0), (0.0, 0.0), (1.0, 0.0)],
+                         [(0.0, 0.0), (0.1, 0.0), (0.13, 0.1), (0.05, 0.16), (-0.03, 0.1)]]
+
+
+def _lamina_faces(faces):
+    shared = {}
+    for index, face in enumerate(faces):
+        shared.setdefault(tuple(sorted(face)), []).append(index)
+    return sorted(index for indices in shared.values() if len(indices) > 1 for index in indices)
+
+
+class FakeNode(object):
+    __slots__ = ("triangles", "lamina_faces", "uv_shells", "history", "parent",
+                 "points", "faces", "face_uvs", "uv_ids", "locked_normals", "matrix")
+
+    def __init__(self, triangles=None, lamina_faces=None, uv_shells=1, history=1, parent=None, broken=False):
+        self.points = BROKEN_POINTS if broken else CUBE_POINTS
+        self.faces = BROKEN_FACES if broken else CUBE_FACES
+        # triangle count and lamina faces follow the faces unless given, a higher count stands in for a dense mesh
+        self.triangles = sum(len(face) - 2 for face in self.faces) if triangles is None else triangles
+        self.lamina_faces = _lamina_faces(self.faces) if lamina_faces is None else list(lamina_faces)
+        self.uv_shells = uv_shells
+        self.history = history
+        self.parent = parent
+        self.face_uvs = BROKEN_UVS if broken else CUBE_UVS
+        # UV id of every face corner, None when every corner has its own UV
+        self.uv_ids = None
+        self.locked_normals = [0, 1] if broken else []
+        self.matrix = IDENTITY[:12] + [1.0, 2.0, 0.0, 1.0] if broken else list(IDENTITY)
+
+
+def set_latency(seconds):
+    global LATENCY
+    LATENCY = seconds
+
+
+def reset_calls():
+    CALLS["count"] = 0
+
+
+def populate(count, failure_every=10):
+    """
+    Build count meshes, every failure_every-th object fails each geometry check
+    """
+    SCENE.clear()
+    for i in range(count):
+        failing = failure_every and i % failure_every == 0
+        name = "mdl_char_obj{}".format(i) if i % 3 else "obj{}".format(i)
+        SCENE[name] = FakeNode(
+            triangles=20000 if failing else 500,
+            uv_shells=0 if failing else 1,
+            history=3 if failing else 1,
+            broken=failing,
+        )
+    return sorted(SCENE)
+
+
+def _call():
+    CALLS["count"] += 1
+    if LATENCY:
+        end = time.time() + LATENCY
+        while time.time() < end:
+            pass
+
+
+def _node(obj):
+    return SCENE[_transform(obj)]
+
+
+def _transform(obj):
+    name = obj.rsplit("|", 1)[-1]
+    if name.endswith("Shape"):
+        name = name[:-5]
+    if name not in SCENE:
+        raise RuntimeError("No object matches name: {}".format(obj))
+    return name
+
+
+def _names(objects):
+    if isinstance(objects, basestring):
+        return [objects]
+    return list(objects)
+
+
+def _component_node(component):
+    return _node(component.split(".", 1)[0])
+
+
+def _assigned_uvs(node):
+    counts = [len(face_uv) for face_uv in node.face_uvs]
+    if node.uv_ids is not None:
+        return counts, list(node.uv_ids)
+    return counts, range(sum(counts))
+
+
+def polyEvaluate(obj, t=False, uvShell=False, **kwargs):
+    _call()
+    node = _node(obj)
+    if t:
+        return node.triangles
+    if uvShell:
+        return node.uv_shells
+    if not kwargs:
+        # component counts of the mesh like Maya returns without flags
+        return {"vertex": len(node.points), "face": len(node.faces), "triangle": node.triangles,
+                "uvcoord": sum(len(face_uv) for face_uv in node.face_uvs), "shell": 1}
+    return 0
+
+
+def polyInfo(objects, lf=False, faceToVertex=False, **kwargs):
+    _call()
+    faces = []
+    if faceToVertex:
+        node = _node(objects)
+        return ["FACE {}: {} \n".format(index, " ".join(str(vertex) for vertex in face))
+                for index, face in enumerate(node.faces)]
+    if lf:
+        for obj in _names(objects):
+            faces.extend("{}.f[{}]".format(_transform(obj), i) for i in _node(obj).lamina_faces)
+    return faces or None
+
+
+def listHistory(obj, **kwargs):
+    _call()
+    node = _node(obj)
+    return [obj] + ["{}_history{}".format(obj, i) for i in range(node.history - 1)]
+
+
+def ls(*patterns, **kwargs):
+    _call()
+    if kwargs.get("sl") or kwargs.get("selection"):
+        names = list(SELECTION)
+    else:
+        names = sorted(SCENE)
+    if patterns:
+        # node names and paths given as strings or lists, shapes match their transform
+        patterns = [pattern.rsplit("|", 1)[-1] for arg in patterns for pattern in _names(arg)]
+        patterns = [pattern[:-5] if pattern.endswith("Shape") else pattern for pattern in patterns]
+        # matches come in order of patterns like in Maya
+        matched = []
+        seen = set()
+        for pattern in patterns:
+            for name in names:
+                if name not in seen and fnmatch.fnmatchcase(name, pattern):
+                    seen.add(name)
+                    matched.append(name)
+        names = matched
+    if kwargs.get("type") == "mesh":
+        names = [name + "Shape" for name in names]
+    if kwargs.get("long"):
+        names = ["|" + name for name in names]
+    return names
+
+
+def listRelatives(objects, parent=False, allDescendents=False, ad=False, fullPath=False, **kwargs):
+    _call()
+    if objects is None:
+        return None
+    result = []
+    for obj in _names(objects):
+        name = _transform(obj)
+        if parent or kwargs.get("p"):
+            result.append("|" + name if fullPath else name)
+        elif allDescendents or ad:
+            for descendant in [name] + _descendants(name):
+                result.append(("|{0}|{0}Shape" if fullPath else "{0}Shape").format(descendant))
+    return result or None
+
+
+def _descendants(name):
+    children = sorted(child for child, node in SCENE.items() if node.parent == name)
+    return [node for child in children for node in [child] + _descendants(child)]
+
+
+def sets(names=None, q=False, **kwargs):
+    _call()
+    members = []
+    for name in _names(names or []):
+        if name not in SETS:
+            raise ValueError("No object matches name: {}".format(name))
+        members.extend(SETS[name])
+    return members or None
+
+
+def select(objects=None, clear=False, **kwargs):
+    _call()
+    del SELECTION[:]
+    if objects:
+        SELECTION.extend(_transform(obj) for obj in _names(objects))
+
+
+def delete(objects, constructionHistory=False, ch=False, **kwargs):
+    _call()
+    for obj in _names(objects):
+        if constructionHistory or ch:
+            _node(obj).history = 1
+        else:
+            del SCENE[_transform(obj)]
+
+
+def rename(obj, new_name, **kwargs):
+    _call()
+    name = _transform(obj)
+    new_name = new_name.rsplit("|", 1)[-1]
+    SCENE[new_name] = SCENE.pop(name)
+    return new_name
+
+
+def polyAutoProjection(objects, **kwargs):
+    _call()
+    for obj in _names(objects):
+        _node(obj).uv_shells = max(1, _node(obj).uv_shells)
+
+
+def xform(obj, q=False, matrix=False, translation=False, **kwargs):
+    _call()
+    if q and matrix:
+        return list(_node(obj).matrix)
+    if q and translation and ".vtx[" in obj:
+        return [coordinate for point in _component_node(obj).points for coordinate in point]
+    return None
+
+
+def polyEditUV(components, q=False, **kwargs):
+    _call()
+    if q:
+        return [coordinate for face_uv in _component_node(components).face_uvs for uv in face_uv for coordinate in uv]
+    return None
+
+
+def polyUVSet(obj, q=False, currentUVSet=False, **kwargs):
+    _call()
+    if q and currentUVSet:
+        return ["map1"]
+    return None
+
+
+def polyNormalPerVertex(components, q=False, freezeNormal=False, **kwargs):
+    _call()
+    node = _component_node(components)
+    if q and freezeNormal:
+        return [index in node.locked_normals for index in range(len(node.points))]
+    return None
+
+
+def save_scene(path):
+    SCENE_FILES[path] = dict(SCENE)
+
+
+def file(path=None, open=False, o=False, **kwargs):
+    _call()
+    if (open or o) and path in SCENE_FILES:
+        SCENE.clear()
+        SCENE.update(SCENE_FILES[path])
+        del SELECTION[:]
+
+
+def undoInfo(*args, **kwargs):
+    _call()
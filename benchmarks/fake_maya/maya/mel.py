@@ -0,0 +1,12 @@
+"""
+Synthetic stand-in for maya.mel, only polyCleanup of lamina faces on selection is understood.
+"""
+
+import cmds
+
+
+def eval(command):
+    cmds._call()
+    if command.startswith("polyCleanupArgList"):
+        for name in cmds.SELECTION:
+            cmds.SCENE[name].lamina_faces = []
@@ -0,0 +1,158 @@
+"""
+Reproducible benchmark suite on a synthetic Maya scene.
+Times every in_commands check on its own, the full run of all checked
+commands (engine run plus log rows), pass/fail gate runs in preset and in
+planned order and scene gathering of meshes at growing object counts, using the fake
+maya.cmds from benchmarks/fake_maya. Results are written as JSON so a later run
+can be compared against it as a baseline.
+
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --sizes 100 1000 --latency 0.00002 --compare baseline.json
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import platform
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "fake_maya"))
+
+import maya.cmds as mc
+
+import Inspector.core.in_presets as in_presets
+import Inspector.core.in_scene as in_scene
+import Inspector.core.in_planner as in_planner
+from Inspector.core.in_engine import Engine, iter_commands, run_command
+from Inspector.core.in_log import LogTree
+
+
+SIZES = (100, 1000, 10000, 100000)
+DEFAULT_PRESET = os.path.join(os.path.dirname(BENCHMARKS_DIR), "Inspector", "presets", "default.txt")
+FULL_RUN = "run_all_checked"
+GATHER = "gather_meshes"
+GATE = "gate"
+GATE_PLANNED = "gate_planned"
+# relative slowdown reported as regression when comparing with baseline
+REGRESSION_THRESHOLD = 1.2
+
+
+def all_checked(settings_list):
+    settings_list = copy.deepcopy(settings_list)
+    for category, command in iter_commands(settings_list):
+        command[1][0] = 1
+    return settings_list
+
+
+def measure(function, repeat):
+    best = None
+    calls = 0
+    for i in range(repeat):
+        mc.reset_calls()
+        start = time.time()
+        function()
+        seconds = time.time() - start
+        if best is None or seconds < best:
+            best = seconds
+            calls = mc.CALLS["count"]
+    return {"seconds": best, "calls": calls}
+
+
+def full_run(engine, objects_list):
+    tree = LogTree()
+    for command_result in engine.run(objects_list):
+        tree.rows(tree.add_result(command_result))
+
+
+def run_suite(settings_list, sizes, repeat):
+    settings_list = all_checked(settings_list)
+    engine = Engine(settings_list)
+    planned = Engine(settings_list, planner=in_planner.Planner())
+    results = {}
+    for size in sizes:
+        objects_list = mc.populate(size)
+        size_results = {}
+        for category, command in iter_commands(settings_list):
+            size_results[command[0]] = measure(lambda: run_command(command, objects_list), repeat)
+        size_results[FULL_RUN] = measure(lambda: full_run(engine, objects_list), repeat)
+        size_results[GATE] = measure(lambda: engine.passed(objects_list), repeat)
+        # planner learns costs and failure rates from one full run first
+        planned.run(objects_list)
+        size_results[GATE_PLANNED] = measure(lambda: planned.passed(objects_list), repeat)
+        size_results[GATHER] = measure(lambda: in_scene.ObjectSet(in_scene.gather_meshes()), repeat)
+        results[str(size)] = size_results
+        print_size(size, size_results)
+    return results
+
+
+def print_size(size, size_results):
+    for name in sorted(size_results):
+        result = size_results[name]
+        print("{:>8} {:<20} {:>10.4f}s {:>10} calls {:>8.2f}us/object".format(
+            size, name, result["seconds"], result["calls"], result["seconds"] / size * 1e6))
+
+
+def compare(results, baseline):
+    """
+    Print ratio against baseline, returns number of regressions
+    """
+    regressions = 0
+    for size, size_results in sorted(results.items(), key=lambda item: int(item[0])):
+        for name, result in sorted(size_results.items()):
+            base = baseline["results"].get(size, {}).get(name)
+            if not base or not base["seconds"]:
+                continue
+            ratio = result["seconds"] / base["seconds"]
+            flag = ""
+            if ratio > REGRESSION_THRESHOLD:
+                flag = "REGRESSION"
+                regressions += 1
+            print("{:>8} {:<20} {:>8.2f}x {:>8} -> {:<8} calls {}".format(
+                size, name, ratio, base["calls"], result["calls"], flag))
+    return regressions
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description="Inspector benchmark suite on synthetic scene")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="object counts")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per Maya call")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    parser.add_argument("--preset", default=DEFAULT_PRESET, help="preset with commands and options")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline JSON to compare with")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_args(args)
+    mc.set_latency(args.latency)
+    results = run_suite(in_presets.load_preset(args.preset), args.sizes, args.repeat)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency": args.latency,
+            "repeat": args.repeat,
+            "preset": os.path.basename(args.preset),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            if compare(results, json.load(baseline_file)):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+"""
+Tests run without Maya, on the synthetic maya.cmds of benchmarks/fake_maya
+and on FakeBackend meshes.
+
+    python -m unittest discover
+"""
+
+import os
+import sys
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_MAYA = os.path.join(PACKAGE_ROOT, "benchmarks", "fake_maya")
+for path in (PACKAGE_ROOT, FAKE_MAYA):
+    if path not in sys.path:
+        sys.path.insert(0, path)
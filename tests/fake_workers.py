@@ -0,0 +1,61 @@
+"""
+Worker interpreter for batch and service tests. Runs Inspector.core.in_batch on
+the fake maya.cmds, the scene is built from its file name:
+
+    clean_<count>.ma    count objects passing every check
+    broken_<count>.ma   count objects failing every geometry check
+    crash_*.ma          worker process exits before validating
+    crash_once_*.ma     first worker validating the scene exits, later ones validate it
+    hang_*.ma           worker never finishes
+"""
+
+import os
+import sys
+import stat
+
+from tests import PACKAGE_ROOT, FAKE_MAYA
+
+
+SCRIPT = """#!{executable}
+import os
+import sys
+import time
+sys.path[:0] = {paths!r}
+
+import maya.cmds as mc
+import Inspector.core.in_batch as in_batch
+
+validate_scene = in_batch.validate_scene
+
+
+def fake_validate_scene(scene, *args, **kwargs):
+    name = os.path.splitext(os.path.basename(scene))[0]
+    if name.startswith("crash_once"):
+        marker = scene + ".crashed"
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            os._exit(3)
+    elif name.startswith("crash"):
+        os._exit(3)
+    elif name.startswith("hang"):
+        time.sleep(600)
+    kind, sep, count = name.partition("_")
+    mc.populate(int(count) if count.isdigit() else 0, failure_every=1 if kind == "broken" else 0)
+    return validate_scene(scene, *args, **kwargs)
+
+
+in_batch.validate_scene = fake_validate_scene
+# called as <interpreter> -m Inspector.core.in_batch <arguments>
+sys.exit(in_batch.main(sys.argv[3:]))
+"""
+
+
+def write_interpreter(directory):
+    """
+    Executable worker interpreter in directory, pass it as interpreter of BatchValidator or ValidationService
+    """
+    path = os.path.join(directory, "fake_mayapy")
+    with open(path, "w") as script_file:
+        script_file.write(SCRIPT.format(executable=sys.executable, paths=[PACKAGE_ROOT, FAKE_MAYA]))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+    return path
@@ -0,0 +1,88 @@
+import unittest
+
+import maya.cmds as mc
+
+import Inspector.checks.in_registry as in_registry
+from Inspector.checks.in_backends import CmdsBackend, OpenMayaBackend, FakeBackend, FakeMesh
+from Inspector.checks.in_mesh_data import MeshData, ATTRIBUTES
+from Inspector.core.in_engine import Engine, iter_commands
+
+
+def fake_scene():
+    """
+    Clean and broken meshes of the fake maya.cmds scene, with the same meshes for FakeBackend
+    """
+    mc.SCENE.clear()
+    mc.SCENE["mdl_char_clean"] = mc.FakeNode()
+    mc.SCENE["mdl_char_copy"] = mc.FakeNode()
+    mc.SCENE["mdl_char_broken"] = mc.FakeNode(broken=True, history=3)
+    mc.SCENE["no_uvs"] = mc.FakeNode(uv_shells=0)
+    meshes = {}
+    for name, node in mc.SCENE.items():
+        meshes[name] = FakeMesh(node.faces, node.uv_shells, node.history, node.points, node.face_uvs,
+                                node.locked_normals, node.matrix)
+    return sorted(mc.SCENE), FakeBackend(meshes)
+
+
+def settings_list():
+    categories = {}
+    for name, spec in sorted(in_registry.all_checks().items()):
+        command = [name, [1, 1]]
+        if spec.default_settings() is not None:
+            command.append(spec.default_settings())
+        categories.setdefault(spec.category, []).append(command)
+    return sorted(categories.items())
+
+
+def topology_lists(topology):
+    # UV coordinates of every face corner, backends may number UVs differently
+    corner_uvs = [(topology.uvs[2 * uv_id], topology.uvs[2 * uv_id + 1]) for uv_id in topology.uv_ids]
+    return (list(topology.face_counts), list(topology.face_vertices), list(topology.points),
+            list(topology.uv_counts), corner_uvs)
+
+
+def discrepancies(result):
+    return [list(index) for index in result.discrepancies]
+
+
+class BackendParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.objects, self.fake = fake_scene()
+        self.backends = [CmdsBackend(), OpenMayaBackend(), self.fake]
+
+    def test_every_attribute_matches(self):
+        for attribute in ATTRIBUTES:
+            for obj in self.objects:
+                values = [MeshData(backend).get(obj, attribute) for backend in self.backends]
+                if attribute == "topology":
+                    values = [topology_lists(value) for value in values]
+                else:
+                    values = [list(value) if hasattr(value, "__iter__") else value for value in values]
+                for backend, value in zip(self.backends[1:], values[1:]):
+                    self.assertEqual(value, values[0], "{} {} differs with {} backend".format(
+                        obj, attribute, backend.name))
+
+    def test_every_check_matches(self):
+        settings = settings_list()
+        expected = dict((result.name, discrepancies(result))
+                        for result in Engine(settings, self.backends[0]).run(self.objects))
+        self.assertEqual(sorted(expected), sorted(command[0] for category, command in iter_commands(settings)))
+        # broken mesh fails every geometry and UV check
+        self.assertTrue(all(expected[name] for name in ("lamina_faces", "non_manifold", "zero_area_faces",
+                                                        "zero_length_edges", "ngons", "locked_normals",
+                                                        "overlapping_UVS", "flipped_UVS", "missing_UVS",
+                                                        "history", "unfrozen_transforms", "naming_convention")))
+        for backend in self.backends[1:]:
+            results = dict((result.name, discrepancies(result)) for result in Engine(settings, backend).run(self.objects))
+            for name in expected:
+                self.assertEqual(results[name], expected[name], "{} differs with {} backend".format(name, backend.name))
+
+    def test_fingerprints_follow_content(self):
+        for backend in self.backends:
+            self.assertEqual(backend.fingerprint("mdl_char_clean"), backend.fingerprint("mdl_char_copy"))
+            self.assertNotEqual(backend.fingerprint("mdl_char_clean"), backend.fingerprint("mdl_char_broken"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+import maya.cmds as mc
+
+import Inspector.core.in_batch as in_batch
+import Inspector.core.in_presets as in_presets
+from Inspector.core.in_content_cache import ContentCache
+from tests import PACKAGE_ROOT
+from tests.fake_workers import write_interpreter
+
+
+DEFAULT_PRESET = os.path.join(PACKAGE_ROOT, "Inspector", "presets", "default.txt")
+
+
+def checked_preset(path, names):
+    settings_list = in_presets.load_preset(DEFAULT_PRESET)
+    for category in settings_list:
+        for command in category[1]:
+            command[1][0] = int(command[0] in names)
+    in_presets.save_preset(path, settings_list)
+    return path
+
+
+def failures(output):
+    return dict((result["command"], len(result["discrepancies"])) for result in output["results"])
+
+
+class ServeWorkerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.preset = checked_preset(os.path.join(self.directory, "preset.insp"),
+                                     ("history", "lamina_faces", "missing_UVS"))
+        self.cache_path = os.path.join(self.directory, "cache.sqlite")
+        # same object names in both scenes, only the broken one fails
+        mc.populate(10, failure_every=0)
+        mc.save_scene("clean.ma")
+        mc.populate(10, failure_every=1)
+        mc.save_scene("broken.ma")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def serve(self, scenes):
+        jobs = "".join(json.dumps({"id": index, "scene": scene, "preset": self.preset, "cache": self.cache_path}) + "\n"
+                       for index, scene in enumerate(scenes))
+        output = StringIO()
+        in_batch.serve_worker(StringIO(jobs), output)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def cold_run(self, scene):
+        cache = ContentCache(os.path.join(self.directory, "cold.sqlite"))
+        try:
+            return in_batch.run_job(scene, self.preset, cache=cache)
+        finally:
+            cache.close()
+
+    def test_one_reply_per_job(self):
+        replies = self.serve(["clean.ma", "broken.ma"])
+        self.assertEqual([reply["id"] for reply in replies], [0, 1])
+        self.assertFalse(any(reply.get("error") for reply in replies))
+
+    def test_scenes_in_one_worker_match_cold_runs(self):
+        replies = self.serve(["clean.ma", "broken.ma", "clean.ma"])
+        self.assertEqual(failures(replies[0]["output"]), failures(self.cold_run("clean.ma")))
+        self.assertEqual(failures(replies[1]["output"]), failures(self.cold_run("broken.ma")))
+        self.assertEqual(failures(replies[1]["output"]), {"history": 10, "lamina_faces": 10, "missing_UVS": 10})
+        self.assertEqual(failures(replies[2]["output"]), {"history": 0, "lamina_faces": 0, "missing_UVS": 0})
+        # content checks of both scenes were stored in the shared database
+        cache = ContentCache(self.cache_path)
+        try:
+            self.assertEqual(cache.stats()["commands"], {"lamina_faces": 2, "missing_UVS": 2})
+        finally:
+            cache.close()
+
+    def test_failing_job_reports_error(self):
+        replies = self.serve(["clean.ma"])
+        self.preset = os.path.join(self.directory, "missing.insp")
+        replies += self.serve(["clean.ma"])
+        self.assertNotIn("error", replies[0])
+        self.assertIn("error", replies[1])
+
+
+class BatchValidatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.interpreter = write_interpreter(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def validator(self, **kwargs):
+        kwargs.setdefault("jobs", 3)
+        kwargs.setdefault("timeout", 5)
+        return in_batch.BatchValidator(DEFAULT_PRESET, self.interpreter, **kwargs)
+
+    def scenes(self, *names):
+        return [os.path.join(self.directory, name) for name in names]
+
+    def test_merged_report(self):
+        scenes = self.scenes("clean_3.ma", "broken_2.ma", "crash_scene.ma", "crash_once_scene.ma", "hang_scene.ma")
+        report = self.validator(timeout=2).run(scenes)
+        self.assertEqual(report["preset"], in_presets.preset_name(DEFAULT_PRESET))
+        # scenes are reported in given order whatever order they finished in
+        self.assertEqual([scene_report["scene"] for scene_report in report["scenes"]], scenes)
+        statuses = [(scene_report["status"], scene_report["attempts"]) for scene_report in report["scenes"]]
+        self.assertEqual(statuses, [("ok", 1), ("ok", 1), ("crashed", 2), ("ok", 2), ("timeout", 1)])
+        broken = report["scenes"][1]
+        discrepancies = sum(len(result["discrepancies"]) for result in broken["results"])
+        self.assertEqual(broken["stats"]["objects"], 2)
+        self.assertTrue(discrepancies)
+        self.assertIn("Worker exceeded 2 seconds", report["scenes"][4]["error"])
+        self.assertEqual(report["scenes"][2]["results"], [])
+
+        summary = report["summary"]
+        self.assertEqual((summary["scenes"], summary["ok"], summary["crashed"], summary["timeout"]), (5, 3, 1, 1))
+        self.assertEqual(summary["discrepancies"],
+                         sum(len(result["discrepancies"]) for scene_report in report["scenes"]
+                             for result in scene_report["results"]))
+        self.assertEqual(in_batch.exit_code(report), in_batch.EXIT_INCOMPLETE)
+
+    def test_crash_without_retries(self):
+        report = self.validator(retries=0).run(self.scenes("crash_once_scene.ma"))
+        self.assertEqual((report["scenes"][0]["status"], report["scenes"][0]["attempts"]), ("crashed", 1))
+
+    def test_exit_codes(self):
+        validator = self.validator()
+        broken = validator.run(self.scenes("broken_1.ma"))
+        self.assertEqual(in_batch.exit_code(broken), in_batch.EXIT_DISCREPANCIES)
+        empty = validator.run(self.scenes("clean_0.ma"))
+        self.assertEqual(in_batch.exit_code(empty), in_batch.EXIT_PASSED)
+
+    def test_profiles_of_same_named_scenes_differ(self):
+        validator = self.validator(profile_dir="profiles")
+        names = [validator.profile_name(scene) for scene in ("a/scene.ma", "b/scene.ma", "a/scene.ma")]
+        self.assertNotEqual(names[0], names[1])
+        self.assertEqual(names[0], names[2])
+        self.assertTrue(names[0].startswith("scene.ma_"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+import sys
+import itertools
+import unittest
+
+import maya.api
+
+from Inspector.core.in_cache import DirtyTracker, ResultCache, CallbackDirtyTracker
+
+
+class FakeMessages(object):
+    """
+    Node messages of maya.api.OpenMaya, nodes are FakeMayaNode objects
+    """
+    kAfterOpen = "afterOpen"
+    kAfterNew = "afterNew"
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.callbacks = {}
+
+    def add(self, node, kind, function, client_data=None):
+        callback_id = next(self.ids)
+        self.callbacks[callback_id] = (node, kind, function, client_data)
+        return callback_id
+
+    def addCallback(self, kind, function, client_data=None):
+        return self.add(None, kind, function, client_data)
+
+    def addNodeDirtyCallback(self, node, function, client_data=None):
+        return self.add(node, "dirty", function, client_data)
+
+    def addNameChangedCallback(self, node, function, client_data=None):
+        return self.add(node, "renamed", function, client_data)
+
+    def addNodePreRemovalCallback(self, node, function, client_data=None):
+        return self.add(node, "removed", function, client_data)
+
+    def removeCallback(self, callback_id):
+        del self.callbacks[callback_id]
+
+    def removeCallbacks(self, callback_ids):
+        for callback_id in callback_ids:
+            self.removeCallback(callback_id)
+
+    def emit(self, node, kind, *args):
+        for callback_node, callback_kind, function, client_data in list(self.callbacks.values()):
+            if callback_node is node and callback_kind == kind:
+                function(node, *(args + (client_data,)))
+
+    def watched(self, node):
+        return any(callback[0] is node for callback in self.callbacks.values())
+
+
+class FakeMayaNode(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.alive = True
+
+
+class FakeOpenMaya(object):
+    """
+    Just enough of maya.api.OpenMaya for CallbackDirtyTracker, scene maps names to nodes
+    """
+
+    def __init__(self):
+        self.scene = {}
+        self.MSceneMessage = self.MNodeMessage = self.MMessage = messages = FakeMessages()
+        scene = self.scene
+
+        class MDagPath(object):
+            def __init__(self, node):
+                self._node = node
+
+            @staticmethod
+            def getAPathTo(node):
+                return MDagPath(node)
+
+            def node(self):
+                return self._node
+
+            def numberOfShapesDirectlyBelow(self):
+                return 0
+
+            def fullPathName(self):
+                return self._node.name
+
+            def partialPathName(self):
+                return self._node.name.rpartition("|")[2]
+
+        class MSelectionList(object):
+            def add(self, name):
+                if name not in scene:
+                    raise RuntimeError("No object matches name")
+                self.node = scene[name]
+
+            def getDagPath(self, index):
+                return MDagPath(self.node)
+
+        class MObjectHandle(object):
+            def __init__(self, node):
+                self.node = node
+
+            def isValid(self):
+                return self.node.alive
+
+            def object(self):
+                return self.node
+
+        self.MDagPath = MDagPath
+        self.MSelectionList = MSelectionList
+        self.MObjectHandle = MObjectHandle
+
+    def create(self, name):
+        node = self.scene[name] = FakeMayaNode(name)
+        return node
+
+    def rename(self, node, name):
+        previous_name = node.name
+        del self.scene[previous_name]
+        node.name = name
+        self.scene[name] = node
+        self.MNodeMessage.emit(node, "renamed", previous_name)
+
+    def delete(self, node):
+        self.MNodeMessage.emit(node, "removed")
+        del self.scene[node.name]
+        node.alive = False
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_only_dirty_objects_are_stale(self):
+        tracker = DirtyTracker()
+        cache = ResultCache(tracker)
+        command = ["history", [1]]
+        self.assertEqual(cache.stale(command, ["a", "b"]), ["a", "b"])
+        cache.update(command, ["a", "b"], [("a", "has history")])
+        self.assertEqual(cache.stale(command, ["a", "b"]), [])
+        self.assertEqual(cache.results(command, ["a", "b"]), [("a", "has history")])
+        tracker.mark_dirty("b")
+        self.assertEqual(cache.stale(command, ["a", "b"]), ["b"])
+        tracker.mark_all_dirty()
+        self.assertEqual(cache.stale(command, ["a", "b"]), ["a", "b"])
+
+    def test_results_keep_command_order(self):
+        cache = ResultCache()
+        command = ["naming_convention", [1]]
+        # grouped by rule, then by object inside a rule
+        discrepancies = [("b", "rule 1"), ("d", "rule 1"), ("a", "rule 2"), ("c", "rule 2"), ("c", "rule 3")]
+        cache.update(command, ["a", "b", "c", "d"], discrepancies)
+        self.assertEqual(cache.results(command, ["a", "b", "c", "d"]), discrepancies)
+        self.assertEqual(cache.results(command, ["c", "d"]), [("d", "rule 1"), ("c", "rule 2"), ("c", "rule 3")])
+
+    def test_results_of_several_updates_are_merged_by_pass(self):
+        tracker = DirtyTracker()
+        cache = ResultCache(tracker)
+        command = ["naming_convention", [1]]
+        cache.update(command, ["a", "b", "c"], [("c", "rule 1"), ("a", "rule 2")])
+        tracker.mark_dirty("b")
+        cache.update(command, ["b"], [("b", "rule 1")])
+        self.assertEqual(cache.results(command, ["a", "b", "c"]),
+                         [("b", "rule 1"), ("c", "rule 1"), ("a", "rule 2")])
+
+    def test_outdated_results_are_pruned(self):
+        tracker = DirtyTracker()
+        cache = ResultCache(tracker, max_objects=3)
+        command = ["history", [1]]
+        cache.update(command, ["a", "b", "c"], [("a", "has history")])
+        tracker.mark_dirty("a")
+        cache.update(command, ["d"], [])
+        # outdated result of a is dropped, current ones stay
+        self.assertEqual(sorted(cache._entry(command)), ["b", "c", "d"])
+        self.assertEqual(cache.stale(command, ["b", "c", "d"]), [])
+
+    def test_size_is_capped(self):
+        cache = ResultCache(max_objects=3)
+        command = ["history", [1]]
+        cache.update(command, ["a", "b", "c"], [])
+        cache.update(command, ["d", "e"], [("e", "has history")])
+        self.assertEqual(sorted(cache._entry(command)), ["d", "e"])
+        self.assertEqual(cache.results(command, ["d", "e"]), [("e", "has history")])
+        self.assertEqual(cache.stale(command, ["a", "d"]), ["a"])
+
+
+class CallbackDirtyTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.om = FakeOpenMaya()
+        self.real_om = sys.modules.get("maya.api.OpenMaya")
+        sys.modules["maya.api.OpenMaya"] = maya.api.OpenMaya = self.om
+        self.tracker = CallbackDirtyTracker()
+
+    def tearDown(self):
+        self.tracker.release()
+        if self.real_om is None:
+            del sys.modules["maya.api.OpenMaya"]
+            del maya.api.OpenMaya
+        else:
+            sys.modules["maya.api.OpenMaya"] = maya.api.OpenMaya = self.real_om
+
+    def test_dirty_node_marks_its_object(self):
+        node = self.om.create("|cube")
+        self.tracker.watch(["|cube"])
+        version = self.tracker.version("|cube")
+        self.om.MNodeMessage.emit(node, "dirty")
+        self.assertNotEqual(self.tracker.version("|cube"), version)
+
+    def test_callbacks_follow_renamed_node(self):
+        cube = self.om.create("|cube")
+        self.tracker.watch(["|cube"])
+        self.om.rename(cube, "|box")
+        # a new node taking the old name is watched on its own
+        sphere = self.om.create("|cube")
+        self.tracker.watch(["|cube", "|box"])
+        self.assertTrue(self.om.MNodeMessage.watched(sphere))
+
+        versions = self.tracker.version("|cube"), self.tracker.version("|box")
+        self.om.MNodeMessage.emit(sphere, "dirty")
+        self.assertNotEqual(self.tracker.version("|cube"), versions[0])
+        self.assertEqual(self.tracker.version("|box"), versions[1])
+        self.om.MNodeMessage.emit(cube, "dirty")
+        self.assertNotEqual(self.tracker.version("|box"), versions[1])
+
+    def test_deleted_node_is_released(self):
+        cube = self.om.create("|cube")
+        self.tracker.watch(["|cube"])
+        version = self.tracker.version("|cube")
+        self.om.delete(cube)
+        self.assertNotEqual(self.tracker.version("|cube"), version)
+        self.assertFalse(self.om.MNodeMessage.watched(cube))
+        replacement = self.om.create("|cube")
+        self.tracker.watch(["|cube"])
+        self.assertTrue(self.om.MNodeMessage.watched(replacement))
+
+    def test_other_node_under_watched_name_is_watched(self):
+        cube = self.om.create("|cube")
+        self.tracker.watch(["|cube"])
+        # name reused without messages reaching the tracker, e.g. a parent was renamed
+        del self.om.scene["|cube"]
+        replacement = self.om.create("|cube")
+        self.tracker.watch(["|cube"])
+        self.assertTrue(self.om.MNodeMessage.watched(replacement))
+        self.assertFalse(self.om.MNodeMessage.watched(cube))
+
+    def test_scene_change_releases_nodes(self):
+        cube = self.om.create("|cube")
+        self.tracker.watch(["|cube"])
+        version = self.tracker.version("|cube")
+        list(self.om.MSceneMessage.callbacks.values())[0][2]()
+        self.assertNotEqual(self.tracker.version("|cube"), version)
+        self.assertFalse(self.om.MNodeMessage.watched(cube))
+
+
+if __name__ == "__main__":
+    unittest.main()
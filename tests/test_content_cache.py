@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import maya.cmds as mc
+
+from Inspector.checks.in_backends import CmdsBackend, FakeBackend, FakeMesh
+from Inspector.checks.in_discrepancy import Discrepancy
+from Inspector.core.in_content_cache import ContentCache, relative_discrepancies, absolute_discrepancies
+from Inspector.core.in_engine import Engine
+
+
+SETTINGS_LIST = [
+    ["geometry", [["lamina_faces", [1, 1]], ["non_manifold", [1, 1]]]],
+    ["uvs", [["flipped_UVS", [1, 1]]]],
+    ["other", [["history", [1, 1]]]],
+]
+
+
+class BrokenFingerprintBackend(FakeBackend):
+
+    def fingerprint(self, obj):
+        raise RuntimeError("no fingerprint")
+
+
+def failures(results):
+    return dict((result.name, sorted(list(index) for index in result.discrepancies)) for result in results)
+
+
+class DiscrepancyRowsTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        discrepancies = [Discrepancy("|grp|pCube1", "{} lamina faces", (2,), "f", [0, 1]),
+                         Discrepancy("|grp|pCube1", "has history"),
+                         ["|grp|pCube1", "legacy error", ["|grp|pCube1.vtx[3]", "|grp|pCube1"]],
+                         ["|grp|pCube1", "legacy object error"]]
+        rows = relative_discrepancies("|grp|pCube1", discrepancies)
+        self.assertNotIn("pCube1", repr(rows))
+        moved = absolute_discrepancies("|pCube2", rows)
+        self.assertEqual([list(index) for index in moved], [
+            ["|pCube2", "2 lamina faces", ["|pCube2.f[0:1]"]],
+            ["|pCube2", "has history"],
+            ["|pCube2", "legacy error", ["|pCube2.vtx[3]", "|pCube2"]],
+            ["|pCube2", "legacy object error"],
+        ])
+
+    def test_nodes_of_other_objects(self):
+        self.assertIsNone(relative_discrepancies("pCube1", [["pCube1", "error", ["pCube10.f[0]"]]]))
+
+
+class ContentCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.sqlite")
+        self.caches = []
+        # every object fails every check, mdl_char_obj1 and mdl_char_obj2 have identical content
+        mc.populate(6, failure_every=1)
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.directory)
+
+    def cache(self, backend=None, **kwargs):
+        cache = ContentCache(self.path, backend if backend is not None else CmdsBackend(), **kwargs)
+        self.caches.append(cache)
+        return cache
+
+    def run_engine(self, objects_list, cache=None, backend=None):
+        backend = backend if backend is not None else CmdsBackend()
+        return Engine(SETTINGS_LIST, backend, cache=cache).run(objects_list)
+
+    def test_hit_across_objects_with_same_content(self):
+        first = self.cache()
+        self.run_engine(["mdl_char_obj1"], first)
+        self.assertEqual(first.hits, 0)
+        # history isn't a content check, it is kept in session only
+        self.assertEqual(first.misses, 3)
+        self.assertEqual(first.stats()["entries"], 3)
+
+        second = self.cache()
+        results = self.run_engine(["mdl_char_obj2"], second)
+        self.assertEqual((second.hits, second.misses), (3, 0))
+        self.assertEqual(failures(results), failures(self.run_engine(["mdl_char_obj2"])))
+        self.assertTrue(all(result.discrepancies for result in results))
+        self.assertEqual(second.stats()["total_hits"], 3)
+
+    def test_misses_counted_once_per_object(self):
+        cache = self.cache()
+        objects_list = sorted(mc.SCENE)
+        self.run_engine(objects_list, cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 3 * len(objects_list)))
+        # second run in the same session is answered by session results
+        self.run_engine(objects_list, cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 3 * len(objects_list)))
+
+    def test_uv_reassignment_changes_fingerprint(self):
+        self.run_engine(["mdl_char_obj1"], self.cache())
+        node = mc.SCENE["mdl_char_obj2"]
+        uv_ids = range(sum(len(face_uv) for face_uv in node.face_uvs))
+        uv_ids[0], uv_ids[1] = uv_ids[1], uv_ids[0]
+        node.uv_ids = uv_ids
+        cache = self.cache()
+        self.run_engine(["mdl_char_obj2"], cache)
+        self.assertEqual(cache.hits, 0)
+        self.assertNotEqual(cache.fingerprint("mdl_char_obj1"), cache.fingerprint("mdl_char_obj2"))
+
+    def test_objects_without_fingerprint_stay_in_session(self):
+        backend = BrokenFingerprintBackend(dict(("obj{}".format(i), FakeMesh.cube(history=2)) for i in range(3)))
+        cache = self.cache(backend)
+        objects_list = sorted(backend.meshes)
+        results = self.run_engine(objects_list, cache, backend)
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(len(dict((result.name, result) for result in results)["history"].discrepancies), 3)
+        self.assertEqual(cache.stale(SETTINGS_LIST[0][1][0], objects_list), [])
+
+    def test_eviction_keeps_recently_used(self):
+        meshes = dict(("obj{}".format(i), FakeMesh.cube(points=[(i, 0.0, 0.0)] * 8)) for i in range(30))
+        backend = FakeBackend(meshes)
+        cache = self.cache(backend, max_entries=10)
+        for obj in sorted(meshes, key=lambda name: int(name[3:])):
+            self.run_engine([obj], cache, backend)
+        stats = cache.stats()
+        self.assertLessEqual(stats["entries"], 10)
+        self.assertGreater(stats["evicted"], 0)
+        # newest results survive eviction
+        fresh = self.cache(backend)
+        self.run_engine(["obj29"], fresh, backend)
+        self.assertEqual(fresh.hits, 3)
+
+    def test_clear(self):
+        cache = self.cache()
+        self.run_engine(["mdl_char_obj1"], cache)
+        cache.clear()
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.stale(SETTINGS_LIST[0][1][0], ["mdl_char_obj1"]), ["mdl_char_obj1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
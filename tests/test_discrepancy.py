@@ -0,0 +1,46 @@
+import unittest
+
+from Inspector.checks.in_discrepancy import Discrepancy, index_ranges
+
+
+class DiscrepancyTest(unittest.TestCase):
+
+    def test_ranged_nodes(self):
+        discrepancy = Discrepancy("pCube1", "{} lamina faces", (5,), "f", [4, 0, 1, 2, 7])
+        self.assertEqual(discrepancy.message, "5 lamina faces")
+        self.assertEqual(discrepancy.nodes(), ["pCube1.f[0:2]", "pCube1.f[4]", "pCube1.f[7]"])
+        self.assertEqual(discrepancy.node_count(), 5)
+        self.assertEqual(index_ranges([3, 1, 2, 2]), [(1, 3)])
+
+    def test_legacy_list_protocol(self):
+        discrepancy = Discrepancy("pCube1", "has history")
+        self.assertEqual(len(discrepancy), 2)
+        self.assertEqual(discrepancy[0], "pCube1")
+        self.assertEqual(list(discrepancy), ["pCube1", "has history"])
+        self.assertEqual(len(Discrepancy("pCube1", "ngons", component="f", indices=[0])), 3)
+
+    def test_equality(self):
+        discrepancy = Discrepancy("pCube1", "{} ngons", (2,), "f", [0, 1])
+        self.assertEqual(discrepancy, Discrepancy("pCube1", "{} ngons", (2,), "f", [0, 1]))
+        self.assertEqual(discrepancy, ["pCube1", "2 ngons", ["pCube1.f[0:1]"]])
+        self.assertNotEqual(discrepancy, Discrepancy("pCube1", "{} ngons", (2,), "f", [0, 2]))
+        self.assertNotEqual(discrepancy, discrepancy.renamed("pCube2"))
+        self.assertFalse(discrepancy != Discrepancy("pCube1", "{} ngons", (2,), "f", [0, 1]))
+
+    def test_other_operands_are_not_equal(self):
+        discrepancy = Discrepancy("pCube1", "has history")
+        for other in (None, 1, "pCube1", object()):
+            self.assertFalse(discrepancy == other)
+            self.assertTrue(discrepancy != other)
+        self.assertNotIn(None, [discrepancy])
+
+    def test_hash(self):
+        first = Discrepancy("pCube1", "has history")
+        second = Discrepancy("pCube1", "has history")
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len(set([first, second, Discrepancy("pCube2", "has history")])), 2)
+        self.assertEqual({first: 1}[second], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
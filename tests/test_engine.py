@@ -0,0 +1,182 @@
+import unittest
+
+import maya.cmds as mc
+
+import Inspector.core.in_profiling as in_profiling
+from Inspector.checks.in_backends import CmdsBackend, FakeBackend, FakeMesh
+from Inspector.core.in_cache import DirtyTracker, ResultCache
+from Inspector.core.in_engine import CommandResult, Engine, MODE_FULL, MODE_FAIL_FAST, MODE_TIME_BUDGET, MODE_GATE, FIRST_SLICE
+
+
+OBJECT_COUNT = 40
+
+
+def settings_list():
+    return [
+        ["geometry", [["triangle_count", [1, 1], {"options": [{"max": ["QLineEdit", 5000]}]}],
+                      ["lamina_faces", [1, 1]]]],
+        ["uvs", [["missing_UVS", [1, 1]]]],
+        ["other", [["history", [1, 1]]]],
+    ]
+
+
+def scene(failing=(5, 15, 25, 35)):
+    # failing objects have history and no UVs
+    meshes = {}
+    for i in range(OBJECT_COUNT):
+        if i in failing:
+            meshes["obj{}".format(i)] = FakeMesh.cube(history=3, uv_shells=0)
+        else:
+            meshes["obj{}".format(i)] = FakeMesh.cube()
+    return sorted(meshes, key=lambda name: int(name[3:])), FakeBackend(meshes)
+
+
+def failures(results):
+    return dict((result.name, len(result.discrepancies)) for result in results)
+
+
+class EngineModesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.objects, backend = scene()
+        self.engine = Engine(settings_list(), backend)
+
+    def test_full_run_checks_every_object(self):
+        stats = in_profiling.RunStats()
+        results = self.engine.run(self.objects, stats=stats, mode=MODE_FULL)
+        self.assertEqual([result.name for result in results],
+                         ["triangle_count", "lamina_faces", "missing_UVS", "history"])
+        self.assertEqual(failures(results), {"triangle_count": 0, "lamina_faces": 0, "missing_UVS": 4, "history": 4})
+        self.assertEqual(sorted(results[3].failed_objects()), ["obj15", "obj25", "obj35", "obj5"])
+        for result in results:
+            self.assertEqual(result.objects, self.objects)
+            self.assertEqual(result.coverage, 1.0)
+        self.assertEqual(stats.objects, OBJECT_COUNT)
+
+    def test_fail_fast_stops_each_command_at_first_discrepancy(self):
+        results = self.engine.run(self.objects, mode=MODE_FAIL_FAST)
+        self.assertEqual(failures(results), {"triangle_count": 0, "lamina_faces": 0, "missing_UVS": 1, "history": 1})
+        by_name = dict((result.name, result) for result in results)
+        self.assertEqual(by_name["history"].failed_objects(), ["obj5"])
+        # failing commands stop after the first slice, passing ones check everything
+        self.assertEqual(len(by_name["history"].objects), FIRST_SLICE)
+        self.assertEqual(by_name["history"].total, OBJECT_COUNT)
+        self.assertEqual(by_name["lamina_faces"].objects, self.objects)
+        self.assertIsNone(by_name["lamina_faces"].total)
+
+    def test_time_budget_reports_coverage(self):
+        results = self.engine.run(self.objects, mode=MODE_TIME_BUDGET, budget=60)
+        self.assertEqual(failures(results), failures(self.engine.run(self.objects)))
+        self.assertTrue(all(result.coverage == 1.0 for result in results))
+
+        results = self.engine.run(self.objects, mode=MODE_TIME_BUDGET, budget=0)
+        for result in results:
+            self.assertEqual(len(result.objects), FIRST_SLICE)
+            self.assertEqual(result.total, OBJECT_COUNT)
+            self.assertEqual(result.coverage, float(FIRST_SLICE) / OBJECT_COUNT)
+        self.assertEqual(failures(results)["history"], 2)
+
+    def test_gate_stops_at_first_failing_command(self):
+        results = self.engine.run(self.objects, mode=MODE_GATE)
+        self.assertEqual([result.name for result in results], ["triangle_count", "lamina_faces", "missing_UVS"])
+        self.assertEqual(results[-1].state, 0)
+        self.assertFalse(self.engine.passed(self.objects))
+
+    def test_gate_closed_early_finishes_stats(self):
+        stats = in_profiling.RunStats()
+        self.assertFalse(all(result.state for result in self.engine.iter_run(self.objects, stats=stats, mode=MODE_GATE)))
+        # generator is closed by all() returning before its end
+        self.assertNotEqual(stats.seconds, 0.0)
+        self.assertEqual(stats.objects, OBJECT_COUNT)
+        self.assertEqual(sorted(stats.commands), ["lamina_faces", "missing_UVS", "triangle_count"])
+
+    def test_full_run_closed_early_finishes_stats(self):
+        stats = in_profiling.RunStats()
+        results = self.engine.iter_run(self.objects, stats=stats)
+        next(results)
+        results.close()
+        self.assertNotEqual(stats.seconds, 0.0)
+        self.assertEqual(stats.objects, OBJECT_COUNT)
+
+    def test_gate_passes_clean_scene(self):
+        objects_list, backend = scene(failing=())
+        engine = Engine(settings_list(), backend)
+        self.assertTrue(engine.passed(objects_list))
+        self.assertEqual(len(engine.run(objects_list, mode=MODE_GATE)), 4)
+
+    def test_invalid_modes(self):
+        self.assertRaises(ValueError, self.engine.run, self.objects, mode="quick")
+        self.assertRaises(ValueError, self.engine.run, self.objects, mode=MODE_TIME_BUDGET)
+
+    def test_commands_given_explicitly(self):
+        results = self.engine.run(self.objects, commands=[["history", [1, 1]]])
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].category, "other")
+        self.assertEqual(len(results[0].discrepancies), 4)
+
+
+class RecordingTracker(DirtyTracker):
+
+    def __init__(self):
+        super(RecordingTracker, self).__init__()
+        self.dirty = []
+
+    def mark_dirty(self, obj):
+        super(RecordingTracker, self).mark_dirty(obj)
+        self.dirty.append(obj)
+
+
+class EngineFixTest(unittest.TestCase):
+    """
+    Fixes run through fake maya.cmds, the engine queries the same scene with CmdsBackend
+    """
+
+    def setUp(self):
+        mc.SCENE.clear()
+        for i in range(6):
+            name = "obj{}".format(i) if i % 3 == 0 else "mdl_char_obj{}".format(i)
+            mc.SCENE[name] = mc.FakeNode(history=3 if i % 2 == 0 else 1)
+        self.objects = sorted(mc.SCENE)
+        self.tracker = RecordingTracker()
+        settings = settings_list() + [["naming", [["naming_convention", [1, 1], {"options": [
+            {"first_prefix_": ["QLineEdit", "mdl_"]}, {"second_prefix": ["QLineEdit", "char_"]}]}]]]]
+        self.engine = Engine(settings, CmdsBackend(), cache=ResultCache(self.tracker))
+        self.results = dict((result.name, result) for result in self.engine.run(self.objects))
+
+    def tearDown(self):
+        mc.SCENE.clear()
+
+    def test_fix_clears_discrepancies_and_marks_objects_dirty(self):
+        failing = ["mdl_char_obj2", "mdl_char_obj4", "obj0"]
+        self.assertEqual(sorted(self.results["history"].failed_objects()), failing)
+        touched, result = self.engine.fix(["history", [1, 1]], self.results["history"])
+        self.assertEqual(touched, dict((obj, obj) for obj in failing))
+        self.assertEqual(result.discrepancies, [])
+        self.assertEqual(result.objects, self.objects)
+        self.assertEqual(sorted(set(self.tracker.dirty)), failing)
+        self.assertTrue(all(mc.SCENE[obj].history == 1 for obj in failing))
+        # fixed objects were checked again, other commands have to check them again too
+        self.assertEqual(self.engine.cache.stale(["history", [1, 1]], self.objects), [])
+        self.assertEqual(self.engine.cache.stale(["missing_UVS", [1, 1]], self.objects), failing)
+
+    def test_renaming_fix_marks_old_and_new_names_dirty(self):
+        command = self.engine.preset.command("naming_convention")
+        self.assertEqual(sorted(self.results["naming_convention"].failed_objects()), ["obj0", "obj3"])
+        touched, result = self.engine.fix(command, self.results["naming_convention"])
+        self.assertEqual(touched, {"obj0": "mdl_char_obj0", "obj3": "mdl_char_obj3"})
+        self.assertEqual(result.discrepancies, [])
+        self.assertIn("mdl_char_obj0", result.objects)
+        self.assertNotIn("obj0", result.objects)
+        self.assertEqual(sorted(self.tracker.dirty), ["mdl_char_obj0", "mdl_char_obj3", "obj0", "obj3"])
+
+    def test_fix_without_discrepancies_does_nothing(self):
+        touched, result = self.engine.fix(["history", [1, 1]], CommandResult("history", "other", self.objects, []))
+        self.assertEqual(touched, {})
+        self.assertEqual(self.tracker.dirty, [])
+
+    def test_command_without_fix(self):
+        self.assertRaises(ValueError, self.engine.fix, ["triangle_count", [1, 1]], self.results["triangle_count"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from Inspector.core import in_history
+from Inspector.core.in_engine import CommandResult
+from Inspector.core.in_history import History
+
+
+def noon(year, month, day):
+    # local noon, far from midnight in any timezone offset of the trend query
+    return time.mktime((year, month, day, 12, 0, 0, 0, 0, -1))
+
+
+def results(failing):
+    return [
+        CommandResult("history", "other", ["a", "b", "c"], [[obj, "Object has history"] for obj in failing], 0.5),
+        CommandResult("missing_UVS", "uvs", ["a", "b", "c"], [], 0.25),
+    ]
+
+
+class HistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "history", in_history.HISTORY_FILE_NAME)
+        self.history = History(self.path)
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.directory)
+
+    def record(self, failing, started, scene="/assets/chair.ma"):
+        recorder = self.history.recorder(scene, preset="default", mode="full", started=started)
+        for command_result in results(failing):
+            recorder.add_result(command_result)
+        return recorder.finish({"seconds": 1.5, "objects": 3, "maya_calls": 12})
+
+    def test_record_run(self):
+        run_id = self.history.record_run(results(["a", "b"]), "/assets/chair.ma", preset="default", mode="full",
+                                         stats={"seconds": 2.0, "objects": 3, "maya_calls": 7})
+        run = self.history.runs()[0]
+        self.assertEqual(run["id"], run_id)
+        self.assertEqual(run["asset"], "chair")
+        self.assertEqual((run["preset"], run["mode"], run["objects"], run["maya_calls"]), ("default", "full", 3, 7))
+        self.assertAlmostEqual(run["seconds"], 2.0)
+        commands = self.history._query("SELECT * FROM commands ORDER BY command")
+        self.assertEqual([(row["command"], row["failures"], row["discrepancies"]) for row in commands],
+                         [("history", 2, 2), ("missing_UVS", 0, 0)])
+        failures = self.history._query("SELECT object, message FROM failures ORDER BY object")
+        self.assertEqual([(row["object"], row["message"]) for row in failures],
+                         [("a", "Object has history"), ("b", "Object has history")])
+
+    def test_chunk_results_are_summed(self):
+        recorder = self.history.recorder("/assets/chair.ma")
+        recorder.add_result(CommandResult("history", "other", ["a", "b"], [["a", "error"], ["a", "other error"]], 0.5))
+        recorder.add_result(CommandResult("history", "other", ["c"], [["c", "error"]], 0.25))
+        recorder.finish()
+        command = self.history._query("SELECT * FROM commands")[0]
+        self.assertEqual((command["objects"], command["failures"], command["discrepancies"]), (3, 2, 3))
+        self.assertEqual(command["seconds"], 0.75)
+        self.assertEqual(self.history.runs()[0]["objects"], 3)
+
+    def test_failure_trend_per_day(self):
+        self.record(["a"], noon(2024, 5, 1))
+        self.record([], noon(2024, 5, 1) + 60)
+        self.record(["a", "b"], noon(2024, 5, 2))
+        trend = self.history.failure_trend("history")
+        self.assertEqual(trend, [
+            {"day": "2024-05-01", "runs": 2, "failures": 1, "failed_runs": 1},
+            {"day": "2024-05-02", "runs": 1, "failures": 2, "failed_runs": 1},
+        ])
+        self.assertEqual(self.history.failure_trend("history", since=noon(2024, 5, 2))[0]["day"], "2024-05-02")
+        # all commands, missing_UVS never fails
+        self.assertEqual([row["failures"] for row in self.history.failure_trend()], [1, 2])
+
+    def test_new_failures(self):
+        self.record(["a"], noon(2024, 5, 1))
+        self.record(["a", "b"], noon(2024, 5, 2))
+        # scene without earlier run is skipped
+        self.record(["c"], noon(2024, 5, 2), scene="/assets/table.ma")
+        failures = self.history.new_failures(noon(2024, 5, 2) - 60)
+        self.assertEqual([(row["scene"], row["command"], row["object"]) for row in failures],
+                         [("/assets/chair.ma", "history", "b")])
+
+    def test_slowest_commands(self):
+        self.record([], noon(2024, 5, 1))
+        self.record([], noon(2024, 5, 2))
+        slowest = self.history.slowest_commands()
+        self.assertEqual([(row["command"], row["runs"]) for row in slowest], [("history", 2), ("missing_UVS", 2)])
+        self.assertAlmostEqual(slowest[0]["seconds_per_object"], 1.0 / 6)
+
+    def test_prune(self):
+        self.record(["a"], noon(2024, 5, 1))
+        self.record(["a"], noon(2024, 5, 3))
+        self.assertEqual(self.history.prune(noon(2024, 5, 2)), 1)
+        self.assertEqual(len(self.history.runs()), 1)
+        self.assertEqual(len(self.history._query("SELECT * FROM failures")), 1)
+        self.assertEqual(len(self.history._query("SELECT * FROM commands")), 2)
+
+    def test_schema_is_created_in_existing_file(self):
+        os.makedirs(os.path.dirname(self.path))
+        connection = sqlite3.connect(self.path)
+        connection.execute("CREATE TABLE notes (text TEXT)")
+        connection.execute("INSERT INTO notes VALUES ('kept')")
+        connection.commit()
+        connection.close()
+        self.record(["a"], noon(2024, 5, 1))
+        self.assertEqual(self.history._query("SELECT text FROM notes"), [{"text": "kept"}])
+        self.assertEqual(len(self.history.runs()), 1)
+
+    def test_existing_history_is_kept(self):
+        self.record(["a"], noon(2024, 5, 1))
+        self.history.close()
+        reopened = History(self.path)
+        try:
+            reopened.record_run(results([]), "/assets/chair.ma")
+            self.assertEqual(len(reopened.runs()), 2)
+        finally:
+            reopened.close()
+
+    def test_parse_since(self):
+        self.assertEqual(in_history.parse_since("2d", now=1000000.0), 1000000.0 - 2 * 86400)
+        self.assertEqual(in_history.parse_since("2024-05-01 12:00"), noon(2024, 5, 1))
+        self.assertRaises(ValueError, in_history.parse_since, "soon")
+
+
+if __name__ == "__main__":
+    unittest.main()
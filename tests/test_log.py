@@ -0,0 +1,105 @@
+import unittest
+
+import Inspector.core.in_log as in_log
+from Inspector.core.in_engine import CommandResult
+
+try:
+    from PySide2 import QtCore, QtWidgets
+except ImportError:
+    QtCore = None
+
+
+def command_result():
+    # obj1 fails twice, obj3 once
+    return CommandResult("history", "other", ["obj0", "obj1", "obj2", "obj3"],
+                         [["obj1", "has history"], ["obj1", "is not frozen", ["obj1.vtx[0]"]], ["obj3", "has history"]])
+
+
+class LogTreeTest(unittest.TestCase):
+
+    def test_row_counts(self):
+        tree = in_log.LogTree()
+        row = tree.add_result(command_result())
+        tree.add_result(CommandResult("ngons", "geometry", ["obj0"], []))
+        self.assertEqual(tree.command_count(), 2)
+        # one row per passing object and per discrepancy
+        self.assertEqual(tree.object_count(row), 5)
+        self.assertEqual([log_row.obj for log_row in tree.rows(row)], ["obj0", "obj1", "obj1", "obj2", "obj3"])
+        self.assertEqual([log_row.state for log_row in tree.rows(row)], [1, 0, 0, 1, 0])
+        self.assertEqual(tree.object_count(row), len(tree.rows(row)))
+        self.assertEqual(tree.object_row(row, 2).error_nodes(), ["obj1.vtx[0]"])
+        self.assertEqual(tree.object_row(row, 1).error_nodes(), ["obj1"])
+        self.assertEqual(tree.object_count(1), 1)
+
+    def test_failures_only(self):
+        tree = in_log.LogTree(failures_only=True)
+        row = tree.add_result(command_result())
+        self.assertEqual(tree.object_count(row), 3)
+        self.assertEqual([log_row.state for log_row in tree.rows(row)], [0, 0, 0])
+        tree.set_failures_only(False)
+        self.assertEqual(tree.object_count(row), 5)
+
+    def test_refresh_after_result_grew(self):
+        tree = in_log.LogTree()
+        result = command_result()
+        row = tree.add_result(result)
+        self.assertEqual(len(tree.rows(row)), 5)
+        result.objects.append("obj4")
+        result.discrepancies.append(["obj4", "has history"])
+        tree.refresh(row)
+        self.assertEqual(tree.object_count(row), 6)
+        self.assertEqual(tree.rows(row)[-1].message, "has history")
+
+    def test_error_groups(self):
+        tree = in_log.LogTree()
+        row = tree.add_result(command_result())
+        groups = tree.error_groups(row)
+        self.assertEqual(list(groups), ["has history", "is not frozen"])
+        self.assertEqual(list(groups["has history"]), ["obj1", "obj3"])
+
+
+@unittest.skipIf(QtCore is None, "PySide2 is not available")
+class LogModelTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    def setUp(self):
+        from Inspector.UI.inspector_log import LogModel
+        self.model = LogModel()
+
+    def test_rows_are_fetched_in_pages(self):
+        objects_list = ["obj{}".format(i) for i in range(self.model.FETCH_SIZE + 50)]
+        row = self.model.add_result(CommandResult("history", "other", objects_list,
+                                                  [[obj, "has history"] for obj in objects_list[::2]]))
+        parent = self.model.index(row, 0)
+        self.assertEqual(self.model.rowCount(), 1)
+        self.assertEqual(self.model.rowCount(parent), 0)
+        self.assertTrue(self.model.hasChildren(parent))
+        self.model.fetchMore(parent)
+        self.assertEqual(self.model.rowCount(parent), self.model.FETCH_SIZE)
+        self.model.fetchMore(parent)
+        self.assertEqual(self.model.rowCount(parent), len(objects_list))
+        self.assertFalse(self.model.canFetchMore(parent))
+        self.assertEqual(self.model.data(self.model.index(0, 2, parent)), "has history")
+
+    def test_failures_only_resets_rows(self):
+        row = self.model.add_result(command_result())
+        parent = self.model.index(row, 0)
+        self.model.fetchMore(parent)
+        self.assertEqual(self.model.rowCount(parent), 5)
+        self.model.set_failures_only(True)
+        parent = self.model.index(row, 0)
+        self.assertEqual(self.model.rowCount(parent), 0)
+        self.model.fetchMore(parent)
+        self.assertEqual(self.model.rowCount(parent), 3)
+
+    def test_clear(self):
+        self.model.add_result(command_result())
+        self.model.clear()
+        self.assertEqual(self.model.rowCount(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
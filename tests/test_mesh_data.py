@@ -0,0 +1,109 @@
+import unittest
+
+from Inspector.checks.in_backends import FakeBackend, FakeMesh
+from Inspector.checks.in_mesh_data import MeshData
+
+
+class CountingBackend(FakeBackend):
+    """
+    FakeBackend counting queries per attribute
+    """
+
+    def __init__(self, meshes):
+        super(CountingBackend, self).__init__(meshes)
+        self.queries = {}
+
+    def count(self, attribute):
+        self.queries[attribute] = self.queries.get(attribute, 0) + 1
+
+    def triangles(self, obj):
+        self.count("triangles")
+        return super(CountingBackend, self).triangles(obj)
+
+    def history(self, obj):
+        self.count("history")
+        return super(CountingBackend, self).history(obj)
+
+    def lamina_faces(self, obj):
+        self.count("lamina_faces")
+        return super(CountingBackend, self).lamina_faces(obj)
+
+
+class BulkBackend(CountingBackend):
+
+    def __init__(self, meshes, supported=True):
+        super(BulkBackend, self).__init__(meshes)
+        self.supported = supported
+
+    def bulk_lamina_faces(self, objects_list):
+        self.count("bulk_lamina_faces")
+        if not self.supported:
+            return None
+        return dict((obj, FakeBackend.lamina_faces(self, obj)) for obj in objects_list)
+
+
+def meshes(count=5):
+    cube = FakeMesh.cube()
+    # face 0 doubled with reversed winding is a lamina face
+    lamina = FakeMesh(cube.face_vertices + [cube.face_vertices[0][::-1]], points=cube.points, history=2)
+    return dict(("obj{}".format(i), lamina if i % 2 else FakeMesh.cube()) for i in range(count))
+
+
+class MeshDataTest(unittest.TestCase):
+
+    def test_per_object_queries_once(self):
+        backend = CountingBackend(meshes())
+        mesh_data = MeshData(backend)
+        objects_list = sorted(backend.meshes)
+        mesh_data.collect(objects_list, ["triangles", "history"])
+        self.assertEqual(backend.queries, {"triangles": 5, "history": 5})
+        self.assertEqual(mesh_data.calls, 10)
+        self.assertEqual(sorted(mesh_data.object_seconds), objects_list)
+
+        mesh_data.collect(objects_list, ["triangles", "history", "unknown"])
+        self.assertEqual(mesh_data.calls, 10)
+        self.assertEqual(mesh_data.get("obj0", "triangles"), 12)
+        self.assertEqual(mesh_data.get("obj1", "history"), 2)
+        self.assertEqual(backend.queries, {"triangles": 5, "history": 5})
+
+    def test_get_collects_missing_attribute(self):
+        backend = CountingBackend(meshes())
+        mesh_data = MeshData(backend)
+        self.assertEqual(mesh_data.get("obj1", "triangles"), 14)
+        self.assertEqual(backend.queries, {"triangles": 1})
+
+    def test_bulk_query(self):
+        backend = BulkBackend(meshes())
+        mesh_data = MeshData(backend)
+        objects_list = sorted(backend.meshes)
+        mesh_data.collect(objects_list, ["lamina_faces", "triangles"])
+        self.assertEqual(backend.queries, {"bulk_lamina_faces": 1, "triangles": 5})
+        self.assertEqual(mesh_data.calls, 6)
+        self.assertEqual(list(mesh_data.get("obj1", "lamina_faces")), [0, 6])
+        self.assertEqual(list(mesh_data.get("obj0", "lamina_faces")), [])
+        self.assertEqual(mesh_data.attribute_seconds["lamina_faces"][1], 5)
+
+    def test_bulk_matches_per_object(self):
+        objects_list = sorted(meshes())
+        bulk = MeshData(BulkBackend(meshes()))
+        per_object = MeshData(CountingBackend(meshes()))
+        bulk.collect(objects_list, ["lamina_faces"])
+        per_object.collect(objects_list, ["lamina_faces"])
+        for obj in objects_list:
+            self.assertEqual(bulk.get(obj, "lamina_faces"), per_object.get(obj, "lamina_faces"))
+
+    def test_unsupported_bulk_falls_back_to_per_object(self):
+        backend = BulkBackend(meshes(), supported=False)
+        mesh_data = MeshData(backend)
+        mesh_data.collect(sorted(backend.meshes), ["lamina_faces"])
+        self.assertEqual(backend.queries, {"bulk_lamina_faces": 1, "lamina_faces": 5})
+        self.assertEqual(list(mesh_data.get("obj3", "lamina_faces")), [0, 6])
+
+    def test_single_object_skips_bulk(self):
+        backend = BulkBackend(meshes())
+        MeshData(backend).collect(["obj1"], ["lamina_faces"])
+        self.assertEqual(backend.queries, {"lamina_faces": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+import Inspector.checks.in_naming as in_naming
+
+
+def options(*values):
+    return [{"line_{}".format(index): ["QLineEdit", value]} for index, value in enumerate(values)]
+
+
+class NamingTest(unittest.TestCase):
+
+    def test_prefixes_and_patterns(self):
+        rules = in_naming.compile_rules(options("mdl_", "char_", "re:_GEO$"))
+        discrepancies = in_naming.validate(["mdl_char_body_GEO", "mdl_body_GEO", "mdl_char_body", "mdl_body_GEO"], rules)
+        self.assertEqual([list(index) for index in discrepancies], [
+            ["mdl_body_GEO", "Object name mdl_body_GEO doesn`t have mdl_char_ prefix"],
+            ["mdl_char_body", "Object name mdl_char_body doesn`t match _GEO$ pattern"],
+        ])
+        self.assertEqual(in_naming.prefixed_name("|grp|ns:mdl_body", rules), "ns:mdl_char_body")
+
+    def test_glob_pattern(self):
+        rules = in_naming.compile_rules(options("", "glob:*_GEO"))
+        self.assertEqual([index[0] for index in in_naming.validate(["a_GEO", "b_PLY"], rules)], ["b_PLY"])
+
+    def test_invalid_regex_is_reported(self):
+        rules = in_naming.compile_rules(options("mdl_", "re:(unclosed"))
+        discrepancies = in_naming.validate(["mdl_a", "b"], rules)
+        self.assertEqual([index[0] for index in discrepancies], ["b", "mdl_a"])
+        self.assertEqual(discrepancies[1].template, in_naming.INVALID_PATTERN_ERROR)
+        self.assertIn("(unclosed", discrepancies[1].message)
+
+    def test_compiled_rules_are_reused_and_bounded(self):
+        rules = in_naming.compile_rules(options("mdl_"))
+        self.assertIs(in_naming.compile_rules(options("mdl_")), rules)
+        for index in range(in_naming.MAX_COMPILED_RULES * 3):
+            in_naming.compile_rules(options("prefix{}_".format(index)))
+        self.assertLessEqual(len(in_naming._compiled_rules), in_naming.MAX_COMPILED_RULES)
+        self.assertNotIn(("mdl_",), in_naming._compiled_rules)
+
+
+if __name__ == "__main__":
+    unittest.main()
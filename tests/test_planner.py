@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from Inspector.checks.in_backends import FakeBackend, FakeMesh
+from Inspector.core.in_cache import ResultCache
+from Inspector.core.in_engine import CommandResult, Engine
+from Inspector.core.in_planner import CostModel, Planner, DEFAULT_COMMAND_SECONDS, PRIOR_FAILURE_RATE
+
+
+def pairs():
+    return [("geometry", ["non_manifold", [1, 1]]), ("geometry", ["ngons", [1, 1]]), ("other", ["history", [1, 1]])]
+
+
+class CostModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "inspector_costs.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_defaults(self):
+        costs = CostModel()
+        self.assertEqual(costs.command_seconds("history"), DEFAULT_COMMAND_SECONDS)
+        self.assertEqual(costs.failure_rate("history"), PRIOR_FAILURE_RATE)
+        self.assertEqual(costs.attribute_seconds("unknown"), DEFAULT_COMMAND_SECONDS)
+
+    def test_seconds_per_executed_object(self):
+        costs = CostModel()
+        # 4 objects, 2 of them from cache
+        costs.record_result(CommandResult("history", "other", ["a", "b", "c", "d"], [["a", "error"]], 1.0, executed=2))
+        self.assertEqual(costs.command_seconds("history"), 0.5)
+        self.assertEqual(costs.failure_rate("history"), 1.0)
+        costs.record_result(CommandResult("history", "other", ["a", "b"], [], 0.1))
+        self.assertAlmostEqual(costs.command_seconds("history"), 0.5 + 0.3 * (0.05 - 0.5))
+        self.assertAlmostEqual(costs.failure_rate("history"), 0.7)
+
+    def test_cached_results_are_not_recorded(self):
+        costs = CostModel()
+        costs.record_result(CommandResult("history", "other", ["a", "b"], [], 1e-6, executed=0))
+        costs.record_result(CommandResult("history", "other", [], [], 0.0))
+        self.assertEqual(costs.commands, {})
+        self.assertFalse(costs.changed)
+
+    def test_save_and_load(self):
+        costs = CostModel(self.path)
+        costs.record_result(CommandResult("history", "other", ["a"], [], 0.25))
+        costs.attributes["history"] = 0.125
+        costs.save()
+        self.assertFalse(costs.changed)
+        loaded = CostModel(self.path)
+        self.assertEqual(loaded.command_seconds("history"), 0.25)
+        self.assertEqual(loaded.attribute_seconds("history"), 0.125)
+
+    def test_unreadable_file_gives_defaults(self):
+        with open(self.path, "w") as costs_file:
+            costs_file.write("{not json")
+        self.assertEqual(CostModel(self.path).commands, {})
+
+
+class PlannerTest(unittest.TestCase):
+
+    def test_shared_attribute_is_counted_once(self):
+        steps = Planner().plan(pairs())
+        self.assertEqual([step.command[0] for step in steps], ["history", "non_manifold", "ngons"])
+        self.assertEqual([step.attributes for step in steps], [["history"], ["topology"], []])
+        # ngons only pays for itself once non_manifold collected topology
+        self.assertEqual(steps[2].cost, DEFAULT_COMMAND_SECONDS)
+
+    def test_failing_commands_go_first(self):
+        costs = CostModel()
+        costs.commands["ngons"] = {"seconds": DEFAULT_COMMAND_SECONDS, "failure_rate": 1.0}
+        order = Planner(costs).order(pairs())
+        self.assertEqual([command[0] for category, command in order], ["ngons", "non_manifold", "history"])
+
+    def test_equal_commands_keep_preset_order(self):
+        order = Planner().order([("geometry", ["ngons", [1, 1]]), ("geometry", ["non_manifold", [1, 1]])])
+        self.assertEqual([command[0] for category, command in order], ["ngons", "non_manifold"])
+
+
+class EnginePlannerTest(unittest.TestCase):
+
+    def setUp(self):
+        meshes = dict(("obj{}".format(i), FakeMesh.cube(history=3 if i % 4 == 0 else 1)) for i in range(8))
+        self.objects = sorted(meshes)
+        settings_list = [["other", [["history", [1, 1]]]]]
+        self.costs = CostModel()
+        self.engine = Engine(settings_list, FakeBackend(meshes), cache=ResultCache(), planner=Planner(self.costs))
+
+    def test_cached_runs_dont_change_costs(self):
+        self.engine.run(self.objects)
+        learned = dict(self.costs.commands["history"])
+        self.assertEqual(learned["failure_rate"], 1.0)
+        # every result comes from cache
+        self.engine.run(self.objects)
+        self.assertEqual(self.costs.commands["history"], learned)
+
+    def test_dirty_objects_are_timed(self):
+        self.engine.run(self.objects)
+        self.engine.cache.tracker.mark_dirty("obj1")
+        result = self.engine.run(self.objects)[0]
+        self.assertEqual(result.executed, 1)
+        self.assertEqual(len(result.objects), len(self.objects))
+        self.assertEqual(len(result.discrepancies), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
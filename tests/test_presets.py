@@ -0,0 +1,149 @@
+import os
+import cPickle
+import shutil
+import tempfile
+import unittest
+
+import Inspector.core.in_presets as in_presets
+from tests import PACKAGE_ROOT
+
+
+DEFAULT_PRESET = os.path.join(PACKAGE_ROOT, "Inspector", "presets", "default.txt")
+
+
+class ParsePresetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.preset = in_presets.read_preset(DEFAULT_PRESET)
+
+    def test_round_trip(self):
+        data = in_presets.dump_preset(self.preset)
+        self.assertTrue(data.startswith(in_presets.MAGIC))
+        self.assertEqual(in_presets.parse_preset(data).to_settings_list(), self.preset.to_settings_list())
+
+    def test_legacy_file_is_written_back_as_legacy(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "legacy.txt")
+            in_presets.write_preset(path, self.preset)
+            with open(path, "rb") as preset_file:
+                self.assertFalse(preset_file.read().startswith(in_presets.MAGIC))
+            self.assertEqual(in_presets.load_preset(path), self.preset.to_settings_list())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_current_preset_is_readable_by_older_versions(self):
+        directory = tempfile.mkdtemp()
+        try:
+            in_presets.set_current_preset(directory, "custom", "custom.insp")
+            path = os.path.join(directory, "current_preset.txt")
+            with open(path, "rb") as current_file:
+                self.assertEqual(cPickle.load(current_file), ["custom", "custom.insp"])
+            self.assertEqual(in_presets.read_current_preset(path), ["custom", "custom.insp"])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_truncated_header(self):
+        for data in ("INSP", "INSP\x00"):
+            self.assertRaises(in_presets.PresetError, in_presets.parse_preset, data)
+
+    def test_corrupted_payload(self):
+        data = in_presets.dump_preset(self.preset)
+        self.assertRaises(in_presets.PresetError, in_presets.parse_preset, data[:in_presets.HEADER.size + 4])
+
+    def test_newer_format_version(self):
+        data = in_presets.dump_preset(self.preset)
+        newer = in_presets.HEADER.pack(in_presets.MAGIC, in_presets.FORMAT_VERSION + 1) + data[in_presets.HEADER.size:]
+        self.assertRaises(in_presets.PresetError, in_presets.parse_preset, newer)
+
+    def test_version_without_migration(self):
+        data = in_presets.dump_preset(self.preset)
+        older = in_presets.HEADER.pack(in_presets.MAGIC, 0) + data[in_presets.HEADER.size:]
+        self.assertRaises(in_presets.PresetError, in_presets.parse_preset, older)
+
+    def test_legacy_pickle_of_other_values(self):
+        for value in ({"geometry": []}, 5, [["geometry"]], [["geometry", [["ngons"]]]], [[1, [["ngons", [1, 1]]]]],
+                      [["naming", [["naming_convention", [1, 1], {"prefix": []}]]]]):
+            self.assertRaises(in_presets.PresetError, in_presets.parse_preset, cPickle.dumps(value))
+
+    def test_legacy_pickle_refuses_globals(self):
+        self.assertRaises(in_presets.PresetError, in_presets.parse_preset, "cos\nsystem\n(S'echo'\ntR.")
+
+
+def settings_list():
+    return [
+        ["geometry", [["triangle_count", [1, 1], {"options": [{"max": ["QLineEdit", 5000]}]}],
+                      ["lamina_faces", [0, 1]]]],
+        ["other", [["history", [1, 0]]]],
+    ]
+
+
+class PresetModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.settings_list = settings_list()
+        self.model = in_presets.PresetModel(self.settings_list)
+        self.changes = []
+        self.model.add_listener(lambda name, field, value: self.changes.append((name, field, value)))
+
+    def test_index(self):
+        self.assertEqual(len(self.model), 3)
+        self.assertIn("history", self.model)
+        self.assertEqual(self.model.category("history"), "other")
+        self.assertEqual(self.model.categories(), ["geometry", "other"])
+        self.assertEqual([command[0] for command in self.model.commands("geometry")], ["triangle_count", "lamina_faces"])
+        self.assertRaises(KeyError, self.model.commands, "naming")
+        # command lists are shared with the settings list
+        self.assertIs(self.model.command("history"), self.settings_list[1][1][0])
+
+    def test_checked_index(self):
+        self.assertEqual(self.model.checked_names(), ["triangle_count", "history"])
+        self.model.set_checked("lamina_faces")
+        self.model.set_checked("triangle_count", False)
+        # preset order, not order of changes
+        self.assertEqual(self.model.checked_names(), ["lamina_faces", "history"])
+        self.assertEqual(self.model.pairs(checked_only=True),
+                         [("geometry", self.model.command("lamina_faces")), ("other", self.model.command("history"))])
+        self.assertEqual(self.settings_list[0][1][0][1], [0, 1])
+        self.assertEqual(self.settings_list[0][1][1][1], [1, 1])
+        self.model.set_checked_many(["triangle_count", "lamina_faces", "history"], False)
+        self.assertEqual(self.model.checked_commands(), [])
+
+    def test_listeners_are_notified_of_changes(self):
+        self.model.set_checked("lamina_faces")
+        self.model.set_visible("history")
+        self.model.set_option("triangle_count", "max", 100)
+        self.assertEqual(self.changes, [("lamina_faces", "checked", True), ("history", "visible", True),
+                                        ("triangle_count", "options", {"max": 100})])
+        self.assertEqual(self.settings_list[0][1][0][2]["options"][0]["max"][1], 100)
+
+    def test_unchanged_values_dont_notify(self):
+        self.model.set_checked("triangle_count")
+        self.model.set_visible("triangle_count")
+        self.model.set_option("triangle_count", "max", 5000)
+        self.assertEqual(self.changes, [])
+
+    def test_removed_listener(self):
+        listener = self.model._listeners[0]
+        self.model.remove_listener(listener)
+        self.model.set_checked("lamina_faces")
+        self.assertEqual(self.changes, [])
+
+    def test_options(self):
+        self.assertEqual(self.model.options("triangle_count"), {"max": 5000})
+        self.assertEqual(self.model.option("triangle_count", "max"), 5000)
+        self.assertIsNone(self.model.options("history"))
+
+    def test_set_option_errors(self):
+        self.assertRaises(KeyError, self.model.set_option, "history", "max", 1)
+        self.assertRaises(KeyError, self.model.set_option, "triangle_count", "min", 1)
+        self.assertRaises(KeyError, self.model.set_option, "unknown", "max", 1)
+        self.assertEqual(self.changes, [])
+
+    def test_preset_round_trip(self):
+        model = in_presets.PresetModel.from_preset(self.model.to_preset("custom"))
+        self.assertEqual(model.settings_list, self.settings_list)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import Inspector.core.in_profiling as in_profiling
+
+
+class ProfiledTest(unittest.TestCase):
+
+    def test_no_path_runs_unprofiled(self):
+        with in_profiling.profiled(None) as profile:
+            self.assertIsNone(profile)
+        with in_profiling.profiled("") as profile:
+            self.assertIsNone(profile)
+
+    def test_path_dumps_stats(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "run.prof")
+            with in_profiling.profiled(path) as profile:
+                self.assertIsNotNone(profile)
+                sum(range(100))
+            self.assertTrue(os.path.isfile(path))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import Inspector.checks.in_registry as in_registry
+
+
+STUDIO_CHECKS = '''
+from Inspector.checks.in_registry import check
+
+
+def object_names(objects_list):
+    return list(objects_list)
+
+
+@check(category="naming")
+def studio_short_names(objects_list):
+    return [[obj, "name is too short"] for obj in object_names(objects_list) if len(obj) < 3]
+'''
+
+
+class RegistryTest(unittest.TestCase):
+
+    def test_builtin_checks(self):
+        spec = in_registry.get("history")
+        self.assertEqual(spec.category, "other")
+        self.assertEqual(spec.requires, ("history",))
+        self.assertTrue(spec.pure)
+        self.assertIsNotNone(in_registry.get_fix("history"))
+        self.assertIsNone(in_registry.get_fix("ngons"))
+
+    def test_helpers_and_fixes_are_not_checks(self):
+        for name in ("get_mesh_data", "component_discrepancies", "delete_history", "MeshData"):
+            self.assertRaises(KeyError, in_registry.get, name)
+        self.assertRaises(KeyError, in_registry.get, "no_such_check")
+        self.assertRaises(KeyError, in_registry.get_fix, "no_such_check")
+
+    def test_studio_checks(self):
+        directory = tempfile.mkdtemp()
+        previous = os.environ.get(in_registry.CHECK_PATHS_ENV)
+        try:
+            with open(os.path.join(directory, "studio_naming.py"), "w") as module_file:
+                module_file.write(STUDIO_CHECKS)
+            os.environ[in_registry.CHECK_PATHS_ENV] = directory
+            in_registry.discover()
+            spec = in_registry.get("studio_short_names")
+            self.assertEqual(spec.run(["ab", "abc"]), [["ab", "name is too short"]])
+            self.assertRaises(KeyError, in_registry.get, "object_names")
+        finally:
+            if previous is None:
+                del os.environ[in_registry.CHECK_PATHS_ENV]
+            else:
+                os.environ[in_registry.CHECK_PATHS_ENV] = previous
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+import os
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+import Inspector.core.in_profiling as in_profiling
+from Inspector.checks.in_discrepancy import Discrepancy
+from Inspector.core.in_engine import CommandResult
+from Inspector.core.in_reports import ReportWriter, FIELDS
+
+
+TRICKY_NAME = 'ns:mdl_"chair",01'
+TRICKY_MESSAGE = u'Name "ns:mdl_chair,01" breaks rule "mdl_*, char_*" – rename it'
+
+
+def results():
+    return [
+        CommandResult("naming_convention", "naming", [TRICKY_NAME, "mdl_table"],
+                      [[TRICKY_NAME, TRICKY_MESSAGE]], 0.5),
+        CommandResult("ngons", "geometry", [TRICKY_NAME, "mdl_table"],
+                      [Discrepancy("mdl_table", "Object has {} faces with more than 4 sides", (3,), "f", [2, 3, 7])],
+                      0.25),
+        CommandResult("history", "other", [TRICKY_NAME, "mdl_table"], [], 0.125),
+    ]
+
+
+def stats():
+    run_stats = in_profiling.RunStats()
+    for command_result in results():
+        run_stats.add_result(command_result)
+    run_stats.add_objects(2)
+    run_stats.finish()
+    return run_stats
+
+
+class ReportWriterTest(unittest.TestCase):
+
+    def write(self, report_format):
+        stream = StringIO()
+        writer = ReportWriter(stream, report_format, preset_name="default, v2", scene='/scenes/"chair".ma')
+        writer.write_results(results())
+        writer.write_stats(stats())
+        return writer, stream.getvalue()
+
+    def test_jsonl_round_trip(self):
+        writer, text = self.write("jsonl")
+        rows = [json.loads(line) for line in text.splitlines()]
+        self.assertEqual(writer.rows, len(rows))
+        self.assertEqual([row["type"] for row in rows], ["discrepancy", "discrepancy", "command", "command", "command", "run"])
+        self.assertEqual(rows[0], {
+            "type": "discrepancy", "preset": "default, v2", "scene": '/scenes/"chair".ma', "category": "naming",
+            "command": "naming_convention", "object": TRICKY_NAME, "message": TRICKY_MESSAGE,
+            "error_nodes": [TRICKY_NAME], "seconds": 0.5,
+        })
+        self.assertEqual(rows[1]["message"], "Object has 3 faces with more than 4 sides")
+        self.assertEqual(rows[1]["error_nodes"], ["mdl_table.f[2:3]", "mdl_table.f[7]"])
+        # JSON rows carry command stats and run summary as separate fields
+        self.assertEqual(rows[3]["discrepancies"], 1)
+        self.assertEqual(rows[5]["objects"], 2)
+
+    def test_csv_round_trip(self):
+        writer, text = self.write("csv")
+        rows = list(csv.reader(StringIO(text)))
+        self.assertEqual(tuple(rows[0]), FIELDS)
+        rows = [dict(zip(FIELDS, row)) for row in rows[1:]]
+        self.assertEqual(writer.rows, len(rows))
+        first = rows[0]
+        self.assertEqual(first["object"], TRICKY_NAME)
+        self.assertEqual(first["message"].decode("utf-8"), TRICKY_MESSAGE)
+        self.assertEqual(first["preset"], "default, v2")
+        self.assertEqual(first["scene"], '/scenes/"chair".ma')
+        self.assertEqual(first["error_nodes"], TRICKY_NAME)
+        self.assertEqual(float(first["seconds"]), 0.5)
+        self.assertEqual(rows[1]["error_nodes"].split(" "), ["mdl_table.f[2:3]", "mdl_table.f[7]"])
+        # missing values are empty cells
+        self.assertEqual(rows[2]["object"], "")
+        self.assertEqual(rows[2]["command"], "history")
+        self.assertEqual(rows[2]["message"], "2 objects, 0 discrepancies")
+        self.assertEqual(rows[-1]["type"], "run")
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, ReportWriter, StringIO(), "xml")
+
+    def test_open_takes_format_from_extension(self):
+        directory = tempfile.mkdtemp()
+        try:
+            for name, first_line in (("report.csv", ",".join(FIELDS)), ("report.jsonl", None)):
+                path = os.path.join(directory, name)
+                with ReportWriter.open(path, preset_name="default") as writer:
+                    writer.write_results(results()[:1])
+                with open(path, "rb") as report_file:
+                    lines = report_file.read().splitlines()
+                if first_line is None:
+                    self.assertEqual(json.loads(lines[0])["object"], TRICKY_NAME)
+                else:
+                    self.assertEqual(lines[0], first_line)
+                    self.assertEqual(len(lines), 2)
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
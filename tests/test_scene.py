@@ -0,0 +1,113 @@
+import unittest
+
+import maya.cmds as mc
+
+from Inspector.core import in_scene
+from Inspector.core.in_scene import ObjectSet, gather_meshes
+
+
+def build_scene():
+    mc.SCENE.clear()
+    mc.SETS.clear()
+    mc.select(clear=True)
+    mc.SCENE["mdl_char_body"] = mc.FakeNode()
+    mc.SCENE["mdl_char_arm"] = mc.FakeNode(parent="mdl_char_body")
+    mc.SCENE["mdl_char_hand"] = mc.FakeNode(parent="mdl_char_arm")
+    mc.SCENE["prop_chair"] = mc.FakeNode()
+    mc.SCENE["env:rock"] = mc.FakeNode()
+    mc.SCENE["env:forest:tree"] = mc.FakeNode()
+    mc.SETS["hero_set"] = ["mdl_char_arm", "prop_chair"]
+
+
+class GatherMeshesTest(unittest.TestCase):
+
+    def setUp(self):
+        build_scene()
+
+    def tearDown(self):
+        mc.SCENE.clear()
+        mc.SETS.clear()
+        mc.select(clear=True)
+
+    def test_whole_scene(self):
+        self.assertEqual(gather_meshes(), ["|" + name for name in sorted(mc.SCENE)])
+        self.assertEqual(gather_meshes(long_names=False), sorted(mc.SCENE))
+
+    def test_hierarchy_under_roots(self):
+        self.assertEqual(gather_meshes(roots=["mdl_char_arm"], long_names=False), ["mdl_char_arm", "mdl_char_hand"])
+        self.assertEqual(gather_meshes(roots=["mdl_char_body"], long_names=False),
+                         ["mdl_char_body", "mdl_char_arm", "mdl_char_hand"])
+
+    def test_namespaces_include_nested_ones(self):
+        self.assertEqual(gather_meshes(namespaces=[":env:"], long_names=False), ["env:forest:tree", "env:rock"])
+
+    def test_set_members(self):
+        self.assertEqual(gather_meshes(sets=["hero_set"], long_names=False), ["mdl_char_arm", "prop_chair"])
+
+    def test_selection(self):
+        mc.select(["prop_chair", "mdl_char_hand"])
+        self.assertEqual(gather_meshes(selection=True, long_names=False), ["prop_chair", "mdl_char_hand"])
+
+    def test_sources_are_merged_without_duplicates(self):
+        mc.select(["prop_chair", "mdl_char_hand"])
+        objects = gather_meshes(selection=True, roots=["mdl_char_arm"], sets=["hero_set"], long_names=False)
+        self.assertEqual(objects, ["prop_chair", "mdl_char_hand", "mdl_char_arm"])
+
+    def test_name_patterns(self):
+        self.assertEqual(gather_meshes(patterns=["mdl_*", "env:*:tree"]),
+                         ["|env:forest:tree", "|mdl_char_arm", "|mdl_char_body", "|mdl_char_hand"])
+
+    def test_empty_selection(self):
+        self.assertEqual(gather_meshes(selection=True), [])
+
+    def test_queries_dont_grow_with_scene(self):
+        mc.populate(500)
+        mc.reset_calls()
+        self.assertEqual(len(gather_meshes()), 500)
+        self.assertEqual(mc.CALLS["count"], 2)
+        # 66 of the first 100 objects are named mdl_char_obj<i>
+        mc.select(["mdl_char_obj{}".format(i) if i % 3 else "obj{}".format(i) for i in range(100)])
+        mc.reset_calls()
+        self.assertEqual(len(gather_meshes(selection=True, patterns=["mdl_*"])), 66)
+        self.assertEqual(mc.CALLS["count"], 2)
+
+
+class ObjectSetTest(unittest.TestCase):
+
+    def test_insertion_order(self):
+        objects = ObjectSet(["c", "a", "b", "a"])
+        self.assertEqual(list(objects), ["c", "a", "b"])
+        self.assertFalse(objects.add("c"))
+        self.assertTrue(objects.add("d"))
+        self.assertEqual(objects.update(["b", "e", "f", "e"]), ["e", "f"])
+        self.assertEqual(list(objects), ["c", "a", "b", "d", "e", "f"])
+        self.assertEqual(len(objects), 6)
+
+    def test_remove_keeps_order(self):
+        objects = ObjectSet(["c", "a", "b", "d"])
+        objects.remove("a")
+        objects.discard("x")
+        self.assertRaises(KeyError, objects.remove, "x")
+        self.assertNotIn("a", objects)
+        self.assertEqual(list(objects), ["c", "b", "d"])
+        objects.add("a")
+        self.assertEqual(list(objects), ["c", "b", "d", "a"])
+        objects.clear()
+        self.assertEqual(list(objects), [])
+
+    def test_rename_keeps_order(self):
+        objects = ObjectSet(["c", "a", "b"])
+        objects.rename({"a": "mdl_a", "x": "y"})
+        self.assertEqual(list(objects), ["c", "mdl_a", "b"])
+        self.assertIn("mdl_a", objects)
+        self.assertNotIn("a", objects)
+
+    def test_match_patterns(self):
+        objects = ["|grp|mdl_a", "|env:mdl_b", "prop_c"]
+        self.assertEqual(in_scene.match_patterns(objects, ["mdl_*"]), ["|grp|mdl_a"])
+        self.assertEqual(in_scene.match_patterns(objects, ["*mdl_*", "prop_?"]), objects)
+        self.assertEqual(in_scene.unique(["b", "a", "b", "c", "a"]), ["b", "a", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import time
+import threading
+import unittest
+
+import Inspector.core.in_profiling as in_profiling
+import Inspector.core.in_scheduler as in_scheduler
+from Inspector.checks.in_backends import FakeBackend, FakeMesh
+from Inspector.core.in_engine import Engine
+from Inspector.core.in_scheduler import Scheduler
+
+
+OBJECT_COUNT = 40
+CHUNK_SIZE = 10
+
+
+def settings_list():
+    return [
+        ["geometry", [["triangle_count", [1, 1], {"options": [{"max": ["QLineEdit", 5000]}]}]]],
+        ["uvs", [["missing_UVS", [1, 1]]]],
+        ["naming", [["naming_convention", [1, 1], {"options": [{"first_prefix_": ["QLineEdit", "mdl_"]},
+                                                               {"second_prefix": ["QLineEdit", "char_"]}]}]]],
+        ["other", [["history", [1, 1]]]],
+    ]
+
+
+def scene():
+    # every fifth object has history and no UVs, every third one breaks naming
+    meshes = {}
+    for i in range(OBJECT_COUNT):
+        name = "obj{}".format(i) if i % 3 == 0 else "mdl_char_obj{}".format(i)
+        meshes[name] = FakeMesh.cube(history=3, uv_shells=0) if i % 5 == 0 else FakeMesh.cube()
+    return sorted(meshes), FakeBackend(meshes)
+
+
+class StubTimer(object):
+    """
+    Stands in for the dialog QTimer, calls its callback every interval until stopped
+    """
+
+    def __init__(self, callback, interval=0.001):
+        self.callback = callback
+        self.interval = interval
+        self.active = False
+        self.ticks = 0
+
+    def start(self):
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+    def run(self, limit=10000):
+        while self.active and self.ticks < limit:
+            self.callback()
+            self.ticks += 1
+            time.sleep(self.interval)
+
+
+class SchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.objects, backend = scene()
+        self.engine = Engine(settings_list(), backend)
+        self.results = []
+        self.progress = []
+        self.finished = []
+        self.run_command = in_scheduler.run_command
+
+    def tearDown(self):
+        in_scheduler.run_command = self.run_command
+
+    def scheduler(self, **kwargs):
+        kwargs.setdefault("threaded", False)
+        return Scheduler(self.engine, self.objects, chunk_size=CHUNK_SIZE,
+                         on_result=lambda result: self.results.append((result.name, len(result.objects))),
+                         on_progress=lambda done, total: self.progress.append((done, total)),
+                         on_finished=self.finished.append, **kwargs)
+
+    def assert_same_results(self, results, expected):
+        self.assertEqual([result.name for result in results], [result.name for result in expected])
+        for result, expected_result in zip(results, expected):
+            self.assertEqual(result.objects, expected_result.objects)
+            self.assertEqual(result.failed_objects(), expected_result.failed_objects())
+
+    def test_chunks_and_progress(self):
+        stats = in_profiling.RunStats()
+        scheduler = self.scheduler(stats=stats)
+        chunks = OBJECT_COUNT // CHUNK_SIZE
+        self.assertEqual(scheduler.total, chunks * 4)
+        self.assertTrue(scheduler.step())
+        # one chunk of every command per step, results merged so far are reported
+        self.assertEqual(self.results[:2], [("triangle_count", CHUNK_SIZE), ("missing_UVS", CHUNK_SIZE)])
+        self.assertEqual(scheduler.progress(), 0.25)
+        scheduler.run()
+        self.assertEqual(self.progress, [(done, chunks * 4) for done in range(1, chunks * 4 + 1)])
+        self.assertEqual(self.results[-1], ("history", OBJECT_COUNT))
+        self.assertEqual(self.finished, [False])
+        self.assertEqual(stats.objects, OBJECT_COUNT)
+        self.assertEqual(stats.commands["history"]["discrepancies"], OBJECT_COUNT // 5)
+        self.assertFalse(scheduler.step())
+
+    def test_results_match_engine_run(self):
+        results = self.scheduler().run()
+        self.assert_same_results(results, self.engine.run(self.objects))
+        self.assertEqual(len(results[1].discrepancies), OBJECT_COUNT // 5)
+        self.assertEqual(len(results[2].discrepancies), (OBJECT_COUNT + 2) // 3)
+
+    def test_cancel(self):
+        scheduler = self.scheduler()
+        scheduler.step()
+        scheduler.step()
+        scheduler.cancel()
+        self.assertEqual(self.finished, [True])
+        self.assertFalse(scheduler.step())
+        self.assertEqual([len(result.objects) for result in scheduler.results], [2 * CHUNK_SIZE] * 4)
+        # cancelling a finished run does nothing
+        scheduler.cancel()
+        self.assertEqual(self.finished, [True])
+
+    def test_parallel_safe_checks_run_on_worker(self):
+        threads = {}
+
+        def run_command(command, objects_list, mesh_data=None, nodes=True):
+            threads.setdefault(command[0], set()).add(threading.current_thread().name)
+            return self.run_command(command, objects_list, mesh_data, nodes)
+        in_scheduler.run_command = run_command
+
+        scheduler = self.scheduler(threaded=True)
+        self.assertIsNotNone(scheduler.worker)
+        results = scheduler.run()
+        self.assertEqual(threads, {"naming_convention": set(["InspectorWorker"])})
+        self.assertFalse(scheduler.worker.thread.is_alive())
+        self.assert_same_results(results, self.engine.run(self.objects))
+        self.assertEqual(self.finished, [False])
+
+    def test_stub_timer_drives_run(self):
+        timer = StubTimer(lambda: scheduler.step())
+        scheduler = self.scheduler(threaded=True)
+        scheduler.on_finished = lambda cancelled: (self.finished.append(cancelled), timer.stop())
+        timer.start()
+        timer.run()
+        self.assertEqual(self.finished, [False])
+        self.assertGreaterEqual(timer.ticks, OBJECT_COUNT // CHUNK_SIZE)
+        self.assert_same_results(scheduler.results, self.engine.run(self.objects))
+
+    def test_failing_check_cancels_run(self):
+        def run_command(command, objects_list, mesh_data=None, nodes=True):
+            raise RuntimeError("check failed")
+        in_scheduler.run_command = run_command
+
+        scheduler = self.scheduler(threaded=True)
+        self.assertRaises(RuntimeError, scheduler.run)
+        self.assertEqual(self.finished, [True])
+        self.assertFalse(scheduler.step())
+
+
+if __name__ == "__main__":
+    unittest.main()
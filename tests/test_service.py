@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import Inspector.core.in_service as in_service
+from tests import PACKAGE_ROOT
+from tests.fake_workers import write_interpreter
+
+
+PRESET = os.path.join(PACKAGE_ROOT, "Inspector", "presets", "default.txt")
+WAIT = 60
+
+
+class ServiceTestCase(unittest.TestCase):
+    workers = 2
+    timeout = 30
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.service = in_service.ValidationService(self.workers, write_interpreter(self.directory),
+                                                    timeout=self.timeout, retries=1).start()
+
+    def tearDown(self):
+        self.service.stop()
+        shutil.rmtree(self.directory)
+
+    def scene(self, name):
+        return os.path.join(self.directory, name)
+
+    def run_job(self, name, **kwargs):
+        job = self.service.submit(self.scene(name), PRESET, **kwargs)
+        self.assertTrue(job.wait(WAIT), "{} didn't finish".format(name))
+        return job
+
+
+class HttpServiceTest(ServiceTestCase):
+
+    def setUp(self):
+        super(HttpServiceTest, self).setUp()
+        # port 0 picks a free port
+        self.server = in_service.ServiceServer(self.service, port=0)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = "http://{}:{}".format(*self.server.server_address)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super(HttpServiceTest, self).tearDown()
+
+    def test_submit_and_result(self):
+        job_id = in_service.submit(self.scene("broken_2.ma"), PRESET, url=self.url)
+        job = in_service.result(job_id, wait=WAIT, url=self.url)
+        self.assertEqual(job["status"], in_service.DONE)
+        self.assertEqual(job["attempts"], 1)
+        failures = dict((result["command"], len(result["discrepancies"])) for result in job["results"])
+        self.assertEqual(failures["lamina_faces"], 2)
+        self.assertEqual(job["stats"]["objects"], 2)
+
+        status = in_service._request("GET", self.url + "/status")
+        self.assertEqual(status["jobs"][in_service.DONE], 1)
+        self.assertEqual(len(status["workers"]), 2)
+
+    def test_errors(self):
+        self.assertRaises(RuntimeError, in_service.result, "unknown", url=self.url)
+        self.assertRaises(RuntimeError, in_service.submit, self.scene("clean_1.ma"), "missing.insp", url=self.url)
+        self.assertRaises(RuntimeError, in_service.submit, self.scene("clean_1.ma"), PRESET, mode="quick",
+                          url=self.url)
+        self.assertRaises(RuntimeError, in_service._request, "DELETE", self.url + "/jobs/unknown")
+
+
+class WorkerRestartTest(ServiceTestCase):
+    timeout = 2
+
+    def test_crashed_worker_is_restarted(self):
+        job = self.run_job("crash_once_scene.ma")
+        self.assertEqual((job.status, job.attempts), (in_service.DONE, 2))
+
+        job = self.run_job("crash_scene.ma")
+        self.assertEqual((job.status, job.attempts), (in_service.FAILED, 2))
+        self.assertIn("Worker crashed", job.error)
+        self.assertEqual(self.run_job("clean_2.ma").status, in_service.DONE)
+
+    def test_timeout_kills_worker(self):
+        job = self.run_job("hang_scene.ma")
+        self.assertEqual(job.status, in_service.FAILED)
+        self.assertIn("exceeded 2 seconds", job.error)
+        worker = self.service.workers[job.worker]
+        self.assertFalse(worker.alive())
+        self.assertEqual(self.run_job("clean_2.ma").status, in_service.DONE)
+
+    def test_failing_job_keeps_worker(self):
+        preset = os.path.join(self.directory, "truncated.insp")
+        with open(preset, "wb") as preset_file:
+            preset_file.write("INSP")
+        job = self.service.submit(self.scene("clean_1.ma"), preset)
+        self.assertTrue(job.wait(WAIT))
+        self.assertEqual((job.status, job.attempts), (in_service.FAILED, 1))
+        self.assertIn("PresetError", job.error)
+        self.assertTrue(self.service.workers[job.worker].alive())
+
+
+class QueueTest(ServiceTestCase):
+    workers = 1
+    timeout = 2
+
+    def test_priority_and_cancel(self):
+        busy = self.service.submit(self.scene("hang_scene.ma"), PRESET)
+        low = self.service.submit(self.scene("clean_1.ma"), PRESET, priority=0)
+        cancelled = self.service.submit(self.scene("clean_2.ma"), PRESET, priority=5)
+        high = self.service.submit(self.scene("broken_1.ma"), PRESET, priority=10)
+        self.assertTrue(self.service.cancel(cancelled.id))
+        self.assertFalse(self.service.cancel(cancelled.id))
+        self.assertFalse(self.service.cancel("unknown"))
+        for job in (busy, low, high):
+            self.assertTrue(job.wait(WAIT))
+        self.assertEqual(cancelled.status, in_service.CANCELLED)
+        self.assertEqual((low.status, high.status), (in_service.DONE, in_service.DONE))
+        self.assertLess(high.started, low.started)
+
+    def test_stop_cancels_queued_jobs(self):
+        busy = self.service.submit(self.scene("clean_1.ma"), PRESET)
+        queued = [self.service.submit(self.scene("clean_1.ma"), PRESET) for i in range(3)]
+        self.service.stop()
+        self.assertTrue(busy.wait(WAIT))
+        self.assertTrue(all(job.status in (in_service.DONE, in_service.CANCELLED) for job in queued))
+        self.assertRaises(RuntimeError, self.service.submit, self.scene("clean_1.ma"), PRESET)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+from Inspector.checks import in_commands, in_topology
+from Inspector.checks.in_backends import FakeBackend, FakeMesh, IDENTITY
+from Inspector.checks.in_mesh_data import MeshData
+from Inspector.checks.in_topology import Topology
+
+SQUARE = [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
+
+
+def cube(face_uvs=None):
+    mesh = FakeMesh.cube()
+    return Topology.from_faces(mesh.face_vertices, mesh.points, face_uvs or mesh.face_uvs)
+
+
+def shifted(uvs, u):
+    return [(corner_u + u, corner_v) for corner_u, corner_v in uvs]
+
+
+class TopologyTest(unittest.TestCase):
+
+    def test_face_arrays(self):
+        topology = Topology.from_faces([(0, 1, 2), (0, 2, 3, 4)], [(0, 0, 0)] * 5,
+                                       [SQUARE[:3], []])
+        self.assertEqual(topology.face_count(), 2)
+        self.assertEqual(list(topology.face(1)), [0, 2, 3, 4])
+        self.assertEqual(list(topology.point(0)), [0.0, 0.0, 0.0])
+        self.assertEqual(topology.face_uvs(0), SQUARE[:3])
+        self.assertEqual(topology.face_uvs(1), [])
+        self.assertEqual(sorted(topology.edge_faces()[(0, 2)]), [0, 1])
+
+    def test_clean_cube(self):
+        topology = cube()
+        self.assertEqual(list(in_topology.non_manifold_vertices(topology)), [])
+        self.assertEqual(list(in_topology.zero_area_faces(topology, 1e-6)), [])
+        self.assertEqual(list(in_topology.zero_length_vertices(topology, 1e-6)), [])
+        self.assertEqual(list(in_topology.ngons(topology)), [])
+        self.assertEqual(list(in_topology.flipped_uv_faces(topology)), [])
+        self.assertEqual(list(in_topology.overlapping_uv_faces(topology)), [])
+
+    def test_non_manifold_edge(self):
+        points = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1)]
+        topology = Topology.from_faces([(0, 1, 2), (1, 0, 3), (0, 1, 4)], points)
+        self.assertEqual(list(in_topology.non_manifold_vertices(topology)), [0, 1])
+
+    def test_bowtie_vertex(self):
+        points = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (-1, 0, 0), (-1, -1, 0)]
+        topology = Topology.from_faces([(0, 1, 2), (0, 3, 4)], points)
+        self.assertEqual(list(in_topology.non_manifold_vertices(topology)), [0])
+
+    def test_fan_isnt_non_manifold(self):
+        points = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (-1, 0, 0), (0, -1, 0)]
+        topology = Topology.from_faces([(0, 1, 2), (0, 2, 3), (0, 3, 4)], points)
+        self.assertEqual(list(in_topology.non_manifold_vertices(topology)), [])
+
+    def test_zero_area_faces(self):
+        points = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (2, 0, 0), (3, 0, 0)]
+        # second face has all its vertices on one line
+        topology = Topology.from_faces([(0, 1, 2, 3), (1, 4, 5)], points)
+        self.assertEqual(in_topology.face_area(topology, 0), 1.0)
+        self.assertEqual(list(in_topology.zero_area_faces(topology, 1e-6)), [1])
+
+    def test_zero_length_edges_report_vertices(self):
+        # edge 1-2 is collapsed, the check returns both of its vertices instead of an edge id
+        points = [(0, 0, 0), (1, 0, 0), (1, 0, 0), (0, 1, 0)]
+        topology = Topology.from_faces([(0, 1, 2, 3)], points)
+        self.assertEqual(list(in_topology.zero_length_vertices(topology, 1e-6)), [1, 2])
+        self.assertEqual(list(in_topology.zero_length_vertices(topology, 0.0)), [1, 2])
+
+    def test_ngons(self):
+        points = [(0, 0, 0)] * 6
+        topology = Topology.from_faces([(0, 1, 2), (0, 1, 2, 3), (0, 1, 2, 3, 4), (0, 1, 2, 3, 4, 5)], points)
+        self.assertEqual(list(in_topology.ngons(topology)), [2, 3])
+        self.assertEqual(list(in_topology.ngons(topology, max_sides=3)), [1, 2, 3])
+
+    def test_flipped_uvs(self):
+        face_uvs = [shifted(SQUARE, row) for row in range(6)]
+        face_uvs[4] = list(reversed(face_uvs[4]))
+        self.assertEqual(list(in_topology.flipped_uv_faces(cube(face_uvs))), [4])
+
+    def test_overlapping_uvs(self):
+        face_uvs = [shifted(SQUARE, row) for row in range(6)]
+        face_uvs[5] = shifted(SQUARE, 1.5)
+        self.assertEqual(list(in_topology.overlapping_uv_faces(cube(face_uvs))), [1, 2, 5])
+
+    def test_touching_uvs_dont_overlap(self):
+        face_uvs = [shifted(SQUARE, row) for row in range(6)]
+        self.assertEqual(list(in_topology.overlapping_uv_faces(cube(face_uvs))), [])
+
+    def test_unfrozen(self):
+        self.assertFalse(in_topology.unfrozen(IDENTITY))
+        moved = list(IDENTITY)
+        moved[12] = 1.0
+        self.assertTrue(in_topology.unfrozen(moved))
+
+
+class TopologyCommandsTest(unittest.TestCase):
+
+    def setUp(self):
+        collapsed = FakeMesh([(0, 1, 2, 3)], points=[(0, 0, 0), (1, 0, 0), (1, 0, 0), (0, 1, 0)])
+        self.mesh_data = MeshData(FakeBackend({"clean": FakeMesh.cube(), "collapsed": collapsed}))
+        self.objects_list = ["clean", "collapsed"]
+        self.mesh_data.collect(self.objects_list, ["topology"])
+        self.settings = {"options": [{"length": ["QLineEdit", "0.0001"]}]}
+
+    def test_zero_length_edges_report_vertices(self):
+        discrepancies = in_commands.zero_length_edges(self.objects_list, self.settings, self.mesh_data)
+        self.assertEqual(len(discrepancies), 1)
+        discrepancy = discrepancies[0]
+        self.assertEqual(discrepancy.obj, "collapsed")
+        self.assertEqual(discrepancy.component, "vtx")
+        self.assertEqual(list(discrepancy.indices), [1, 2])
+        self.assertEqual(discrepancy.params, (2,))
+
+    def test_count_only_skips_indices(self):
+        discrepancies = in_commands.zero_length_edges(self.objects_list, self.settings, self.mesh_data, nodes=False)
+        self.assertEqual(len(discrepancies), 1)
+        self.assertIsNone(discrepancies[0].indices)
+
+
+if __name__ == "__main__":
+    unittest.main()